@@ -1,14 +1,53 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.patches import Circle, FancyBboxPatch, ConnectionPatch
 import numpy as np
+import os
 import random
-import time
-from threading import Thread
-from collections import deque
-import math
+from ui_channel import UIUpdateChannel
+from graph_core import random_weights, circular_layout
+from graph_generators import GRAPH_KINDS
+from graph_io import FILE_TYPES
+from graph_cache import shared_cache, make_key, cached_generate, cached_import
+from graph_layout import LAYOUT_KINDS, force_directed_steps, get_cached_layout, store_layout
+from spatial_index import GridIndex
+from graph_artists import GraphArtists, state_codes, format_nodes, fit_node_radius
+from raster_renderer import RENDERER_KINDS, choose_renderer, replace_artists
+from job_manager import JobManager
+from traversal_stats import traversal_stats, summarize
+from stats_window import StatsWindow
+from bfs_engine import (bfs_levels, bfs_direction_optimizing, bidirectional_bfs, multi_source_bfs,
+                        component_sweep, IncrementalBFS, DEFAULT_ALPHA, DEFAULT_BETA, FORWARD, BACKWARD)
+from shortest_path import dijkstra, astar
+from timeline import (TimelinePlayer, bfs_timeline, bidirectional_timeline, shortest_path_timeline,
+                      EV_ENQUEUE, EV_DEQUEUE)
+
+# 节点状态编码及对应颜色
+STATE_UNVISITED, STATE_QUEUED, STATE_VISITED, STATE_CURRENT = range(4)
+# 双向BFS：正向前沿、反向前沿、反向已访问
+STATE_FORWARD, STATE_BACKWARD, STATE_BACKWARD_VISITED = range(4, 7)
+# 增量模式：被删除的节点
+STATE_DELETED = 7
+NODE_PALETTE = ['lightblue', 'yellow', 'green', 'red', 'orange', 'magenta', 'plum', 'lightgray']
+# 多源BFS/分量扫描：已访问的节点按最近的源点（所在分量）着色，循环使用 tab20 的颜色
+# （先用 10 种深色，再用浅色），第 i 个源点（分量）的编码为 STATE_LABEL + i % 20
+LABEL_PALETTE = [plt.cm.tab20(i) for i in list(range(0, 20, 2)) + list(range(1, 20, 2))]
+STATE_LABEL = len(NODE_PALETTE)
+
+# 起点/终点下拉框最多列出的节点数（导入的大图用鼠标点击选择节点）
+NODE_CHOICE_LIMIT = 1000
+
+# 力导向布局的迭代次数和每帧间隔（秒）
+LAYOUT_ITERATIONS = 120
+LAYOUT_FRAME_INTERVAL = 0.02
+
+BFS_MODES = ["Top-down", "Direction-optimizing", "Bidirectional (s-t)", "Dijkstra", "A* (s-t)",
+             "Multi-source", "Components sweep", "Incremental (edit)"]
+
+# 回放速度（每秒事件数）滑块的范围，按 10 的幂取值
+SPEED_EXPONENTS = (-0.5, 5.0)
 
 
 class BFSVisualizer:
@@ -18,21 +57,46 @@ class BFSVisualizer:
         self.root.geometry("1000x700")
 
         # 图数据结构
-        self.graph = {}
-        self.nodes = {}  # 节点位置信息
-        self.edges = []  # 边信息
+        self.graph = None  # CSRGraph
+        self.positions = np.zeros((0, 2))  # 节点位置信息 (n, 2)
+        self.default_positions = self.positions  # 生成器给出的坐标或圆形排列
+        self.hit_index = GridIndex(self.positions)  # 点击/悬停的命中测试
         self.node_radius = 30
         self.node_count = 8  # 默认节点数量
+        self.node_ids = None  # 导入的图：节点 i 在文件中的原始编号
 
         # 算法状态
-        self.speed = 0.5
-        self.is_running = False
-        self.paused = False
-        self.stop_flag = False
+        self.speed = 10.0  # 回放速度：每秒事件数
+        self.is_running = False  # 正在计算或正在回放
         self.start_node = None
+        self.target_node = None  # 双向BFS的终点
+        self.seeds = []  # 多源BFS的源点
+        self.click_selects_target = False  # 下一次点击设置终点
         self.visited_order = []
         self.visited = set()
-        self.queue = deque()
+        self.result = None  # BFSResult
+        self.label_result = None  # MultiSourceResult（多源BFS/分量扫描）
+        self.path_result = None  # ShortestPathResult（Dijkstra/A*）
+        self.bfs_compare = None  # Dijkstra/A* 同一起点的 BFS 结果，用于对比开销
+        self.run_mode = None  # 当前时间线对应的模式
+        self.timeline = None  # 当前可回放的时间线
+        self.incremental = None  # IncrementalBFS（增量模式下编辑图时维护距离）
+        self.edit_anchor = None  # 增量模式：已点击的边的第一个端点
+        self.graph_version = 0  # self.graph 对应的 DynamicGraph 版本（编辑后由 sync_graph 合并）
+
+        # 工作线程 -> 界面的更新通道
+        self.ui = UIUpdateChannel(self.root)
+        # 后台任务（每次运行一个可取消的任务）
+        self.jobs = JobManager("bfs")
+        # 力导向布局在单独的后台任务中逐步计算，使用独立的更新通道，重置算法时不会被清空
+        self.layout_jobs = JobManager("bfs-layout")
+        self.layout_ui = UIUpdateChannel(self.root)
+        # 预先计算好的时间线在界面线程中按时钟回放，可以暂停、单步和拖动
+        self.player = TimelinePlayer(self.root, self.show_step, self.on_play_state, self.speed)
+        # 遍历统计在单独的后台任务中计算，结果显示在统计窗口中
+        self.stats_jobs = JobManager("bfs-stats")
+        self.stats_window = None
+        self.stats_shown = None  # 统计窗口当前显示的遍历结果
 
         # 创建UI
         self.setup_ui()
@@ -40,6 +104,19 @@ class BFSVisualizer:
         # 初始化图
         self.generate_graph()
 
+        # 窗口关闭时停止后台任务
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+
+    def on_destroy(self, event):
+        """窗口销毁：先关闭更新通道（唤醒等待投递的工作线程），再取消并回收后台任务"""
+        # 子控件的销毁事件也会传到窗口上
+        if event.widget is not self.root:
+            return
+        for channel in (self.ui, self.layout_ui):
+            channel.close()
+        for jobs in (self.jobs, self.layout_jobs, self.stats_jobs):
+            jobs.shutdown()
+
     def setup_ui(self):
         # 创建主容器
         main_frame = ttk.Frame(self.root, padding="10")
@@ -63,7 +140,7 @@ class BFSVisualizer:
         # 节点数量控制
         ttk.Label(algo_control_frame, text="Number of Nodes:").grid(row=0, column=0, sticky=tk.W)
         self.node_var = tk.IntVar(value=self.node_count)
-        node_scale = ttk.Scale(algo_control_frame, from_=5, to=15, variable=self.node_var,
+        node_scale = ttk.Scale(algo_control_frame, from_=5, to=200, variable=self.node_var,
                                orient=tk.HORIZONTAL, command=self.on_node_count_change)
         node_scale.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
         self.node_label = ttk.Label(algo_control_frame, text=str(self.node_count))
@@ -71,7 +148,7 @@ class BFSVisualizer:
 
         # 生成新图按钮
         ttk.Button(algo_control_frame, text="Generate New Graph",
-                   command=self.generate_graph).grid(row=0, column=3, padx=(10, 0))
+                   command=lambda: self.generate_graph(fresh=True)).grid(row=0, column=3, padx=(10, 0))
 
         # 起点选择
         ttk.Label(algo_control_frame, text="Start Node:").grid(row=0, column=4, sticky=tk.W, padx=(20, 0))
@@ -79,6 +156,85 @@ class BFSVisualizer:
         self.start_node_combo = ttk.Combobox(algo_control_frame, textvariable=self.start_node_var,
                                              state="readonly", width=5)
         self.start_node_combo.grid(row=0, column=5, padx=(5, 10))
+        self.start_node_combo.bind("<<ComboboxSelected>>", self.on_start_node_change)
+
+        # 终点选择（双向BFS）
+        ttk.Label(algo_control_frame, text="Target Node:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.target_node_var = tk.StringVar(value="None")
+        self.target_node_combo = ttk.Combobox(algo_control_frame, textvariable=self.target_node_var,
+                                              state="readonly", width=5)
+        self.target_node_combo.grid(row=1, column=1, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+        self.target_node_combo.bind("<<ComboboxSelected>>", self.on_target_node_change)
+
+        # BFS模式：自顶向下 / 方向优化（自顶向下与自底向上自动切换）
+        ttk.Label(algo_control_frame, text="Mode:").grid(row=0, column=6, sticky=tk.W, padx=(10, 0))
+        self.mode_var = tk.StringVar(value=BFS_MODES[0])
+        mode_combo = ttk.Combobox(algo_control_frame, textvariable=self.mode_var, values=BFS_MODES,
+                                  state="readonly", width=20)
+        mode_combo.grid(row=0, column=7, padx=(5, 10))
+        mode_combo.bind("<<ComboboxSelected>>", lambda event: self.draw_selection())
+
+        # 方向切换阈值
+        ttk.Label(algo_control_frame, text="Alpha:").grid(row=1, column=4, sticky=tk.W, padx=(20, 0), pady=(5, 0))
+        self.alpha_var = tk.DoubleVar(value=DEFAULT_ALPHA)
+        ttk.Spinbox(algo_control_frame, from_=1, to=100, increment=1, textvariable=self.alpha_var,
+                    width=5).grid(row=1, column=5, padx=(5, 10), pady=(5, 0))
+        ttk.Label(algo_control_frame, text="Beta:").grid(row=1, column=6, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        self.beta_var = tk.DoubleVar(value=DEFAULT_BETA)
+        ttk.Spinbox(algo_control_frame, from_=1, to=100, increment=1, textvariable=self.beta_var,
+                    width=5).grid(row=1, column=7, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+
+        # Dijkstra/A* 的堆大小随时间变化的折线
+        ttk.Label(algo_control_frame, text="Heap Size:").grid(row=1, column=2, sticky=tk.E, pady=(5, 0))
+        self.heap_canvas = tk.Canvas(algo_control_frame, width=160, height=36, bg='white',
+                                     highlightthickness=1, highlightbackground='gray')
+        self.heap_canvas.grid(row=1, column=3, padx=(5, 0), pady=(5, 0))
+
+        # 图的类型（生成器）
+        ttk.Label(algo_control_frame, text="Graph Type:").grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        self.graph_kind_var = tk.StringVar(value=GRAPH_KINDS[0])
+        graph_kind_combo = ttk.Combobox(algo_control_frame, textvariable=self.graph_kind_var, values=GRAPH_KINDS,
+                                        state="readonly", width=16)
+        graph_kind_combo.grid(row=2, column=1, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+        graph_kind_combo.bind("<<ComboboxSelected>>", lambda event: self.generate_graph())
+
+        # 布局
+        ttk.Label(algo_control_frame, text="Layout:").grid(row=2, column=2, sticky=tk.E, pady=(5, 0))
+        self.layout_var = tk.StringVar(value=LAYOUT_KINDS[0])
+        layout_combo = ttk.Combobox(algo_control_frame, textvariable=self.layout_var, values=LAYOUT_KINDS,
+                                    state="readonly", width=14)
+        layout_combo.grid(row=2, column=3, sticky=tk.W, padx=(5, 0), pady=(5, 0))
+        layout_combo.bind("<<ComboboxSelected>>", lambda event: self.start_layout())
+
+        # 从文件导入图（边表 / 邻接表 / .npz / memmap 目录）
+        ttk.Button(algo_control_frame, text="Import Graph...",
+                   command=self.import_graph).grid(row=2, column=4, columnspan=2, sticky=tk.W, padx=(20, 0),
+                                                   pady=(5, 0))
+
+        # 渲染方式：矢量（Matplotlib 对象）/ 光栅（NumPy 像素缓冲区），Auto 按节点数选择
+        ttk.Label(algo_control_frame, text="Renderer:").grid(row=2, column=6, sticky=tk.W, padx=(10, 0),
+                                                             pady=(5, 0))
+        self.renderer_var = tk.StringVar(value=RENDERER_KINDS[0])
+        renderer_combo = ttk.Combobox(algo_control_frame, textvariable=self.renderer_var, values=RENDERER_KINDS,
+                                      state="readonly", width=8)
+        renderer_combo.grid(row=2, column=7, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+        renderer_combo.bind("<<ComboboxSelected>>", lambda event: self.on_renderer_change())
+
+        # 多源BFS的源点：输入编号列表，或在 Multi-source 模式下点击节点添加/移除
+        ttk.Label(algo_control_frame, text="Seeds:").grid(row=3, column=0, sticky=tk.W, pady=(5, 0))
+        self.seeds_var = tk.StringVar(value="")
+        seeds_entry = ttk.Entry(algo_control_frame, textvariable=self.seeds_var, width=30)
+        seeds_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=(5, 10), pady=(5, 0))
+        seeds_entry.bind("<Return>", lambda event: self.on_seeds_change())
+        ttk.Button(algo_control_frame, text="Clear Seeds",
+                   command=self.clear_seeds).grid(row=3, column=2, sticky=tk.W, pady=(5, 0))
+
+        # 增量模式：在视野中心添加节点 / 删除选中的节点（加边删边直接点击两个端点）
+        ttk.Button(algo_control_frame, text="Add Node",
+                   command=self.edit_add_node).grid(row=3, column=3, sticky=tk.W, padx=(5, 0), pady=(5, 0))
+        ttk.Button(algo_control_frame, text="Delete Node",
+                   command=self.edit_delete_node).grid(row=3, column=4, columnspan=2, sticky=tk.W, padx=(20, 0),
+                                                       pady=(5, 0))
 
         # 画布区域
         self.figure = plt.Figure(figsize=(10, 5), dpi=100)
@@ -86,48 +242,80 @@ class BFSVisualizer:
         self.canvas = FigureCanvasTkAgg(self.figure, main_frame)
         self.canvas.get_tk_widget().grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
         self.canvas.mpl_connect('button_press_event', self.on_canvas_click)
+        self.canvas.mpl_connect('motion_notify_event', self.on_canvas_motion)
+        self.artists = GraphArtists(self.ax, self.canvas, NODE_PALETTE + LABEL_PALETTE, node_radius=self.node_radius)
 
         # 通用动画控制
         control_frame = ttk.LabelFrame(main_frame, text="Animation Controls", padding="10")
         control_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
 
-        # 速度控制
-        ttk.Label(control_frame, text="Speed:").grid(row=0, column=0, sticky=tk.W)
-        self.speed_var = tk.DoubleVar(value=self.speed)
-        speed_scale = ttk.Scale(control_frame, from_=0.1, to=2.0, variable=self.speed_var,
-                                orient=tk.HORIZONTAL, command=self.on_speed_change)
+        # 速度控制（每秒回放的事件数，对数刻度）
+        ttk.Label(control_frame, text="Steps/s:").grid(row=0, column=0, sticky=tk.W)
+        self.speed_var = tk.DoubleVar(value=np.log10(self.speed))
+        speed_scale = ttk.Scale(control_frame, from_=SPEED_EXPONENTS[0], to=SPEED_EXPONENTS[1],
+                                variable=self.speed_var, orient=tk.HORIZONTAL, command=self.on_speed_change)
         speed_scale.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
-        self.speed_label = ttk.Label(control_frame, text=f"{self.speed:.1f}x")
+        self.speed_label = ttk.Label(control_frame, text=f"{self.speed:,.0f}", width=8)
         self.speed_label.grid(row=0, column=2, padx=(0, 20))
 
         # 控制按钮
         self.start_button = ttk.Button(control_frame, text="Start BFS", command=self.start_bfs)
         self.start_button.grid(row=0, column=3, padx=(10, 5))
 
-        self.pause_button = ttk.Button(control_frame, text="Pause", command=self.pause_bfs, state="disabled")
-        self.pause_button.grid(row=0, column=4, padx=5)
-
         self.reset_button = ttk.Button(control_frame, text="Reset", command=self.reset)
-        self.reset_button.grid(row=0, column=5, padx=5)
+        self.reset_button.grid(row=0, column=4, padx=5)
+
+        # 遍历统计（层直方图、度分布、连通分量、离心率），可导出为 JSON
+        ttk.Button(control_frame, text="Statistics...", command=self.show_stats).grid(row=0, column=5, padx=5)
 
         # 状态显示
         self.status_var = tk.StringVar(value="Ready - Click a node to set as start node")
         status_label = ttk.Label(control_frame, textvariable=self.status_var)
         status_label.grid(row=0, column=6, padx=(20, 0))
 
+        # 回放控制：|< < Play > >| 和进度条
+        transport = ttk.Frame(control_frame)
+        transport.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Button(transport, text="|<", width=3, command=self.player.to_start).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text="<", width=3, command=lambda: self.player.step_by(-1)).pack(side=tk.LEFT, padx=1)
+        self.play_button = ttk.Button(transport, text="Play", width=6, command=self.toggle_play)
+        self.play_button.pack(side=tk.LEFT, padx=4)
+        ttk.Button(transport, text=">", width=3, command=lambda: self.player.step_by(1)).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text=">|", width=3, command=self.player.to_end).pack(side=tk.LEFT, padx=1)
+
+        self.step_var = tk.DoubleVar(value=0)
+        self.scrubber = ttk.Scale(control_frame, from_=0, to=1, variable=self.step_var,
+                                  orient=tk.HORIZONTAL, command=self.on_scrub)
+        self.scrubber.grid(row=1, column=1, columnspan=5, sticky=(tk.W, tk.E), padx=(5, 10), pady=(5, 0))
+        self.step_label = ttk.Label(control_frame, text="0 / 0")
+        self.step_label.grid(row=1, column=6, sticky=tk.W, padx=(20, 0), pady=(5, 0))
+
         # 算法说明
         explanation = """
 BFS Algorithm:
 1. Start from the selected node
 2. Visit all neighbors at the current depth before moving to the next level
-3. Use a queue to keep track of nodes to visit
+3. The whole frontier (one level of the queue) is expanded at once
 4. Mark visited nodes to avoid revisiting
+5. Direction-optimizing mode switches to bottom-up when the frontier gets large:
+   unvisited nodes look for a parent in the frontier instead
+6. Multi-source mode starts from every seed at once (click nodes or type their ids);
+   Components sweep grows every connected component from its smallest node at once
+7. Incremental mode keeps the distances while you edit the graph: click two nodes to add or
+   remove the edge between them; only the affected region is repaired (compare with a full BFS)
+
+Playback: 'Start BFS' records every step first; |< < Play > >| and the slider replay it
+View: scroll to zoom, drag with the right mouse button to pan, double right-click to reset
 
 Colors:
 - Blue: Unvisited nodes
-- Red: Currently processing node
+- Red: Node taken from the queue (current)
 - Green: Visited nodes
-- Yellow: Nodes in the queue
+- Yellow: Next level (nodes in the queue)
+- Bidirectional mode: orange/magenta = forward/backward frontier, plum = reached from the target
+- Dijkstra/A*: red = node taken from the heap, yellow = nodes in the heap, edge labels are the weights
+- Multi-source/Components: visited nodes take the color of their nearest seed (their component)
+- Incremental: green = reachable, yellow = distance changed by the last edit, gray = deleted
         """
         explanation_label = ttk.Label(main_frame, text=explanation, justify=tk.LEFT)
         explanation_label.grid(row=4, column=0, columnspan=3, pady=(10, 0), sticky=tk.W)
@@ -136,105 +324,163 @@ Colors:
         algo_control_frame.columnconfigure(1, weight=1)
         control_frame.columnconfigure(1, weight=1)
 
-    def generate_graph(self):
-        """生成随机图"""
-        self.node_count = self.node_var.get()
-        self.graph = {}
-        self.nodes = {}
-        self.edges = []
-
-        # 生成节点位置（圆形排列）
-        center_x, center_y = 500, 250
-        radius = 200
-
-        for i in range(self.node_count):
-            angle = 2 * math.pi * i / self.node_count
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            self.nodes[i] = (x, y)
-
-        # 生成随机边（确保图是连通的）
-        # 首先创建一个环保证连通性
-        for i in range(self.node_count):
-            self.graph[i] = []
-            next_node = (i + 1) % self.node_count
-            self.graph[i].append(next_node)
-            self.edges.append((i, next_node))
-
-        # 添加一些随机边
-        for i in range(self.node_count):
-            # 每个节点额外添加1-2条边
-            extra_edges = random.randint(1, 2)
-            for _ in range(extra_edges):
-                target = random.randint(0, self.node_count - 1)
-                if target != i and target not in self.graph[i] and (i, target) not in self.edges:
-                    self.graph[i].append(target)
-                    self.edges.append((i, target))
+    def generate_graph(self, fresh=False):
+        """生成随机图；fresh=False 时同样的类型和节点数沿用磁盘缓存中上一次生成的图"""
+        # 按选择的类型生成图（网格等图的实际节点数可能与滑块不同）
+        graph, positions = cached_generate(self.graph_kind_var.get(), self.node_var.get(), fresh=fresh)
+        self.node_ids = None
+        self.set_graph(graph, positions)
+
+    def set_graph(self, graph, positions=None):
+        """换上一张新图（生成或导入）：坐标、图形对象、起点选择和布局全部重新设置"""
+        # 旧图的布局任务和增量编辑不再需要
+        self.layout_jobs.cancel()
+        self.incremental = None
+        self.node_count = graph.num_nodes
+
+        # 生成节点位置：生成器没有给出坐标时圆形排列
+        if positions is None:
+            positions = circular_layout(self.node_count, center=(500, 250), radius=200)
+        self.positions = self.default_positions = positions
+        self.node_radius = fit_node_radius(self.positions)
+        self.artists.node_radius = self.node_radius
+        self.hit_index.update(self.positions, cell_size=2 * self.node_radius)
+
+        # 边权（1-10 的整数）随图一起生成并保存，Dijkstra/A* 使用同一份边权；导入的带权图沿用文件中的边权。
+        # 随机数种子取自图的指纹：同一张图每次打开边权都相同，缓存的遍历轨迹可以复用
+        if graph.weights is None:
+            graph = graph.with_weights(random_weights(graph, 1, 10, rng=int(graph.fingerprint()[:16], 16)))
+        self.graph = graph
+        self.build_artists()
 
         # 更新起点选择框
-        self.start_node_combo['values'] = list(str(i) for i in range(self.node_count))
+        choices = [str(i) for i in range(min(self.node_count, NODE_CHOICE_LIMIT))]
+        self.start_node_combo['values'] = choices
         self.start_node_var.set("0")
         self.start_node = 0
-
-        # 重置算法状态
+        self.target_node_combo['values'] = ["None"] + choices
+        self.target_node_var.set("None")
+        self.target_node = None
+        self.click_selects_target = False
+        self.seeds = []
+        self.seeds_var.set("")
+
+        # 重置算法状态（旧图的遍历结果不再有效）
+        self.result = None
         self.reset()
+        self.start_layout()
+        if self.stats_window is not None and self.stats_window.alive:
+            self.show_stats()
+
+    def build_artists(self):
+        """为当前图创建一次性的图形对象（边、节点、标签）"""
+        self.artists = replace_artists(self.artists, choose_renderer(self.renderer_var.get(), self.node_count))
+        src, dst = self.graph.undirected_edges()
+        # 标签显示图中保存的边权（只存在 v -> u 方向的边按反向查询），放大到足够看清时才画出
+        weights = self.graph.edge_weights(src, dst)
+        missing = np.isnan(weights)
+        weights[missing] = self.graph.edge_weights(dst[missing], src[missing])
+        self.artists.build(self.positions, src, dst,
+                           title=f"Breadth-First Search - Graph with {self.node_count} nodes",
+                           edge_labels=weights)
+
+    def on_renderer_change(self):
+        """换用另一种渲染方式：重新构建图形对象，再画出当前的状态"""
+        if self.graph is None:
+            return
+        self.sync_graph()
+        self.build_artists()
+        if self.timeline is not None:
+            self.show_step(self.player.step)
+        elif self.incremental is not None:
+            self.draw_incremental()
+        else:
+            self.draw_selection()
 
     def draw_graph(self, current_node=None, visited=None, queue=None):
-        """绘制图"""
-        self.ax.clear()
-        self.ax.set_xlim(0, 1000)
-        self.ax.set_ylim(0, 500)
-        self.ax.set_aspect('equal')
-        self.ax.axis('off')
-
-        if visited is None:
-            visited = set()
-        if queue is None:
-            queue = set()
-
-        # 绘制边
-        for edge in self.edges:
-            node1, node2 = edge
-            x1, y1 = self.nodes[node1]
-            x2, y2 = self.nodes[node2]
-
-            # 检查是否是有向边（这里我们假设是无向图）
-            if (node2, node1) in self.edges and node1 > node2:
-                continue  # 避免重复绘制双向边
-
-            # 绘制边
-            line = plt.Line2D([x1, x2], [y1, y2], color='black', linewidth=2)
-            self.ax.add_line(line)
-
-            # 添加边的权重（随机）
-            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            self.ax.text(mid_x, mid_y, str(random.randint(1, 10)),
-                         fontsize=10, ha='center', va='center',
-                         bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
-
-        # 绘制节点
-        for node, (x, y) in self.nodes.items():
-            # 确定节点颜色
-            if node == current_node:
-                color = 'red'  # 当前正在处理的节点
-            elif node in visited:
-                color = 'green'  # 已访问的节点
-            elif node in queue:
-                color = 'yellow'  # 队列中的节点
-            else:
-                color = 'lightblue'  # 未访问的节点
+        """绘制图：只更新节点颜色（current_node 可以是单个节点，也可以是一整层）"""
+        # 颜色优先级：当前节点 > 已访问 > 队列中 > 未访问
+        codes = state_codes(self.graph.num_nodes,
+                            (queue, STATE_QUEUED),
+                            (visited, STATE_VISITED),
+                            (current_node, STATE_CURRENT))
+        self.artists.update(codes)
+
+    # --- 布局 ---
+
+    def start_layout(self):
+        """按选择的布局放置节点：力导向布局优先使用缓存，否则在后台逐步计算"""
+        self.layout_jobs.cancel()
+        self.layout_ui.clear()
+        self.sync_graph()
+        if self.layout_var.get() != LAYOUT_KINDS[1]:
+            self.layout_completed(self.graph, self.default_positions)
+            return
+        cached = get_cached_layout(self.graph)
+        if cached is not None:
+            self.layout_completed(self.graph, cached)
+            return
+        self.layout_jobs.submit(self.run_layout, self.graph, self.default_positions)
+
+    def run_layout(self, token, graph, initial):
+        """后台任务：每次迭代把新坐标交给界面线程，布局逐渐收敛"""
+        positions = initial
+        for positions in force_directed_steps(graph, initial, iterations=LAYOUT_ITERATIONS):
+            token.check()
+            self.layout_ui.post("layout", self.apply_layout, graph, positions)
+            token.sleep(LAYOUT_FRAME_INTERVAL)
+        store_layout(graph, positions)
+        self.layout_ui.post_control(self.layout_completed, graph, positions)
+
+    def apply_layout(self, graph, positions):
+        if graph is not self.graph:
+            return  # 图已经重新生成
+        self.positions = positions
+        self.hit_index.update(positions)
+        self.artists.set_positions(positions)
+
+    def layout_completed(self, graph, positions):
+        if graph is not self.graph:
+            return
+        self.node_radius = fit_node_radius(positions)
+        self.artists.node_radius = self.node_radius
+        self.hit_index.update(positions, cell_size=2 * self.node_radius)
+        self.apply_layout(graph, positions)
 
-            # 绘制节点
-            circle = plt.Circle((x, y), self.node_radius, color=color, ec='black', linewidth=2)
-            self.ax.add_patch(circle)
+    # --- 导入 ---
 
-            # 添加节点标签
-            self.ax.text(x, y, str(node), fontsize=14, ha='center', va='center', fontweight='bold')
+    def import_graph(self):
+        """选择图文件，在后台读取，完成后替换当前图"""
+        if self.is_running:
+            return
+        path = filedialog.askopenfilename(title="Import Graph", filetypes=FILE_TYPES)
+        if not path:
+            return
+        self.reset()
+        self.is_running = True
+        self.start_button.config(state="disabled")
+        self.status_var.set(f"Importing {os.path.basename(path)}...")
+        self.jobs.submit(self.run_import, path)
 
-        # 添加标题
-        self.ax.set_title(f"Breadth-First Search - Graph with {self.node_count} nodes", fontsize=16)
+    def run_import(self, token, path):
+        """后台任务：流式读取并构建 CSR 图"""
+        try:
+            graph, node_ids = cached_import(path)
+            if graph.num_nodes == 0:
+                raise ValueError("the file contains no edges")
+            token.check()
+            self.ui.post_control(self.import_completed, path, graph, node_ids)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Import Graph", f"Could not import {os.path.basename(path)}:\n{str(e)}")
+            self.ui.post_control(self.reset)
 
-        self.canvas.draw()
+    def import_completed(self, path, graph, node_ids):
+        self.node_ids = node_ids
+        self.set_graph(graph)
+        kind = "directed" if graph.directed else "undirected"
+        self.status_var.set(f"Imported {os.path.basename(path)}: {graph.num_nodes} nodes, {graph.num_edges} "
+                            f"stored edges ({kind}); file ids {node_ids[0]}..{node_ids[-1]} "
+                            f"are shown as 0..{graph.num_nodes - 1}")
 
     def on_node_count_change(self, value):
         self.node_count = int(float(value))
@@ -242,120 +488,599 @@ Colors:
         self.generate_graph()
 
     def on_speed_change(self, value):
-        self.speed = float(value)
-        self.speed_label.config(text=f"{self.speed:.1f}x")
+        self.speed = 10 ** float(value)
+        self.player.set_speed(self.speed)
+        self.speed_label.config(text=f"{self.speed:,.0f}" if self.speed >= 10 else f"{self.speed:.1f}")
+
+    def on_start_node_change(self, event=None):
+        self.start_node = int(self.start_node_var.get())
+        self.draw_selection()
+
+    def on_target_node_change(self, event=None):
+        value = self.target_node_var.get()
+        self.target_node = None if value == "None" else int(value)
+        self.draw_selection()
+
+    def draw_selection(self):
+        """空闲时用外圈标出起点和终点，多源模式下标出所有源点（换了选择后旧的回放和增量状态不再有效）"""
+        self.clear_timeline()
+        self.sync_graph()
+        self.incremental = None
+        self.edit_anchor = None
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        if self.mode_var.get() == BFS_MODES[5]:
+            rings[self.seeds] = True
+        else:
+            for node in (self.start_node, self.target_node):
+                if node is not None:
+                    rings[node] = True
+        self.artists.update(state_codes(self.graph.num_nodes), rings=rings)
+
+    def parse_seeds(self):
+        """把源点输入框中的编号（逗号或空格分隔）解析成节点列表，去掉重复"""
+        seeds = []
+        for token in self.seeds_var.get().replace(",", " ").split():
+            node = int(token)
+            if not 0 <= node < self.graph.num_nodes:
+                raise ValueError(f"node {node} out of range")
+            if node not in seeds:
+                seeds.append(node)
+        return seeds
+
+    def on_seeds_change(self):
+        try:
+            self.seeds = self.parse_seeds()
+        except ValueError as e:
+            self.status_var.set(f"Invalid seeds: {str(e)}")
+            return
+        self.status_var.set(f"{len(self.seeds)} seed(s): {format_nodes(self.seeds)}")
+        self.draw_selection()
+
+    def toggle_seed(self, node):
+        if node in self.seeds:
+            self.seeds.remove(node)
+        else:
+            self.seeds.append(node)
+        self.seeds_var.set(", ".join(map(str, self.seeds)))
+        self.status_var.set(f"{len(self.seeds)} seed(s): {format_nodes(self.seeds)}. "
+                            f"Click more nodes or 'Start BFS' to begin.")
+        self.draw_selection()
+
+    def clear_seeds(self):
+        self.seeds = []
+        self.seeds_var.set("")
+        self.draw_selection()
 
     def on_canvas_click(self, event):
-        """处理画布点击事件，选择起点"""
+        """处理画布点击事件：第一次点击选择起点，第二次点击选择终点"""
+        # 右键/中键用于平移视野（GraphArtists 处理）
+        if event.button != 1:
+            return
         if self.is_running:
             return
 
-        # 检查是否点击了节点
-        for node, (x, y) in self.nodes.items():
-            distance = math.sqrt((event.xdata - x) ** 2 + (event.ydata - y) ** 2)
-            if distance <= self.node_radius:
-                self.start_node = node
-                self.start_node_var.set(str(node))
-                self.status_var.set(f"Start node set to {node}. Click 'Start BFS' to begin.")
-                self.draw_graph()
-                break
+        # 用网格索引查找被点击的节点（点在坐标轴外时 xdata 为 None）
+        node = self.hit_index.nearest(event.xdata, event.ydata, self.artists.pick_radius())
+        if node is None:
+            return
+        if self.mode_var.get() == BFS_MODES[5]:
+            # 多源模式：点击添加/移除源点
+            self.toggle_seed(node)
+            return
+        if self.incremental is not None:
+            # 增量模式：依次点击两个端点添加/删除边
+            self.edit_click(node)
+            return
+        if self.click_selects_target and node != self.start_node:
+            self.target_node = node
+            self.target_node_var.set(str(node))
+            self.click_selects_target = False
+            self.status_var.set(f"Target node set to {node}. "
+                                f"Select '{BFS_MODES[2]}' mode to search {self.start_node} -> {node}.")
+        else:
+            self.start_node = node
+            self.start_node_var.set(str(node))
+            self.click_selects_target = True
+            self.status_var.set(f"Start node set to {node}. Click another node to set the target, "
+                                f"or 'Start BFS' to begin.")
+        self.draw_selection()
+
+    def on_canvas_motion(self, event):
+        """鼠标悬停的节点加一个外圈"""
+        node = None
+        if event.inaxes is self.ax:
+            node = self.hit_index.nearest(event.xdata, event.ydata, self.artists.pick_radius())
+        self.artists.set_hover(node)
 
     def start_bfs(self):
         if self.is_running or self.start_node is None:
             return
+        self.sync_graph()
+        if self.mode_var.get() == BFS_MODES[7]:
+            self.start_incremental()
+            return
+        if self.mode_var.get() == BFS_MODES[5]:
+            try:
+                self.seeds = self.parse_seeds() or [self.start_node]
+            except ValueError as e:
+                self.status_var.set(f"Invalid seeds: {str(e)}")
+                return
+
+        # 先取消并回收可能残留的旧任务，再初始化状态
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
 
         self.is_running = True
-        self.paused = False
-        self.stop_flag = False
         self.start_button.config(state="disabled")
-        self.pause_button.config(state="normal")
-        self.status_var.set("Running BFS...")
+        self.status_var.set("Computing BFS...")
 
         # 初始化BFS状态
         self.visited = set()
-        self.queue = deque([self.start_node])
         self.visited_order = []
+        self.result = None
+        self.path_result = None
+        self.heap_canvas.delete("all")
 
-        # 在新线程中运行BFS算法
-        self.bfs_thread = Thread(target=self.run_bfs)
-        self.bfs_thread.daemon = True
-        self.bfs_thread.start()
-
-    def pause_bfs(self):
-        if self.paused:
-            self.paused = False
-            self.pause_button.config(text="Pause")
-            self.status_var.set("Running BFS...")
-        else:
-            self.paused = True
-            self.pause_button.config(text="Resume")
-            self.status_var.set("Paused")
+        # 在后台任务中运行算法并生成时间线，完成后在界面线程中回放
+        # Tk 变量只能在界面线程中读取，方向切换阈值随任务参数一起传入
+        self.jobs.submit(self.run_bfs, self.mode_var.get(), self.alpha_var.get(), self.beta_var.get())
 
     def reset(self):
-        self.stop_flag = True
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
+        self.sync_graph()
+        self.incremental = None
+        self.edit_anchor = None
         self.is_running = False
-        self.paused = False
         self.start_button.config(state="normal")
-        self.pause_button.config(state="disabled", text="Pause")
         self.status_var.set("Ready - Click a node to set as start node")
+        self.heap_canvas.delete("all")
         self.draw_graph()
 
-    def run_bfs(self):
-        """执行BFS算法并更新可视化"""
+    def run_bfs(self, token, mode, alpha, beta):
+        """在后台计算遍历结果并展开成时间线"""
         try:
-            while self.queue and not self.stop_flag:
-                # 处理暂停
-                while self.paused and not self.stop_flag:
-                    time.sleep(0.1)
-
-                if self.stop_flag:
-                    break
-
-                # 从队列中取出当前节点
-                current_node = self.queue.popleft()
-
-                # 标记为已访问
-                self.visited.add(current_node)
-                self.visited_order.append(current_node)
-
-                # 更新可视化 - 显示当前节点
-                queue_set = set(self.queue)
-                self.root.after(0, self.draw_graph, current_node, self.visited, queue_set)
-                self.root.after(0, self.status_var.set, f"Visiting node {current_node}")
-                time.sleep(1.0 / self.speed)
-
-                # 处理暂停
-                while self.paused and not self.stop_flag:
-                    time.sleep(0.1)
-
-                if self.stop_flag:
-                    break
+            n = self.graph.num_nodes
+            compare = None
+            if mode in (BFS_MODES[2], BFS_MODES[4]) and self.target_node is None:
+                title = "Bidirectional BFS" if mode == BFS_MODES[2] else "A* Search"
+                self.ui.post_control(messagebox.showinfo, title,
+                                     "Click a second node (or use 'Target Node') to choose the target first.")
+                self.ui.post_control(self.reset)
+                return
+
+            # 同一张图、同样的起点终点和参数算过一次后，结果和时间线直接从磁盘缓存读取
+            if mode == BFS_MODES[1]:
+                params = (alpha, beta)
+            elif mode == BFS_MODES[4]:
+                params = (self.positions,)  # A* 的启发函数用节点坐标
+            elif mode == BFS_MODES[5]:
+                params = (tuple(self.seeds),)
+            else:
+                params = ()
+            key = make_key("bfs-timeline", mode, self.graph, self.start_node, self.target_node, *params)
+            cached = shared_cache().get_trace(key)
+            if cached is not None:
+                result, timeline, compare = cached
+                self.ui.post_control(self.timeline_ready, mode, result, timeline, compare)
+                return
+
+            if mode == BFS_MODES[2]:
+                result = bidirectional_bfs(self.graph, self.start_node, self.target_node)
+                timeline = bidirectional_timeline(result, n,
+                                                  {FORWARD: STATE_FORWARD, BACKWARD: STATE_BACKWARD},
+                                                  {FORWARD: STATE_VISITED, BACKWARD: STATE_BACKWARD_VISITED})
+            elif mode in BFS_MODES[5:7]:
+                if mode == BFS_MODES[5]:
+                    result = multi_source_bfs(self.graph, self.seeds)
+                else:
+                    result = component_sweep(self.graph)
+                timeline = bfs_timeline(result, n, STATE_QUEUED, self.label_codes(result))
+            elif mode in BFS_MODES[3:5]:
+                if mode == BFS_MODES[4]:
+                    result = astar(self.graph, self.start_node, self.target_node, self.positions)
+                else:
+                    result = dijkstra(self.graph, self.start_node)
+                # 同一张图上的 BFS（忽略边权），用于对比开销
+                compare = bfs_levels(self.graph, self.start_node)
+                timeline = shortest_path_timeline(result, n, STATE_QUEUED, STATE_VISITED)
+            else:
+                if mode == BFS_MODES[1]:
+                    result = bfs_direction_optimizing(self.graph, self.start_node,
+                                                      alpha=alpha, beta=beta)
+                else:
+                    result = bfs_levels(self.graph, self.start_node)
+                timeline = bfs_timeline(result, n, STATE_QUEUED, STATE_VISITED)
+            token.check()
+            self.ui.post_control(self.timeline_ready, mode, result, timeline, compare)
+            shared_cache().put_trace(key, (result, timeline, compare))
 
-                # 将未访问的邻居加入队列
-                for neighbor in self.graph[current_node]:
-                    if neighbor not in self.visited and neighbor not in self.queue:
-                        self.queue.append(neighbor)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
+            self.ui.post_control(self.reset)
+
+    # --- 时间线回放 ---
+
+    def timeline_ready(self, mode, result, timeline, compare):
+        self.run_mode = mode
+        if mode == BFS_MODES[2]:
+            self.bidirectional_result = result
+            self.visited_order = np.concatenate([frontier for _, frontier in result.steps])
+        elif mode in BFS_MODES[3:5]:
+            self.path_result = result
+            self.bfs_compare = compare
+            self.visited_order = result.settled
+        elif mode in BFS_MODES[5:7]:
+            self.label_result = result
+            self.visited_order = result.order
+        else:
+            self.result = result
+            self.visited_order = result.order
+        self.visited = self.visited_order
+
+        self.timeline = timeline
+        self.scrubber.config(to=max(len(timeline), 1))
+        self.player.load(timeline)
+        self.player.play()
+
+    def clear_timeline(self):
+        self.player.load(None)
+        self.timeline = None
+        self.step_var.set(0)
+        self.step_label.config(text="0 / 0")
+
+    def toggle_play(self):
+        if self.timeline is None:
+            self.start_bfs()
+        else:
+            self.player.toggle()
+
+    def on_play_state(self, playing):
+        self.play_button.config(text="Pause" if playing else "Play")
+        self.is_running = playing
+        self.start_button.config(state="disabled" if playing else "normal")
+
+    def on_scrub(self, value):
+        step = int(float(value))
+        if self.timeline is not None and step != self.player.step:
+            self.player.pause()
+            self.player.seek(step)
+
+    def show_step(self, step):
+        """绘制时间线的第 step 步（最后一步显示完成后的结果）"""
+        timeline = self.timeline
+        total = len(timeline)
+        self.step_var.set(step)
+        self.step_label.config(text=f"{step} / {total}")
+        if step >= total:
+            if self.run_mode == BFS_MODES[2]:
+                self.bidirectional_completed()
+            elif self.run_mode in BFS_MODES[3:5]:
+                self.shortest_path_completed(self.run_mode, self.bfs_compare)
+            elif self.run_mode in BFS_MODES[5:7]:
+                self.labels_completed(self.run_mode)
+            else:
+                self.bfs_completed()
+            return
 
-                # 更新可视化 - 显示队列中的节点
-                queue_set = set(self.queue)
-                self.root.after(0, self.draw_graph, current_node, self.visited, queue_set)
-                self.root.after(0, self.status_var.set,
-                                f"Visited node {current_node}. Queue: {list(self.queue)}")
-                time.sleep(1.0 / self.speed)
+        codes = timeline.state_at(step)
+        current = timeline.current_at(step)
+        if current is not None:
+            codes[current] = STATE_CURRENT
+        self.artists.update(codes)
+        if self.run_mode in BFS_MODES[3:5]:
+            result = self.path_result
+            settled = timeline.count_before(EV_DEQUEUE, step)
+            self.draw_heap_sizes(result.heap_sizes[:settled], result.num_settled, result.max_heap_size)
+        self.status_var.set(f"Step {step}/{total}: {self.describe_step(step)}")
+
+    def describe_step(self, step):
+        event = self.timeline.event(step)
+        if event is None:
+            return "press Play, step with < >, or drag the slider"
+        kind, node, other, detail = event
+        mode = self.run_mode
+
+        if mode == BFS_MODES[2]:
+            side = self.bidirectional_result.steps[detail][0]
+            if kind == EV_ENQUEUE:
+                return f"expansion {detail}: node {node} joins the {side} frontier"
+            return f"expansion {detail}: node {node} leaves the {side} frontier"
+
+        if mode in BFS_MODES[3:5]:
+            result = self.path_result
+            if kind == EV_DEQUEUE:
+                settled = self.timeline.count_before(EV_DEQUEUE, step)
+                return (f"{mode}: settle node {node} at distance {result.distances[node]:g}, "
+                        f"heap size {result.heap_sizes[settled - 1]}")
+            if kind == EV_ENQUEUE:
+                if other < 0:
+                    return f"{mode}: push start node {node}"
+                return f"{mode}: relax {other} -> {node}, push {node}"
+            return f"{mode}: node {node} settled"
+
+        if mode in BFS_MODES[5:7]:
+            result = self.label_result
+            depth = int(result.distances[node])
+            owner = int(result.sources[result.labels[node]])
+            region = f"seed {owner}" if mode == BFS_MODES[5] else f"component {result.labels[node]} (from {owner})"
+            if kind == EV_DEQUEUE:
+                return f"level {depth}: dequeue {node}, {region}"
+            if kind == EV_ENQUEUE:
+                if other < 0:
+                    return f"enqueue {region}"
+                return f"level {depth}: enqueue {node} (parent {other}), {region}"
+            return f"level {depth}: node {node} visited, {region}"
+
+        result = self.result
+        depth = int(result.distances[node])
+        if kind == EV_DEQUEUE:
+            direction = result.directions[depth] if depth < len(result.directions) else ""
+            examined = result.edges_examined[depth] if depth < len(result.edges_examined) else 0
+            return (f"level {depth} [{direction}]: dequeue {node} "
+                    f"(level has {len(result.levels[depth])} nodes, {examined} edges examined)")
+        if kind == EV_ENQUEUE:
+            if other < 0:
+                return f"enqueue start node {node}"
+            return f"level {depth}: enqueue {node} (parent {other})"
+        return f"level {depth}: node {node} visited"
+
+    def draw_heap_sizes(self, sizes, total_steps, peak):
+        """在小画布上画出到目前为止每一步出堆后的堆大小"""
+        canvas = self.heap_canvas
+        canvas.delete("all")
+        if len(sizes) == 0:
+            return
+        width, height = int(canvas['width']), int(canvas['height'])
+        peak = max(peak, 1)
+        coords = []
+        for i, size in enumerate(sizes):
+            coords.append(2 + (width - 4) * i / max(total_steps - 1, 1))
+            coords.append(height - 2 - (height - 4) * size / peak)
+        if len(coords) == 2:
+            coords += coords
+        canvas.create_line(*coords, fill='steelblue', width=2)
+        canvas.create_text(width - 2, 2, text=f"max {peak}", anchor=tk.NE, font=("Arial", 7))
+
+    def bidirectional_completed(self):
+        result = self.bidirectional_result
+        visited = {FORWARD: [], BACKWARD: []}
+        for side, frontier in result.steps:
+            visited[side].append(frontier)
+
+        codes = state_codes(self.graph.num_nodes,
+                            (np.concatenate(visited[BACKWARD]), STATE_BACKWARD_VISITED),
+                            (np.concatenate(visited[FORWARD]), STATE_VISITED))
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        rings[result.path] = True
+        self.artists.update(codes, rings=rings, path=result.path)
+
+        if result.distance < 0:
+            summary = f"No path from {result.source} to {result.target}."
+        else:
+            summary = f"Distance {result.source} -> {result.target}: {result.distance}, path {result.path}."
+        self.status_var.set(f"{summary} Touched {result.touched_forward} (forward) + "
+                            f"{result.touched_backward} (backward) = {result.touched} nodes, "
+                            f"one-sided BFS: {result.one_sided_touched}")
+
+    def shortest_path_completed(self, mode, bfs_result):
+        result = self.path_result
+        self.draw_heap_sizes(result.heap_sizes, result.num_settled, result.max_heap_size)
+
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        path = []
+        if self.target_node is not None:
+            path = result.path_to(self.target_node)
+            rings[path] = True
+        self.artists.update(state_codes(self.graph.num_nodes, (self.visited_order, STATE_VISITED)),
+                            rings=rings, path=path)
+
+        if self.target_node is None:
+            summary = f"{mode} completed, settled {result.num_settled} nodes."
+        elif not path:
+            summary = f"No path from {self.start_node} to {self.target_node}."
+        else:
+            summary = (f"Distance {self.start_node} -> {self.target_node}: "
+                       f"{result.distances[self.target_node]:g}, path {path}.")
+        self.status_var.set(f"{summary} Relaxations {result.relaxations}, heap pushes {result.pushes}, "
+                            f"pops {result.pops} ({result.stale_pops} stale), max heap {result.max_heap_size}; "
+                            f"BFS examined {int(bfs_result.edges_examined.sum())} edges, "
+                            f"Dijkstra/A* {result.edges_examined}")
+
+    def label_codes(self, result):
+        """多源/分量扫描完成后每个节点的状态编码：按最近源点（所在分量）的颜色"""
+        return np.where(result.labels >= 0, STATE_LABEL + result.labels % len(LABEL_PALETTE), STATE_UNVISITED)
+
+    def labels_completed(self, mode):
+        result = self.label_result
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        sizes = result.region_sizes()
+        if mode == BFS_MODES[5]:
+            rings[result.sources] = True
+            regions = ", ".join(f"{seed}: {size}"
+                                for seed, size in zip(result.sources[:10].tolist(), sizes[:10].tolist()))
+            if len(sizes) > 10:
+                regions += f", ... (+{len(sizes) - 10})"
+            summary = (f"Multi-source BFS from {len(result.sources)} seed(s): reached {result.num_reached} of "
+                       f"{self.graph.num_nodes} nodes, max distance {result.depth}; nodes per seed: {regions}")
+        else:
+            summary = (f"Components sweep: {len(sizes)} component(s), largest {int(sizes.max())} nodes, "
+                       f"{int((sizes == 1).sum())} isolated; {result.depth + 1} levels, "
+                       f"{int(result.edges_examined.sum())} edges examined")
+        self.artists.update(self.label_codes(result), rings=rings, path=[])
+        self.status_var.set(summary)
 
-            if not self.stop_flag:
-                self.root.after(0, self.bfs_completed)
+    def bfs_completed(self):
+        self.status_var.set(f"BFS completed! Visited order: {format_nodes(self.visited_order)}, "
+                            f"levels: {self.result.level_sizes.tolist()}, "
+                            f"directions: {self.result.directions}, "
+                            f"{int(self.result.edges_examined.sum())} edges examined")
+        self.draw_graph(visited=self.visited)
+        # 统计窗口开着时换成这次遍历的统计
+        if self.stats_window is not None and self.stats_window.alive and self.stats_shown is not self.result:
+            self.show_stats()
+
+    # --- 增量编辑 ---
+
+    def start_incremental(self):
+        """从起点做一次完整 BFS，之后每次编辑只修复受影响的部分（不生成时间线，直接显示结果）"""
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
+        self.heap_canvas.delete("all")
+        self.run_mode = BFS_MODES[7]
+        self.incremental = IncrementalBFS(self.graph, self.start_node)
+        self.graph_version = 0
+        self.edit_anchor = None
+        self.draw_incremental()
+        self.status_var.set(f"Incremental BFS from {self.start_node}: {self.incremental.reached} nodes reachable. "
+                            f"Click two nodes to add/remove an edge, or select a node and 'Delete Node'.")
+
+    def draw_incremental(self, changed=()):
+        """可达节点为绿色，上一次编辑改变了距离的节点为黄色，删除的节点为灰色；外圈标出起点和选中的节点"""
+        incremental = self.incremental
+        n = incremental.graph.num_nodes
+        codes = state_codes(n, (np.flatnonzero(incremental.distances >= 0), STATE_VISITED),
+                            (list(changed), STATE_QUEUED), (sorted(incremental.graph.deleted), STATE_DELETED))
+        rings = np.zeros(n, dtype=bool)
+        rings[incremental.source] = True
+        if self.edit_anchor is not None:
+            rings[self.edit_anchor] = True
+        self.artists.update(codes, rings=rings, path=[])
+
+    def edit_click(self, node):
+        """第一次点击选中一个端点，第二次点击在两个端点之间加边（已有边则删除）"""
+        if node in self.incremental.graph.deleted:
+            return
+        anchor = self.edit_anchor
+        if anchor is None or anchor == node:
+            self.edit_anchor = None if anchor == node else node
+            self.draw_incremental()
+            if self.edit_anchor is not None:
+                self.status_var.set(f"Node {node} selected (distance {self.incremental.dist[node]}): click another "
+                                    f"node to add/remove an edge, or 'Delete Node'.")
+            return
+        self.edit_anchor = None
+        dynamic = self.incremental.graph
+        if dynamic.has_edge(anchor, node):
+            stats = self.incremental.remove_edge(anchor, node)
+            self.apply_edit(f"Removed edge {anchor} - {node}", stats, removed=[(anchor, node)])
+        else:
+            # 有向图中已有反向边时两点之间已经画了线段
+            weight = float(random.randint(1, 10))
+            added = [] if dynamic.has_edge(node, anchor) else [(anchor, node, weight)]
+            stats = self.incremental.add_edge(anchor, node, weight)
+            self.apply_edit(f"Added edge {anchor} - {node} (weight {weight:g})", stats, added=added)
+
+    def edit_add_node(self):
+        """在当前视野中心附近添加一个孤立节点"""
+        if self.incremental is None:
+            self.status_var.set(f"Select '{BFS_MODES[7]}' mode and press 'Start BFS' to edit the graph.")
+            return
+        node, stats = self.incremental.add_node()
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        center = np.array([np.mean(xlim), np.mean(ylim)])
+        jitter = np.random.uniform(-1, 1, 2) * self.node_radius * 2
+        self.positions = self.default_positions = np.vstack([self.positions, center + jitter])
+        self.artists.add_node(center + jitter)
+        self.hit_index.update(self.positions, cell_size=2 * self.node_radius)
+        self.node_count = self.incremental.graph.num_nodes
+        choices = [str(i) for i in range(min(self.node_count, NODE_CHOICE_LIMIT))]
+        self.start_node_combo['values'] = choices
+        self.target_node_combo['values'] = ["None"] + choices
+        self.apply_edit(f"Added node {node}", stats)
+
+    def edit_delete_node(self):
+        """删除选中的节点及其所有边（起点不能删除）"""
+        if self.incremental is None or self.edit_anchor is None:
+            self.status_var.set("Click a node first, then 'Delete Node'.")
+            return
+        node, self.edit_anchor = self.edit_anchor, None
+        dynamic = self.incremental.graph
+        edges = [(node, v) for v in dynamic.neighbors(node)]
+        if dynamic.directed:
+            edges += [(w, node) for w in dynamic.in_neighbors(node)]
+        try:
+            stats = self.incremental.remove_node(node)
+        except ValueError as e:
+            self.status_var.set(f"Cannot delete node {node}: {str(e)}")
+            self.draw_incremental()
+            return
+        self.apply_edit(f"Deleted node {node}", stats, removed=edges)
 
+    def apply_edit(self, summary, stats, added=(), removed=()):
+        """
+        编辑后只在图形对象中增删对应的线段，标出距离变化的节点。
+        DynamicGraph 是编辑时的图，合并成 CSR 等到下一次整图遍历、统计或重建图形对象时（sync_graph）
+        """
+        self.layout_jobs.cancel()
+        self.result = None
+        dynamic = self.incremental.graph
+        for u, v in removed:
+            # 有向图中反向的边还在时保留线段
+            if not dynamic.has_edge(v, u):
+                self.artists.remove_edge(u, v)
+        for u, v, weight in added:
+            self.artists.add_edge(u, v, label=weight)
+        self.artists.refresh()
+        self.draw_incremental(stats["changed"])
+
+        totals = self.incremental.totals
+        self.status_var.set(f"{summary}: repair touched {stats['touched']} node(s), {stats['edges_scanned']} "
+                            f"edge(s) scanned, {len(stats['changed'])} distance(s) changed "
+                            f"(full BFS: {stats['full']} nodes). Total over {totals['edits']} edit(s): "
+                            f"{totals['touched']} vs {totals['full']} nodes")
+        if self.stats_window is not None and self.stats_window.alive:
+            self.show_stats()
+
+    def sync_graph(self):
+        """把增量编辑后的 DynamicGraph 合并成 self.graph（没有新的编辑时不做任何事）"""
+        if self.incremental is not None and self.incremental.graph.version != self.graph_version:
+            self.graph = self.incremental.graph.to_csr()
+            self.graph_version = self.incremental.graph.version
+            self.node_count = self.graph.num_nodes
+
+    # --- 遍历统计 ---
+
+    def stats_source(self):
+        """统计使用的 BFS 结果：当前的层同步/方向优化 BFS；其他模式在后台从起点重新做一次 BFS"""
+        if self.run_mode in BFS_MODES[:2] and self.result is not None and self.result.source == self.start_node:
+            return self.result
+        return None
+
+    def show_stats(self):
+        """打开（或刷新）统计窗口，统计结果在后台计算"""
+        if self.graph is None or self.start_node is None:
+            return
+        self.sync_graph()
+        if self.stats_window is None or not self.stats_window.alive:
+            self.stats_window = StatsWindow(self.root, "BFS Statistics")
+        self.stats_window.wait()
+        self.stats_shown = self.stats_source()
+        self.stats_jobs.submit(self.run_stats, self.graph, self.stats_shown, self.start_node)
+
+    def run_stats(self, token, graph, result, source):
+        """后台任务：层统计、度分布、连通分量和采样离心率（同一张图同一次遍历只算一次）"""
+        try:
+            parts = () if result is None else (result.edges_examined, tuple(result.directions))
+            key = make_key("bfs-stats", graph, source, *parts)
+            stats = shared_cache().get_trace(key)
+            if stats is None:
+                stats = traversal_stats(graph, result=result, source=source)
+                token.check()
+                shared_cache().put_trace(key, stats)
+            self.ui.post_control(self.stats_ready, graph, stats)
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {str(e)}"))
-            self.root.after(0, self.reset)
+            self.ui.post_control(messagebox.showerror, "Statistics", f"An error occurred: {str(e)}")
 
-    def bfs_completed(self):
-        self.is_running = False
-        self.start_button.config(state="normal")
-        self.pause_button.config(state="disabled")
-        self.status_var.set(f"BFS completed! Visited order: {self.visited_order}")
-        self.draw_graph(visited=self.visited)
+    def stats_ready(self, graph, stats):
+        if graph is not self.graph or self.stats_window is None or not self.stats_window.alive:
+            return
+        self.stats_window.show(stats)
+        if not self.is_running:
+            self.status_var.set(f"Statistics: {summarize(stats)}")
 
 
 def main():
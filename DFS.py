@@ -1,14 +1,47 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.patches import Circle
 import numpy as np
-import random
-import time
-from threading import Thread
-import math
+import os
+from ui_channel import UIUpdateChannel
+from graph_core import circular_layout
+from graph_generators import GRAPH_KINDS
+from graph_io import FILE_TYPES
+from graph_cache import shared_cache, make_key, cached_generate, cached_import
+from graph_layout import LAYOUT_KINDS, force_directed_steps, get_cached_layout, store_layout
+from spatial_index import GridIndex
+from graph_artists import GraphArtists, state_codes, format_nodes, fit_node_radius
+from raster_renderer import RENDERER_KINDS, choose_renderer, replace_artists
+from dfs_engine import (dfs, EDGE_KIND_NAMES,
+                        strongly_connected_components, topological_sort, articulation_points_and_bridges)
+from timeline import TimelinePlayer, dfs_timeline, EV_PUSH, EV_EDGE
+from job_manager import JobManager
+from traversal_stats import traversal_stats, summarize
+from stats_window import StatsWindow
+
+# 节点状态编码及对应颜色
+STATE_UNVISITED, STATE_STACKED, STATE_VISITED, STATE_CURRENT = range(4)
+NODE_PALETTE = ['lightblue', 'yellow', 'green', 'red']
+
+# 起点/终点下拉框最多列出的节点数（导入的大图用鼠标点击选择节点）
+NODE_CHOICE_LIMIT = 1000
+
+# 力导向布局的迭代次数和每帧间隔（秒）
+LAYOUT_ITERATIONS = 120
+LAYOUT_FRAME_INTERVAL = 0.02
+
+# 图分析模式；分量着色时循环使用 tab20 的颜色
+ANALYSIS_MODES = ["Strongly connected components", "Topological order", "Articulation points & bridges"]
+COMPONENT_PALETTE = [plt.cm.tab20(i) for i in range(20)]
+# 拓扑序着色：排名按比例量化到 256 级 viridis 颜色（节点编码是 int16，不能直接用排名）
+TOPO_LEVELS = 256
+TOPO_PALETTE = plt.cm.viridis(np.linspace(0, 1, TOPO_LEVELS))
+
+# 回放速度（每秒事件数）滑块的范围，按 10 的幂取值
+SPEED_EXPONENTS = (-0.5, 5.0)
 
 
 class DFSVisualizer:
@@ -18,22 +51,36 @@ class DFSVisualizer:
         self.root.geometry("1000x700")
 
         # 图数据结构
-        self.graph = {}
-        self.nodes = {}  # 节点位置信息
-        self.edges = []  # 边信息
+        self.graph = None  # CSRGraph
+        self.positions = np.zeros((0, 2))  # 节点位置信息 (n, 2)
+        self.default_positions = self.positions  # 生成器给出的坐标或圆形排列
+        self.hit_index = GridIndex(self.positions)  # 点击/悬停的命中测试
         self.node_radius = 30
         self.node_count = 8  # 默认节点数量
+        self.node_ids = None  # 导入的图：节点 i 在文件中的原始编号
 
         # 算法状态
-        self.speed = 0.5
-        self.is_running = False
-        self.paused = False
-        self.stop_flag = False
+        self.speed = 10.0  # 回放速度：每秒事件数
+        self.is_running = False  # 正在计算或正在回放
         self.start_node = None
         self.visited_order = []
         self.visited = set()
-        self.stack = []  # DFS使用栈而不是队列
-        self.current_path = []  # 当前路径
+        self.trace = None  # DFSTrace
+        self.timeline = None  # 当前可回放的时间线
+
+        # 工作线程 -> 界面的更新通道
+        self.ui = UIUpdateChannel(self.root)
+        # 后台任务（每次运行一个可取消的任务）
+        self.jobs = JobManager("dfs")
+        # 力导向布局在单独的后台任务中逐步计算，使用独立的更新通道，重置算法时不会被清空
+        self.layout_jobs = JobManager("dfs-layout")
+        self.layout_ui = UIUpdateChannel(self.root)
+        # 预先计算好的时间线在界面线程中按时钟回放，可以暂停、单步和拖动
+        self.player = TimelinePlayer(self.root, self.show_step, self.on_play_state, self.speed)
+        # 遍历统计在单独的后台任务中计算，结果显示在统计窗口中
+        self.stats_jobs = JobManager("dfs-stats")
+        self.stats_window = None
+        self.stats_shown = None  # 统计窗口当前显示的遍历结果
 
         # 创建UI
         self.setup_ui()
@@ -41,6 +88,19 @@ class DFSVisualizer:
         # 初始化图
         self.generate_graph()
 
+        # 窗口关闭时停止后台任务
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+
+    def on_destroy(self, event):
+        """窗口销毁：关闭更新通道，取消并回收遍历、布局和统计任务"""
+        # 子控件的销毁事件也会传到窗口上
+        if event.widget is not self.root:
+            return
+        for channel in (self.ui, self.layout_ui):
+            channel.close()
+        for jobs in (self.jobs, self.layout_jobs, self.stats_jobs):
+            jobs.shutdown()
+
     def setup_ui(self):
         # 创建主容器
         main_frame = ttk.Frame(self.root, padding="10")
@@ -64,7 +124,7 @@ class DFSVisualizer:
         # 节点数量控制
         ttk.Label(algo_control_frame, text="Number of Nodes:").grid(row=0, column=0, sticky=tk.W)
         self.node_var = tk.IntVar(value=self.node_count)
-        node_scale = ttk.Scale(algo_control_frame, from_=5, to=15, variable=self.node_var,
+        node_scale = ttk.Scale(algo_control_frame, from_=5, to=200, variable=self.node_var,
                                orient=tk.HORIZONTAL, command=self.on_node_count_change)
         node_scale.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
         self.node_label = ttk.Label(algo_control_frame, text=str(self.node_count))
@@ -72,7 +132,7 @@ class DFSVisualizer:
 
         # 生成新图按钮
         ttk.Button(algo_control_frame, text="Generate New Graph",
-                   command=self.generate_graph).grid(row=0, column=3, padx=(10, 0))
+                   command=lambda: self.generate_graph(fresh=True)).grid(row=0, column=3, padx=(10, 0))
 
         # 起点选择
         ttk.Label(algo_control_frame, text="Start Node:").grid(row=0, column=4, sticky=tk.W, padx=(20, 0))
@@ -81,41 +141,99 @@ class DFSVisualizer:
                                              state="readonly", width=5)
         self.start_node_combo.grid(row=0, column=5, padx=(5, 10))
 
+        # 图分析（基于同一份 DFS 轨迹）
+        ttk.Label(algo_control_frame, text="Analysis:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.analysis_var = tk.StringVar(value=ANALYSIS_MODES[0])
+        analysis_combo = ttk.Combobox(algo_control_frame, textvariable=self.analysis_var,
+                                      values=ANALYSIS_MODES, state="readonly", width=28)
+        analysis_combo.grid(row=1, column=1, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+        self.analyze_button = ttk.Button(algo_control_frame, text="Analyze", command=self.start_analysis)
+        self.analyze_button.grid(row=1, column=3, padx=(10, 0), pady=(5, 0))
+
+        # 图的类型（生成器）
+        ttk.Label(algo_control_frame, text="Graph Type:").grid(row=1, column=4, sticky=tk.W, padx=(20, 0),
+                                                               pady=(5, 0))
+        self.graph_kind_var = tk.StringVar(value=GRAPH_KINDS[0])
+        graph_kind_combo = ttk.Combobox(algo_control_frame, textvariable=self.graph_kind_var, values=GRAPH_KINDS,
+                                        state="readonly", width=16)
+        graph_kind_combo.grid(row=1, column=5, padx=(5, 10), pady=(5, 0))
+        graph_kind_combo.bind("<<ComboboxSelected>>", lambda event: self.generate_graph())
+
+        # 布局
+        ttk.Label(algo_control_frame, text="Layout:").grid(row=1, column=6, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        self.layout_var = tk.StringVar(value=LAYOUT_KINDS[0])
+        layout_combo = ttk.Combobox(algo_control_frame, textvariable=self.layout_var, values=LAYOUT_KINDS,
+                                    state="readonly", width=14)
+        layout_combo.grid(row=1, column=7, padx=(5, 10), pady=(5, 0))
+        layout_combo.bind("<<ComboboxSelected>>", lambda event: self.start_layout())
+
+        # 从文件导入图（边表 / 邻接表 / .npz / memmap 目录）
+        ttk.Button(algo_control_frame, text="Import Graph...",
+                   command=self.import_graph).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+
+        # 渲染方式：矢量（Matplotlib 对象）/ 光栅（NumPy 像素缓冲区），Auto 按节点数选择
+        ttk.Label(algo_control_frame, text="Renderer:").grid(row=2, column=4, sticky=tk.W, padx=(20, 0),
+                                                             pady=(5, 0))
+        self.renderer_var = tk.StringVar(value=RENDERER_KINDS[0])
+        renderer_combo = ttk.Combobox(algo_control_frame, textvariable=self.renderer_var, values=RENDERER_KINDS,
+                                      state="readonly", width=8)
+        renderer_combo.grid(row=2, column=5, sticky=tk.W, padx=(5, 10), pady=(5, 0))
+        renderer_combo.bind("<<ComboboxSelected>>", lambda event: self.on_renderer_change())
+
         # 画布区域
         self.figure = plt.Figure(figsize=(10, 5), dpi=100)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, main_frame)
         self.canvas.get_tk_widget().grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
         self.canvas.mpl_connect('button_press_event', self.on_canvas_click)
+        self.canvas.mpl_connect('motion_notify_event', self.on_canvas_motion)
+        self.artists = GraphArtists(self.ax, self.canvas, NODE_PALETTE, node_radius=self.node_radius)
 
         # 通用动画控制
         control_frame = ttk.LabelFrame(main_frame, text="Animation Controls", padding="10")
         control_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
 
-        # 速度控制
-        ttk.Label(control_frame, text="Speed:").grid(row=0, column=0, sticky=tk.W)
-        self.speed_var = tk.DoubleVar(value=self.speed)
-        speed_scale = ttk.Scale(control_frame, from_=0.1, to=2.0, variable=self.speed_var,
-                                orient=tk.HORIZONTAL, command=self.on_speed_change)
+        # 速度控制（每秒回放的事件数，对数刻度）
+        ttk.Label(control_frame, text="Steps/s:").grid(row=0, column=0, sticky=tk.W)
+        self.speed_var = tk.DoubleVar(value=np.log10(self.speed))
+        speed_scale = ttk.Scale(control_frame, from_=SPEED_EXPONENTS[0], to=SPEED_EXPONENTS[1],
+                                variable=self.speed_var, orient=tk.HORIZONTAL, command=self.on_speed_change)
         speed_scale.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
-        self.speed_label = ttk.Label(control_frame, text=f"{self.speed:.1f}x")
+        self.speed_label = ttk.Label(control_frame, text=f"{self.speed:,.0f}", width=8)
         self.speed_label.grid(row=0, column=2, padx=(0, 20))
 
         # 控制按钮
         self.start_button = ttk.Button(control_frame, text="Start DFS", command=self.start_dfs)
         self.start_button.grid(row=0, column=3, padx=(10, 5))
 
-        self.pause_button = ttk.Button(control_frame, text="Pause", command=self.pause_dfs, state="disabled")
-        self.pause_button.grid(row=0, column=4, padx=5)
-
         self.reset_button = ttk.Button(control_frame, text="Reset", command=self.reset)
-        self.reset_button.grid(row=0, column=5, padx=5)
+        self.reset_button.grid(row=0, column=4, padx=5)
+
+        # 遍历统计（层直方图、度分布、连通分量、离心率），可导出为 JSON
+        ttk.Button(control_frame, text="Statistics...", command=self.show_stats).grid(row=0, column=5, padx=5)
 
         # 状态显示
         self.status_var = tk.StringVar(value="Ready - Click a node to set as start node")
         status_label = ttk.Label(control_frame, textvariable=self.status_var)
         status_label.grid(row=0, column=6, padx=(20, 0))
 
+        # 回放控制：|< < Play > >| 和进度条
+        transport = ttk.Frame(control_frame)
+        transport.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Button(transport, text="|<", width=3, command=self.player.to_start).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text="<", width=3, command=lambda: self.player.step_by(-1)).pack(side=tk.LEFT, padx=1)
+        self.play_button = ttk.Button(transport, text="Play", width=6, command=self.toggle_play)
+        self.play_button.pack(side=tk.LEFT, padx=4)
+        ttk.Button(transport, text=">", width=3, command=lambda: self.player.step_by(1)).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text=">|", width=3, command=self.player.to_end).pack(side=tk.LEFT, padx=1)
+
+        self.step_var = tk.DoubleVar(value=0)
+        self.scrubber = ttk.Scale(control_frame, from_=0, to=1, variable=self.step_var,
+                                  orient=tk.HORIZONTAL, command=self.on_scrub)
+        self.scrubber.grid(row=1, column=1, columnspan=5, sticky=(tk.W, tk.E), padx=(5, 10), pady=(5, 0))
+        self.step_label = ttk.Label(control_frame, text="0 / 0")
+        self.step_label.grid(row=1, column=6, sticky=tk.W, padx=(20, 0), pady=(5, 0))
+
         # 算法说明
         explanation = """
 DFS Algorithm:
@@ -123,17 +241,23 @@ DFS Algorithm:
 2. Explore as far as possible along each branch before backtracking
 3. Use a stack to keep track of nodes to visit (or recursion)
 4. Mark visited nodes to avoid revisiting
+5. Every edge is classified as tree, back, forward or cross
 
 DFS vs BFS:
 - DFS goes deep into the graph, BFS explores level by level
 - DFS uses a stack, BFS uses a queue
 - DFS is better for pathfinding in deep graphs, BFS for shortest path
 
+Playback: 'Start DFS' records every step first; |< < Play > >| and the slider replay it
+View: scroll to zoom, drag with the right mouse button to pan, double right-click to reset
+
 Colors:
 - Blue: Unvisited nodes
 - Red: Currently processing node
 - Green: Visited nodes
 - Yellow: Nodes in the stack
+
+Analysis: components get one color each, cut vertices are ringed and bridges drawn in red
         """
         explanation_label = ttk.Label(main_frame, text=explanation, justify=tk.LEFT)
         explanation_label.grid(row=4, column=0, columnspan=3, pady=(10, 0), sticky=tk.W)
@@ -142,118 +266,149 @@ Colors:
         algo_control_frame.columnconfigure(1, weight=1)
         control_frame.columnconfigure(1, weight=1)
 
-    def generate_graph(self):
-        """生成随机图"""
-        self.node_count = self.node_var.get()
-        self.graph = {}
-        self.nodes = {}
-        self.edges = []
-
-        # 生成节点位置（圆形排列）
-        center_x, center_y = 500, 250
-        radius = 200
-
-        for i in range(self.node_count):
-            angle = 2 * math.pi * i / self.node_count
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            self.nodes[i] = (x, y)
-
-        # 生成随机边（确保图是连通的）
-        # 首先创建一个环保证连通性
-        for i in range(self.node_count):
-            self.graph[i] = []
-            next_node = (i + 1) % self.node_count
-            self.graph[i].append(next_node)
-            self.edges.append((i, next_node))
-
-        # 添加一些随机边
-        for i in range(self.node_count):
-            # 每个节点额外添加1-2条边
-            extra_edges = random.randint(1, 2)
-            for _ in range(extra_edges):
-                target = random.randint(0, self.node_count - 1)
-                if target != i and target not in self.graph[i] and (i, target) not in self.edges:
-                    self.graph[i].append(target)
-                    self.edges.append((i, target))
+    def generate_graph(self, fresh=False):
+        """生成随机图；fresh=False 时同样的类型和节点数沿用磁盘缓存中上一次生成的图"""
+        # 按选择的类型生成图（网格等图的实际节点数可能与滑块不同）
+        graph, positions = cached_generate(self.graph_kind_var.get(), self.node_var.get(), fresh=fresh)
+        self.node_ids = None
+        self.set_graph(graph, positions)
+
+    def set_graph(self, graph, positions=None):
+        """换上一张新图（生成或导入）：坐标、图形对象、起点选择和布局全部重新设置"""
+        # 旧图的布局任务不再需要
+        self.layout_jobs.cancel()
+        self.node_count = graph.num_nodes
+
+        # 生成节点位置：生成器没有给出坐标时圆形排列
+        if positions is None:
+            positions = circular_layout(self.node_count, center=(500, 250), radius=200)
+        self.positions = self.default_positions = positions
+        self.node_radius = fit_node_radius(self.positions)
+        self.artists.node_radius = self.node_radius
+        self.hit_index.update(self.positions, cell_size=2 * self.node_radius)
+
+        self.graph = graph
+        self.build_artists()
 
         # 更新起点选择框
-        self.start_node_combo['values'] = list(str(i) for i in range(self.node_count))
+        choices = [str(i) for i in range(min(self.node_count, NODE_CHOICE_LIMIT))]
+        self.start_node_combo['values'] = choices
         self.start_node_var.set("0")
         self.start_node = 0
 
-        # 重置算法状态
+        # 重置算法状态（旧图的遍历结果不再有效）
+        self.trace = None
         self.reset()
+        self.start_layout()
+        if self.stats_window is not None and self.stats_window.alive:
+            self.show_stats()
+
+    def build_artists(self):
+        """为当前图创建一次性的图形对象（边、节点、标签）"""
+        self.artists = replace_artists(self.artists, choose_renderer(self.renderer_var.get(), self.node_count))
+        src, dst = self.graph.undirected_edges()
+        self.artists.build(self.positions, src, dst,
+                           title=f"Depth-First Search - Graph with {self.node_count} nodes")
+
+    def on_renderer_change(self):
+        """换用另一种渲染方式：重新构建图形对象，再画出当前的状态"""
+        if self.graph is None:
+            return
+        self.build_artists()
+        if self.timeline is not None:
+            self.show_step(self.player.step)
+        else:
+            self.draw_graph()
 
     def draw_graph(self, current_node=None, visited=None, stack=None, path=None):
-        """绘制图"""
-        self.ax.clear()
-        self.ax.set_xlim(0, 1000)
-        self.ax.set_ylim(0, 500)
-        self.ax.set_aspect('equal')
-        self.ax.axis('off')
-
-        if visited is None:
-            visited = set()
-        if stack is None:
-            stack = set()
-        if path is None:
-            path = []
-
-        # 绘制边
-        for edge in self.edges:
-            node1, node2 = edge
-            x1, y1 = self.nodes[node1]
-            x2, y2 = self.nodes[node2]
-
-            # 检查是否是有向边（这里我们假设是无向图）
-            if (node2, node1) in self.edges and node1 > node2:
-                continue  # 避免重复绘制双向边
-
-            # 绘制边
-            line = plt.Line2D([x1, x2], [y1, y2], color='black', linewidth=2)
-            self.ax.add_line(line)
-
-        # 绘制节点
-        for node, (x, y) in self.nodes.items():
-            # 确定节点颜色
-            if node == current_node:
-                color = 'red'  # 当前正在处理的节点
-            elif node in visited:
-                color = 'green'  # 已访问的节点
-            elif node in stack:
-                color = 'yellow'  # 栈中的节点
-            else:
-                color = 'lightblue'  # 未访问的节点
-
-            # 绘制节点
-            circle = plt.Circle((x, y), self.node_radius, color=color, ec='black', linewidth=2)
-            self.ax.add_patch(circle)
-
-            # 添加节点标签
-            self.ax.text(x, y, str(node), fontsize=14, ha='center', va='center', fontweight='bold')
-
-            # 如果节点在当前路径中，添加路径标记
-            if node in path:
-                # 在节点周围添加一个橙色圆圈表示路径
-                path_circle = plt.Circle((x, y), self.node_radius + 5, color='orange', fill=False, linewidth=2)
-                self.ax.add_patch(path_circle)
+        """绘制图：只更新节点颜色、路径外圈和路径边"""
+        # 颜色优先级：当前节点 > 已访问 > 栈中 > 未访问
+        codes = state_codes(self.graph.num_nodes,
+                            (stack, STATE_STACKED),
+                            (visited, STATE_VISITED),
+                            (current_node, STATE_CURRENT))
+
+        # 当前路径中的节点加橙色外圈，并用橙色粗线连接
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        if path:
+            rings[path] = True
+        self.artists.update(codes, rings=rings, path=path)
+
+    # --- 布局 ---
+
+    def start_layout(self):
+        """按选择的布局放置节点：力导向布局优先使用缓存，否则在后台逐步计算"""
+        self.layout_jobs.cancel()
+        self.layout_ui.clear()
+        if self.layout_var.get() != LAYOUT_KINDS[1]:
+            self.layout_completed(self.graph, self.default_positions)
+            return
+        cached = get_cached_layout(self.graph)
+        if cached is not None:
+            self.layout_completed(self.graph, cached)
+            return
+        self.layout_jobs.submit(self.run_layout, self.graph, self.default_positions)
+
+    def run_layout(self, token, graph, initial):
+        """后台任务：每次迭代把新坐标交给界面线程，布局逐渐收敛"""
+        positions = initial
+        for positions in force_directed_steps(graph, initial, iterations=LAYOUT_ITERATIONS):
+            token.check()
+            self.layout_ui.post("layout", self.apply_layout, graph, positions)
+            token.sleep(LAYOUT_FRAME_INTERVAL)
+        store_layout(graph, positions)
+        self.layout_ui.post_control(self.layout_completed, graph, positions)
+
+    def apply_layout(self, graph, positions):
+        if graph is not self.graph:
+            return  # 图已经重新生成
+        self.positions = positions
+        self.hit_index.update(positions)
+        self.artists.set_positions(positions)
+
+    def layout_completed(self, graph, positions):
+        if graph is not self.graph:
+            return
+        self.node_radius = fit_node_radius(positions)
+        self.artists.node_radius = self.node_radius
+        self.hit_index.update(positions, cell_size=2 * self.node_radius)
+        self.apply_layout(graph, positions)
 
-        # 绘制当前路径（如果有）
-        if len(path) > 1:
-            for i in range(len(path) - 1):
-                node1, node2 = path[i], path[i + 1]
-                x1, y1 = self.nodes[node1]
-                x2, y2 = self.nodes[node2]
+    # --- 导入 ---
 
-                # 绘制路径边（橙色，更粗）
-                path_line = plt.Line2D([x1, x2], [y1, y2], color='orange', linewidth=4, alpha=0.7)
-                self.ax.add_line(path_line)
+    def import_graph(self):
+        """选择图文件，在后台读取，完成后替换当前图"""
+        if self.is_running:
+            return
+        path = filedialog.askopenfilename(title="Import Graph", filetypes=FILE_TYPES)
+        if not path:
+            return
+        self.reset()
+        self.is_running = True
+        self.start_button.config(state="disabled")
+        self.analyze_button.config(state="disabled")
+        self.status_var.set(f"Importing {os.path.basename(path)}...")
+        self.jobs.submit(self.run_import, path)
 
-        # 添加标题
-        self.ax.set_title(f"Depth-First Search - Graph with {self.node_count} nodes", fontsize=16)
+    def run_import(self, token, path):
+        """后台任务：流式读取并构建 CSR 图"""
+        try:
+            graph, node_ids = cached_import(path)
+            if graph.num_nodes == 0:
+                raise ValueError("the file contains no edges")
+            token.check()
+            self.ui.post_control(self.import_completed, path, graph, node_ids)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Import Graph", f"Could not import {os.path.basename(path)}:\n{str(e)}")
+            self.ui.post_control(self.reset)
 
-        self.canvas.draw()
+    def import_completed(self, path, graph, node_ids):
+        self.node_ids = node_ids
+        self.set_graph(graph)
+        kind = "directed" if graph.directed else "undirected"
+        self.status_var.set(f"Imported {os.path.basename(path)}: {graph.num_nodes} nodes, {graph.num_edges} "
+                            f"stored edges ({kind}); file ids {node_ids[0]}..{node_ids[-1]} "
+                            f"are shown as 0..{graph.num_nodes - 1}")
 
     def on_node_count_change(self, value):
         self.node_count = int(float(value))
@@ -261,153 +416,287 @@ Colors:
         self.generate_graph()
 
     def on_speed_change(self, value):
-        self.speed = float(value)
-        self.speed_label.config(text=f"{self.speed:.1f}x")
+        self.speed = 10 ** float(value)
+        self.player.set_speed(self.speed)
+        self.speed_label.config(text=f"{self.speed:,.0f}" if self.speed >= 10 else f"{self.speed:.1f}")
 
     def on_canvas_click(self, event):
         """处理画布点击事件，选择起点"""
+        # 右键/中键用于平移视野（GraphArtists 处理）
+        if event.button != 1:
+            return
         if self.is_running:
             return
 
-        # 检查是否点击了节点
-        for node, (x, y) in self.nodes.items():
-            if event.xdata is None or event.ydata is None:
-                continue
+        # 用网格索引查找被点击的节点（点在坐标轴外时 xdata 为 None）
+        node = self.hit_index.nearest(event.xdata, event.ydata, self.artists.pick_radius())
+        if node is None:
+            return
+        self.start_node = node
+        self.start_node_var.set(str(node))
+        self.status_var.set(f"Start node set to {node}. Click 'Start DFS' to begin.")
+        self.clear_timeline()  # 旧起点的回放不再有效
+        self.draw_graph()
 
-            distance = math.sqrt((event.xdata - x) ** 2 + (event.ydata - y) ** 2)
-            if distance <= self.node_radius:
-                self.start_node = node
-                self.start_node_var.set(str(node))
-                self.status_var.set(f"Start node set to {node}. Click 'Start DFS' to begin.")
-                self.draw_graph()
-                break
+    def on_canvas_motion(self, event):
+        """鼠标悬停的节点加一个外圈"""
+        node = None
+        if event.inaxes is self.ax:
+            node = self.hit_index.nearest(event.xdata, event.ydata, self.artists.pick_radius())
+        self.artists.set_hover(node)
 
     def start_dfs(self):
         if self.is_running or self.start_node is None:
             return
 
+        # 先取消并回收可能残留的旧任务，再初始化状态
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
+
         self.is_running = True
-        self.paused = False
-        self.stop_flag = False
+        self.clear_analysis()
         self.start_button.config(state="disabled")
-        self.pause_button.config(state="normal")
-        self.status_var.set("Running DFS...")
+        self.analyze_button.config(state="disabled")
+        self.status_var.set("Computing DFS...")
 
         # 初始化DFS状态
         self.visited = set()
-        self.stack = [self.start_node]
         self.visited_order = []
-        self.current_path = [self.start_node]
-
-        # 在新线程中运行DFS算法
-        self.dfs_thread = Thread(target=self.run_dfs)
-        self.dfs_thread.daemon = True
-        self.dfs_thread.start()
-
-    def pause_dfs(self):
-        if self.paused:
-            self.paused = False
-            self.pause_button.config(text="Pause")
-            self.status_var.set("Running DFS...")
-        else:
-            self.paused = True
-            self.pause_button.config(text="Resume")
-            self.status_var.set("Paused")
+        self.trace = None
+
+        # 在后台任务中运行DFS并生成时间线，完成后在界面线程中回放
+        self.jobs.submit(self.run_dfs)
 
     def reset(self):
-        self.stop_flag = True
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
         self.is_running = False
-        self.paused = False
+        self.clear_analysis()
         self.start_button.config(state="normal")
-        self.pause_button.config(state="disabled", text="Pause")
+        self.analyze_button.config(state="normal")
         self.status_var.set("Ready - Click a node to set as start node")
         self.draw_graph()
 
-    def run_dfs(self):
-        """执行DFS算法并更新可视化"""
+    def run_dfs(self, token):
+        """在后台计算DFS轨迹并转换成时间线"""
         try:
-            while self.stack and not self.stop_flag:
-                # 处理暂停
-                while self.paused and not self.stop_flag:
-                    time.sleep(0.1)
-
-                if self.stop_flag:
-                    break
-
-                # 从栈中取出当前节点
-                current_node = self.stack[-1]
-
-                # 如果当前节点尚未访问，标记为已访问
-                if current_node not in self.visited:
-                    self.visited.add(current_node)
-                    self.visited_order.append(current_node)
-
-                    # 更新可视化 - 显示当前节点
-                    stack_set = set(self.stack)
-                    self.root.after(0, self.draw_graph, current_node, self.visited, stack_set, self.current_path)
-                    self.root.after(0, self.status_var.set, f"Visiting node {current_node}")
-                    time.sleep(1.0 / self.speed)
-
-                # 处理暂停
-                while self.paused and not self.stop_flag:
-                    time.sleep(0.1)
-
-                if self.stop_flag:
-                    break
-
-                # 查找未访问的邻居
-                unvisited_neighbors = []
-                for neighbor in self.graph[current_node]:
-                    if neighbor not in self.visited:
-                        unvisited_neighbors.append(neighbor)
-
-                if unvisited_neighbors:
-                    # 选择第一个未访问的邻居
-                    next_node = unvisited_neighbors[0]
-
-                    # 将邻居加入栈和路径
-                    if next_node not in self.stack:
-                        self.stack.append(next_node)
-
-                    # 更新当前路径
-                    if next_node not in self.current_path:
-                        self.current_path.append(next_node)
-
-                    # 更新可视化 - 显示栈中的节点和当前路径
-                    stack_set = set(self.stack)
-                    self.root.after(0, self.draw_graph, current_node, self.visited, stack_set, self.current_path)
-                    self.root.after(0, self.status_var.set,
-                                    f"Moving to neighbor {next_node}. Stack: {self.stack}")
-                    time.sleep(1.0 / self.speed)
-                else:
-                    # 没有未访问的邻居，回溯
-                    popped_node = self.stack.pop()
-
-                    # 更新当前路径
-                    if popped_node in self.current_path and len(self.current_path) > 1:
-                        self.current_path.pop()
-
-                    # 更新可视化 - 显示回溯
-                    stack_set = set(self.stack)
-                    next_current = self.stack[-1] if self.stack else None
-                    self.root.after(0, self.draw_graph, next_current, self.visited, stack_set, self.current_path)
-                    self.root.after(0, self.status_var.set,
-                                    f"Backtracking from {popped_node}. Stack: {self.stack}")
-                    time.sleep(1.0 / self.speed)
-
-            if not self.stop_flag:
-                self.root.after(0, self.dfs_completed)
+            # 同一张图、同一起点的轨迹和时间线只计算一次，之后从磁盘缓存读取
+            key = make_key("dfs-timeline", self.graph.fingerprint(), self.start_node)
+            cached = shared_cache().get_trace(key)
+            if cached is not None:
+                self.ui.post_control(self.timeline_ready, *cached)
+                return
+            trace = dfs(self.graph, self.start_node)
+            timeline = dfs_timeline(trace, STATE_STACKED, STATE_VISITED)
+            token.check()
+            self.ui.post_control(self.timeline_ready, trace, timeline)
+            shared_cache().put_trace(key, (trace, timeline))
 
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {str(e)}"))
-            self.root.after(0, self.reset)
+            self.ui.post_control(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
+            self.ui.post_control(self.reset)
+
+    # --- 时间线回放 ---
+
+    def timeline_ready(self, trace, timeline):
+        self.trace = trace
+        self.visited_order = trace.order
+        self.visited = trace.order
+        self.timeline = timeline
+        self.scrubber.config(to=max(len(timeline), 1))
+        self.player.load(timeline)
+        self.player.play()
+
+    def clear_timeline(self):
+        self.player.load(None)
+        self.timeline = None
+        self.step_var.set(0)
+        self.step_label.config(text="0 / 0")
+
+    def toggle_play(self):
+        if self.timeline is None:
+            self.start_dfs()
+        else:
+            self.player.toggle()
+
+    def on_play_state(self, playing):
+        self.play_button.config(text="Pause" if playing else "Play")
+        self.is_running = playing
+        self.start_button.config(state="disabled" if playing else "normal")
+        self.analyze_button.config(state="disabled" if playing else "normal")
+
+    def on_scrub(self, value):
+        step = int(float(value))
+        if self.timeline is not None and step != self.player.step:
+            self.player.pause()
+            self.player.seek(step)
+
+    def show_step(self, step):
+        """绘制时间线的第 step 步：栈中节点为黄色，并用外圈和路径连成当前的 DFS 路径"""
+        timeline = self.timeline
+        total = len(timeline)
+        self.step_var.set(step)
+        self.step_label.config(text=f"{step} / {total}")
+        if step >= total:
+            self.dfs_completed()
+            return
+
+        codes = timeline.state_at(step)
+        # 栈中的节点按发现时间排列即为从根出发的路径
+        on_stack = np.flatnonzero(codes == STATE_STACKED)
+        stack = on_stack[np.argsort(self.trace.discovery[on_stack])].tolist()
+        current = timeline.current_at(step)
+        if current is not None:
+            codes[current] = STATE_CURRENT
+        rings = np.zeros(self.graph.num_nodes, dtype=bool)
+        rings[stack] = True
+        self.artists.update(codes, rings=rings, path=stack)
+        self.status_var.set(f"Step {step}/{total}: {self.describe_step(step, stack)}")
+
+    def describe_step(self, step, stack):
+        event = self.timeline.event(step)
+        if event is None:
+            return "press Play, step with < >, or drag the slider"
+        kind, node, other, detail = event
+        if kind == EV_PUSH:
+            return f"Visiting node {node} (discovered at t={self.trace.discovery[node]})"
+        if kind == EV_EDGE:
+            return f"Edge {node} -> {other} is a {EDGE_KIND_NAMES[detail]} edge. Stack: {format_nodes(stack)}"
+        return f"Backtracking from {node} (finished at t={self.trace.finish[node]}). Stack: {format_nodes(stack)}"
 
     def dfs_completed(self):
+        counts = self.trace.edge_kind_counts()
+        self.status_var.set(f"DFS completed! Visited order: {format_nodes(self.visited_order)}, edges: "
+                            + ", ".join(f"{name}={count}" for name, count in counts.items()))
+        self.draw_graph(visited=self.visited)
+        # 统计窗口开着时换成这次遍历的统计
+        if self.stats_window is not None and self.stats_window.alive and self.stats_shown is not self.trace:
+            self.show_stats()
+
+    # --- 遍历统计 ---
+
+    def stats_source(self):
+        """统计使用的 DFS 轨迹：当前起点已有的轨迹；没有时在后台重新做一次（不记录事件）"""
+        if self.trace is not None and self.trace.roots and self.trace.roots[0] == self.start_node:
+            return self.trace
+        return None
+
+    def show_stats(self):
+        """打开（或刷新）统计窗口，统计结果在后台计算"""
+        if self.graph is None or self.start_node is None:
+            return
+        if self.stats_window is None or not self.stats_window.alive:
+            self.stats_window = StatsWindow(self.root, "DFS Statistics")
+        self.stats_window.wait()
+        self.stats_shown = self.stats_source()
+        self.stats_jobs.submit(self.run_stats, self.graph, self.stats_shown, self.start_node)
+
+    def run_stats(self, token, graph, trace, source):
+        """后台任务：DFS 树深度统计、度分布、连通分量和采样离心率（同一张图同一起点只算一次）"""
+        try:
+            key = make_key("dfs-stats", graph.fingerprint(), source)
+            stats = shared_cache().get_trace(key)
+            if stats is None:
+                if trace is None:
+                    trace = dfs(graph, source, record_events=False)
+                stats = traversal_stats(graph, trace=trace, source=source)
+                token.check()
+                shared_cache().put_trace(key, stats)
+            self.ui.post_control(self.stats_ready, graph, stats)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Statistics", f"An error occurred: {str(e)}")
+
+    def stats_ready(self, graph, stats):
+        if graph is not self.graph or self.stats_window is None or not self.stats_window.alive:
+            return
+        self.stats_window.show(stats)
+        if not self.is_running:
+            self.status_var.set(f"Statistics: {summarize(stats)}")
+
+    # --- 图分析：SCC / 拓扑序 / 割点与桥 ---
+
+    def start_analysis(self):
+        if self.is_running:
+            return
+        self.jobs.cancel()
+        self.ui.clear()
+        self.clear_timeline()
+        self.is_running = True
+        self.start_button.config(state="disabled")
+        self.analyze_button.config(state="disabled")
+        self.status_var.set(f"Running analysis: {self.analysis_var.get()}...")
+        self.jobs.submit(self.run_analysis, self.analysis_var.get())
+
+    def run_analysis(self, token, mode):
+        """在后台计算分析结果（整张图的 DFS 森林，线性时间），完成后交给界面线程显示"""
+        try:
+            key = make_key("dfs-analysis", mode, self.graph.fingerprint())
+            result = shared_cache().get_trace(key)
+            if result is not None:
+                self.ui.post_control(self.analysis_completed, mode, result)
+                return
+            if mode == ANALYSIS_MODES[0]:
+                result = strongly_connected_components(self.graph)
+            elif mode == ANALYSIS_MODES[1]:
+                result = topological_sort(self.graph)
+            else:
+                result = articulation_points_and_bridges(self.graph)
+            token.check()
+            self.ui.post_control(self.analysis_completed, mode, result)
+            shared_cache().put_trace(key, result)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
+            self.ui.post_control(self.reset)
+
+    def analysis_completed(self, mode, result):
         self.is_running = False
         self.start_button.config(state="normal")
-        self.pause_button.config(state="disabled")
-        self.status_var.set(f"DFS completed! Visited order: {self.visited_order}")
-        self.draw_graph(visited=self.visited)
+        self.analyze_button.config(state="normal")
+        self.clear_analysis()
+        n = self.graph.num_nodes
+        no_rings = np.zeros(n, dtype=bool)
+
+        if mode == ANALYSIS_MODES[0]:
+            # 每个强连通分量一种颜色
+            labels, count = result
+            self.artists.set_palette(COMPONENT_PALETTE)
+            self.artists.update(labels % len(COMPONENT_PALETTE), rings=no_rings, path=[])
+            sizes = np.bincount(labels, minlength=count)
+            self.status_var.set(f"{count} strongly connected component(s), largest has {int(sizes.max())} nodes")
+        elif mode == ANALYSIS_MODES[1]:
+            order, cycle = result
+            if order is None:
+                # 有环：用路径和外圈标出找到的环
+                rings = no_rings.copy()
+                rings[cycle] = True
+                codes = state_codes(n, (cycle, STATE_CURRENT))
+                self.artists.update(codes, rings=rings, path=cycle)
+                self.status_var.set(f"Not a DAG - cycle found: {' -> '.join(map(str, cycle))}")
+            else:
+                # 无环：颜色随拓扑序渐变
+                self.artists.set_palette(TOPO_PALETTE)
+                ranks = np.empty(n, dtype=np.int64)
+                ranks[order] = np.arange(n)
+                self.artists.update(ranks * (TOPO_LEVELS - 1) // max(n - 1, 1), rings=no_rings, path=[])
+                self.status_var.set(f"Topological order: {format_nodes(order)}")
+        else:
+            cut_vertices, bridges = result
+            rings = no_rings.copy()
+            rings[cut_vertices] = True
+            self.artists.update(state_codes(n, (cut_vertices, STATE_CURRENT)), rings=rings, path=[])
+            self.artists.highlight_edges(bridges[:, 0], bridges[:, 1])
+            bridge_text = ", ".join(f"{u}-{v}" for u, v in bridges[:10].tolist())
+            if len(bridges) > 10:
+                bridge_text += f", ... (+{len(bridges) - 10})"
+            self.status_var.set(f"Articulation points: {format_nodes(cut_vertices)}, "
+                                f"bridges ({len(bridges)}): {bridge_text or 'none'}")
+
+    def clear_analysis(self):
+        """恢复普通的节点配色并清除边高亮"""
+        self.artists.set_palette(NODE_PALETTE)
+        self.artists.highlight_edges()
 
 
 def main():
@@ -417,4 +706,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
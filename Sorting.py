@@ -4,8 +4,8 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 import random
-import time
-from threading import Thread
+from ui_channel import UIUpdateChannel
+from job_manager import JobManager
 
 
 class SortingVisualizer:
@@ -28,8 +28,11 @@ class SortingVisualizer:
         self.speed = 0.1
         self.is_sorting = False
         self.current_algorithm = "Bubble Sort"
-        self.paused = False
-        self.stop_flag = False
+
+        # 工作线程 -> 界面的更新通道
+        self.ui = UIUpdateChannel(self.root)
+        # 后台任务（每次运行一个可取消的任务）
+        self.jobs = JobManager("sorting")
 
         # 创建UI
         self.setup_ui()
@@ -37,6 +40,16 @@ class SortingVisualizer:
         # 初始化数据
         self.generate_data()
 
+        # 窗口关闭时停止后台任务
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+
+    def on_destroy(self, event):
+        """窗口销毁时关闭更新通道并停止排序任务"""
+        if event.widget is not self.root:
+            return
+        self.ui.close()
+        self.jobs.shutdown()
+
     def setup_ui(self):
         # 创建主容器
         main_frame = ttk.Frame(self.root, padding="10")
@@ -182,32 +195,32 @@ Note: During sorting, elements highlighted in red indicate those being compared
         if self.is_sorting:
             return
 
+        # 先取消并回收可能残留的旧任务
+        self.jobs.cancel()
+        self.ui.clear()
+
         self.is_sorting = True
-        self.paused = False
-        self.stop_flag = False
         self.start_button.config(state="disabled")
         self.pause_button.config(state="normal")
         self.status_var.set("Sorting...")
 
-        # 在新线程中运行排序算法
-        self.sort_thread = Thread(target=self.run_sorting_algorithm)
-        self.sort_thread.daemon = True  # 设置为守护线程，主程序退出时自动结束
-        self.sort_thread.start()
+        # 在后台任务中运行排序算法（守护线程，主程序退出时自动结束）
+        self.jobs.submit(self.run_sorting_algorithm)
 
     def pause_sorting(self):
-        if self.paused:
-            self.paused = False
+        if self.jobs.paused:
+            self.jobs.resume()
             self.pause_button.config(text="Pause")
             self.status_var.set("Sorting...")
         else:
-            self.paused = True
+            self.jobs.pause()
             self.pause_button.config(text="Resume")
             self.status_var.set("Paused")
 
     def reset(self):
-        self.stop_flag = True
+        self.jobs.cancel()
+        self.ui.clear()
         self.is_sorting = False
-        self.paused = False
         self.start_button.config(state="normal")
         self.pause_button.config(state="disabled", text="Pause")
         self.status_var.set("Ready")
@@ -215,30 +228,23 @@ Note: During sorting, elements highlighted in red indicate those being compared
         self.data = self.original_data.copy()
         self.update_plot()
 
-    def run_sorting_algorithm(self):
+    def run_sorting_algorithm(self, token):
         algorithm_func = self.algorithms[self.current_algorithm]
 
         try:
             # 调用排序算法，传入数据的副本
             for step in algorithm_func(self.data.copy()):
-                if self.stop_flag:
-                    break
-
-                while self.paused and not self.stop_flag:
-                    time.sleep(0.1)
-
-                if self.stop_flag:
-                    break
+                # 处理暂停/取消
+                token.check()
 
                 # 更新可视化
-                self.root.after(0, self.update_plot, step)
-                time.sleep(self.speed)
+                self.ui.post("plot", self.update_plot, step)
+                token.sleep(self.speed)
 
-            if not self.stop_flag:
-                self.root.after(0, self.sorting_completed)
+            self.ui.post_control(self.sorting_completed)
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {str(e)}"))
-            self.root.after(0, self.reset)
+            self.ui.post_control(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
+            self.ui.post_control(self.reset)
 
     def sorting_completed(self):
         self.is_sorting = False
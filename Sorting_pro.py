@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk
 import random
 import copy
+import numpy as np
+from raster_renderer import PhotoRaster, draw_bars, rgb8
 
 # --- 颜色配置 (模仿 Galles 网站风格) ---
 COLOR_BG = "#F5F5F5"  # 背景: 浅灰/米色
@@ -11,6 +13,10 @@ COLOR_BAR_SWAP = "#FFFF00"  # 交换/选中: 亮黄色
 COLOR_BAR_SORTED = "#32CD32"  # 已归位: 柠檬绿
 COLOR_TEXT = "#000000"  # 文字: 黑色
 
+# 渲染方式: Canvas 每根柱子一个矩形和一个文字; Raster 整个画面是一张图片
+RENDERERS = ["Canvas", "Raster"]
+LABEL_MIN_BAR_PIXELS = 14  # 光栅模式下柱子至少这么宽才写数值
+
 
 class SortingVisualizer:
     def __init__(self, root):
@@ -67,9 +73,16 @@ class SortingVisualizer:
         tk.Button(top_frame, text="Generate New Data", command=self.generate_new_data, bg="#E0E0E0").pack(side=tk.LEFT,
                                                                                                           padx=20)
 
+        tk.Label(top_frame, text="Renderer:", bg=COLOR_BG, font=("Arial", 12)).pack(side=tk.LEFT, padx=10)
+        self.renderer_combobox = ttk.Combobox(top_frame, values=RENDERERS, state="readonly", width=8)
+        self.renderer_combobox.current(0)
+        self.renderer_combobox.pack(side=tk.LEFT, padx=5)
+        self.renderer_combobox.bind("<<ComboboxSelected>>", lambda event: self.draw_current_frame())
+
         # 2. 中部：画布 (Canvas)
         self.canvas = tk.Canvas(self.root, bg="white", highlightthickness=0)
         self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.raster = PhotoRaster(self.canvas)
 
         # 3. 底部：播放控制栏 (模仿 Galles 的 Animation Controls)
         control_frame = tk.Frame(self.root, bg=COLOR_BG, pady=15, padx=10, relief=tk.RAISED, borderwidth=1)
@@ -190,6 +203,11 @@ class SortingVisualizer:
         spacing = 2
         max_val = 100  # 数据最大值约为100
 
+        if self.renderer_combobox.get() == "Raster":
+            self.draw_raster_frame(data, colors, c_width, c_height, bar_width, spacing, max_val)
+            self.status_label.config(text=f"Step: {self.current_frame_index + 1} / {len(self.frames)}")
+            return
+
         for i, val in enumerate(data):
             x0 = (i + 1) * bar_width
             y0 = c_height - (val / max_val * (c_height - 50))
@@ -207,6 +225,22 @@ class SortingVisualizer:
         # 更新状态文字
         self.status_label.config(text=f"Step: {self.current_frame_index + 1} / {len(self.frames)}")
 
+    def draw_raster_frame(self, data, colors, c_width, c_height, bar_width, spacing, max_val):
+        """光栅模式: 所有柱子一次画进像素缓冲区, 作为一张图片显示 (坐标与 Canvas 模式相同)"""
+        values = np.asarray(data, dtype=float)
+        x0 = (np.arange(len(values)) + 1) * bar_width
+        y0 = c_height - (values / max_val * (c_height - 50))
+        buffer = np.full((c_height, c_width, 3), 255, dtype=np.uint8)
+        fills = np.array([rgb8(color) for color in colors], dtype=np.uint8)
+        draw_bars(buffer, x0, x0 + bar_width - spacing, y0, c_height - 10, fills, outline=(0, 0, 0))
+        self.raster.show(buffer)
+
+        # 柱子足够宽时才在顶部显示数值
+        if bar_width >= LABEL_MIN_BAR_PIXELS:
+            for i, val in enumerate(data):
+                text_x = x0[i] + (bar_width - spacing) / 2
+                self.canvas.create_text(text_x, y0[i] - 5, text=str(val), font=("Arial", 9), fill=COLOR_TEXT)
+
     # --- 播放控制逻辑 ---
 
     def toggle_play(self):
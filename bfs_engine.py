@@ -0,0 +1,709 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的层同步 BFS 引擎
+
+每一层把整个前沿（frontier）一次性展开：用 NumPy 从 CSR 数组中批量取出
+所有邻居，用 visited 位图过滤，再取每个新节点第一次出现的位置作为父节点。
+新前沿按发现顺序排列，因此得到的访问顺序与逐个出队的队列 BFS 完全一致。
+
+方向优化（direction-optimizing）模式在前沿变大时切换为自底向上：
+由尚未访问的节点去查找自己是否有父节点位于前沿中，找到一个即可停止，
+从而跳过大量指向已访问节点的无效检查（Beamer 等人的启发式，alpha/beta 可调）。
+
+多源 BFS 把所有源点放在第 0 层，每个节点记录离它最近的源点；分量扫描先用向量化并查集
+找出每个连通分量，再从各分量的代表节点同时出发做一次多源 BFS。
+
+稠密图（CSRGraph.prefers_bitset）改用位矩阵 BitsetGraph：前沿行与"未访问"位图按位与，
+一次处理 64 个候选邻居，不再逐条边查 visited。两种表示得到的层、父节点和访问顺序完全相同。
+
+增量 BFS（IncrementalBFS）在 DynamicGraph 上维护距离：插入边只从变短的一端向外传播，
+删除边只重新计算失去 BFS 树父节点的那棵子树，其余节点保持不动。
+"""
+import heapq
+from collections import deque
+
+import numpy as np
+
+from graph_core import BitsetGraph, DynamicGraph, lowest_bit, pack_bits, popcount, set_bits
+
+
+# 遍历方向
+TOP_DOWN = "top-down"
+BOTTOM_UP = "bottom-up"
+
+# 方向切换阈值的默认值
+DEFAULT_ALPHA = 15.0
+DEFAULT_BETA = 18.0
+
+# 位矩阵每次处理的行块大小（字数），控制临时数组的内存
+DENSE_CHUNK_WORDS = 1 << 20
+
+
+class BFSResult:
+    def __init__(self, source, distances, parents, levels, edges_examined, directions=None):
+        self.source = source
+        self.distances = distances          # 未到达的节点为 -1
+        self.parents = parents              # 源点和未到达的节点为 -1
+        self.levels = levels                # 每一层的前沿数组
+        self.edges_examined = edges_examined  # 每一层检查的边数
+        # 每一层展开时使用的方向（levels[i] 由 directions[i] 展开得到下一层）
+        if directions is None:
+            directions = [TOP_DOWN] * len(edges_examined)
+        self.directions = directions
+
+    @property
+    def level_sizes(self):
+        return np.array([len(level) for level in self.levels], dtype=np.int64)
+
+    @property
+    def order(self):
+        """访问顺序（所有层按顺序拼接）"""
+        if not self.levels:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(self.levels)
+
+    @property
+    def num_reached(self):
+        return int(sum(len(level) for level in self.levels))
+
+    @property
+    def depth(self):
+        return len(self.levels) - 1
+
+    @property
+    def nbytes(self):
+        """距离、父节点、各层和每层边数占用的字节数"""
+        return (self.distances.nbytes + self.parents.nbytes + self.edges_examined.nbytes
+                + sum(level.nbytes for level in self.levels))
+
+    def path_to(self, target):
+        """从源点到 target 的最短路径（不可达时返回空列表）"""
+        if self.distances[target] < 0:
+            return []
+        path = [int(target)]
+        while self.parents[path[-1]] >= 0:
+            path.append(int(self.parents[path[-1]]))
+        return path[::-1]
+
+
+def gather_neighbors(graph, frontier):
+    """
+    批量取出前沿节点的所有出边，返回 (源节点数组, 邻居数组)。
+    等价于对每个 u 拼接 graph.neighbors(u)，但不需要 Python 循环。
+    """
+    starts = graph.indptr[frontier]
+    counts = graph.indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    offsets = np.cumsum(counts) - counts
+    positions = np.repeat(starts - offsets, counts) + np.arange(total, dtype=np.int64)
+    return np.repeat(frontier, counts), graph.indices[positions].astype(np.int64)
+
+
+def adjacency_for(graph, dense=None):
+    """遍历使用的邻接表示：dense 为 None 时按图的密度自动选择"""
+    if isinstance(graph, BitsetGraph):
+        return graph
+    if dense is None:
+        dense = graph.prefers_bitset()
+    return graph.bitset() if dense else graph
+
+
+def _chunks(bits, nodes):
+    """把节点数组按 DENSE_CHUNK_WORDS 切块"""
+    step = max(DENSE_CHUNK_WORDS // bits.num_words, 1)
+    for start in range(0, len(nodes), step):
+        yield nodes[start:start + step]
+
+
+def expand_top_down(graph, frontier, visited):
+    """
+    自顶向下展开一层：返回 (新前沿, 新前沿的父节点, 检查的边数)。
+    新前沿按发现顺序排列，并已在 visited 中标记。
+    """
+    if isinstance(graph, BitsetGraph):
+        return _expand_top_down_dense(graph, frontier, visited)
+    srcs, nbrs = gather_neighbors(graph, frontier)
+    examined = len(nbrs)
+    fresh = ~visited[nbrs]
+    srcs, nbrs = srcs[fresh], nbrs[fresh]
+    if len(nbrs) == 0:
+        return nbrs, nbrs, examined
+    # 同一节点可能被多个前沿节点发现，只保留第一次
+    uniq, first = np.unique(nbrs, return_index=True)
+    first.sort()
+    next_frontier = nbrs[first]
+    visited[next_frontier] = True
+    return next_frontier, srcs[first], examined
+
+
+def _expand_top_down_dense(bits, frontier, visited):
+    """
+    位矩阵版的自顶向下展开：hits = 邻接行 & 未访问位图。
+    块内用按位或的前缀扫描去掉已被前面的前沿节点认领的位，
+    因此每个新节点的父节点仍是前沿中第一个指向它的节点。
+    """
+    free = pack_bits(~visited, bits.num_words)
+    found, owners = [], []
+    for chunk in _chunks(bits, frontier):
+        hits = bits.rows[chunk] & free
+        claimed = np.bitwise_or.accumulate(hits, axis=0)
+        hits[1:] &= ~claimed[:-1]
+        free &= ~claimed[-1]
+        rows, cols = np.nonzero(hits)
+        if len(rows) == 0:
+            continue
+        # 按行优先取出每个非零字中的位：与 CSR 的发现顺序一致
+        index, bit = set_bits(hits[rows, cols])
+        found.append(cols[index] * 64 + bit)
+        owners.append(chunk[rows[index]])
+    examined = int(bits.degrees[frontier].sum())
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, examined
+    next_frontier = np.concatenate(found)
+    visited[next_frontier] = True
+    return next_frontier, np.concatenate(owners).astype(np.int64), examined
+
+
+def expand_bottom_up(graph, in_graph, frontier_mask, visited):
+    """
+    自底向上展开一层：每个未访问节点按顺序检查入边邻居，遇到第一个位于前沿中的就停止。
+    返回 (新前沿, 父节点, 检查的边数)。检查的边数按顺序扫描到第一个命中为止计算，
+    与逐节点实现的工作量一致。
+    """
+    if isinstance(in_graph, BitsetGraph):
+        return _expand_bottom_up_dense(in_graph, frontier_mask, visited)
+    candidates = np.flatnonzero(~visited)
+    srcs, nbrs = gather_neighbors(in_graph, candidates)
+    hit = frontier_mask[nbrs]
+    degrees = in_graph.indptr[candidates + 1] - in_graph.indptr[candidates]
+
+    hit_idx = np.flatnonzero(hit)
+    if len(hit_idx) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), int(degrees.sum())
+
+    # 每个候选节点的第一个命中位置
+    found, first = np.unique(srcs[hit_idx], return_index=True)
+    first_pos = hit_idx[first]
+    parents = nbrs[first_pos]
+
+    # 检查的边数：命中的节点扫描到第一个命中为止，其余节点扫描全部入边
+    row_start = np.cumsum(degrees) - degrees
+    found_rank = np.searchsorted(candidates, found)
+    scanned = int(degrees.sum()) - int(degrees[found_rank].sum())
+    scanned += int((first_pos - row_start[found_rank] + 1).sum())
+
+    visited[found] = True
+    return found, parents, scanned
+
+
+def _expand_bottom_up_dense(in_bits, frontier_mask, visited):
+    """
+    位矩阵版的自底向上展开：入边行 & 前沿位图，第一个非零字的最低位就是父节点。
+    检查的边数用 popcount 统计到该位为止的入边数，与 CSR 版本相同。
+    """
+    candidates = np.flatnonzero(~visited)
+    in_frontier = pack_bits(frontier_mask, in_bits.num_words)
+    found, parents = [], []
+    scanned = 0
+    for chunk in _chunks(in_bits, candidates):
+        rows = in_bits.rows[chunk]
+        hits = rows & in_frontier
+        nonzero = hits != 0
+        hit = nonzero.any(axis=1)
+        scanned += int(in_bits.degrees[chunk[~hit]].sum())
+        if not hit.any():
+            continue
+        rows, hits = rows[hit], hits[hit]
+        word = nonzero[hit].argmax(axis=1)
+        first = hits[np.arange(len(word)), word]
+        bit = lowest_bit(first)
+        # 命中所在字之前的全部入边，加上该字中直到命中位为止的入边
+        before = np.arange(in_bits.num_words) < word[:, None]
+        scanned += int((popcount(rows) * before).sum())
+        low = first & (~first + np.uint64(1))
+        upto = low | (low - np.uint64(1))
+        scanned += int(popcount(rows[np.arange(len(word)), word] & upto).sum())
+        found.append(chunk[hit])
+        parents.append(word * 64 + bit)
+
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, scanned
+    found = np.concatenate(found)
+    visited[found] = True
+    return found, np.concatenate(parents).astype(np.int64), scanned
+
+
+def bfs_levels(graph, source, max_depth=None, dense=None):
+    """从 source 出发的层同步 BFS；dense 为 None 时稠密图自动使用位矩阵"""
+    n = graph.num_nodes
+    if not 0 <= source < n:
+        raise ValueError(f"source {source} out of range")
+    distances, parents, levels, edges_examined = _level_synchronous(
+        adjacency_for(graph, dense), np.array([source], dtype=np.int64), max_depth)
+    return BFSResult(source, distances, parents, levels, edges_examined)
+
+
+def _level_synchronous(adjacency, seeds, max_depth):
+    """从 seeds（第 0 层）出发逐层展开，返回 (距离, 父节点, 各层, 每层检查的边数)"""
+    n = adjacency.num_nodes
+    distances = np.full(n, -1, dtype=np.int64)
+    parents = np.full(n, -1, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)  # visited 位图
+
+    frontier = seeds
+    visited[seeds] = True
+    distances[seeds] = 0
+    levels = [frontier]
+    edges_examined = []
+
+    depth = 0
+    while len(frontier) and (max_depth is None or depth < max_depth):
+        next_frontier, next_parents, examined = expand_top_down(adjacency, frontier, visited)
+        edges_examined.append(examined)
+        if len(next_frontier) == 0:
+            break
+        depth += 1
+        distances[next_frontier] = depth
+        parents[next_frontier] = next_parents
+        levels.append(next_frontier)
+        frontier = next_frontier
+
+    return distances, parents, levels, np.array(edges_examined, dtype=np.int64)
+
+
+class MultiSourceResult(BFSResult):
+    """
+    多源 BFS 的结果：sources 全部位于第 0 层，source 是第一个源点。
+    labels[v] 是离 v 最近的源点在 sources 中的下标（未到达为 -1）；距离相同时
+    归属于先发现它的前沿节点，即沿父节点一路回溯到的那个源点。
+    """
+
+    def __init__(self, sources, distances, parents, levels, edges_examined):
+        super().__init__(int(sources[0]), distances, parents, levels, edges_examined)
+        self.sources = sources
+        self.labels = np.full(len(distances), -1, dtype=np.int64)
+        self.labels[sources] = np.arange(len(sources))
+        for level in levels[1:]:
+            self.labels[level] = self.labels[parents[level]]
+
+    @property
+    def nearest(self):
+        """离每个节点最近的源点编号（未到达为 -1）"""
+        return np.where(self.labels >= 0, self.sources[self.labels], -1)
+
+    def region_sizes(self):
+        """每个源点"领地"中的节点数"""
+        return np.bincount(self.labels[self.labels >= 0], minlength=len(self.sources))
+
+
+def multi_source_bfs(graph, sources, max_depth=None, dense=None):
+    """
+    从多个源点同时出发的层同步 BFS：distances 是到最近源点的距离。
+    重复的源点只保留第一次出现。
+    """
+    n = graph.num_nodes
+    sources = np.asarray(sources, dtype=np.int64).ravel()
+    if len(sources) == 0:
+        raise ValueError("at least one source is required")
+    bad = sources[(sources < 0) | (sources >= n)]
+    if len(bad):
+        raise ValueError(f"source {bad[0]} out of range")
+    _, first = np.unique(sources, return_index=True)
+    sources = sources[np.sort(first)]
+    distances, parents, levels, edges_examined = _level_synchronous(
+        adjacency_for(graph, dense), sources, max_depth)
+    return MultiSourceResult(sources, distances, parents, levels, edges_examined)
+
+
+def connected_components(graph):
+    """
+    弱连通分量（有向图忽略方向）：向量化的并查集。
+    每轮把每条边两端的根挂到较小的根上（hook），再做指针跳跃直到每个节点直接指向根；
+    两端已经同根的边以后不再检查。返回 (labels, 分量数)，编号按分量中最小的节点升序。
+    """
+    n = graph.num_nodes
+    parent = np.arange(n, dtype=np.int64)
+    src, dst = graph.edges()
+    if not graph.directed:
+        keep = src < dst  # 无向图每条边存了两次
+        src, dst = src[keep], dst[keep]
+    while len(src):
+        root_u, root_v = parent[src], parent[dst]
+        differ = root_u != root_v
+        src, dst = src[differ], dst[differ]
+        if len(src) == 0:
+            break
+        root_u, root_v = root_u[differ], root_v[differ]
+        np.minimum.at(parent, np.maximum(root_u, root_v), np.minimum(root_u, root_v))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    roots, labels = np.unique(parent, return_inverse=True)
+    return labels, len(roots)
+
+
+def component_sweep(graph, dense=None):
+    """
+    遍历所有连通分量（有向图按弱连通处理）：并查集先求出分量，再从每个分量中编号最小的节点
+    同时出发做一次多源 BFS。结果的 labels 就是分量编号，层次可以像普通 BFS 一样回放，
+    所有分量同时向外扩展，孤立的部分也不会漏掉。
+    """
+    undirected = graph.to_undirected() if graph.directed else graph
+    labels, _ = connected_components(undirected)
+    _, roots = np.unique(labels, return_index=True)
+    return multi_source_bfs(undirected, roots, dense=dense)
+
+
+def bfs_direction_optimizing(graph, source, alpha=DEFAULT_ALPHA, beta=DEFAULT_BETA, max_depth=None,
+                             dense=None):
+    """
+    方向优化 BFS：
+        自顶向下 -> 自底向上：前沿出边数 m_f > 未访问节点的边数 m_u / alpha
+        自底向上 -> 自顶向下：前沿节点数 n_f < n / beta
+    """
+    n = graph.num_nodes
+    if not 0 <= source < n:
+        raise ValueError(f"source {source} out of range")
+    if alpha <= 0 or beta <= 0:
+        raise ValueError("alpha and beta must be positive")
+
+    graph = adjacency_for(graph, dense)
+    in_graph = graph.reverse()
+    out_degree = graph.degree()
+
+    distances = np.full(n, -1, dtype=np.int64)
+    parents = np.full(n, -1, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    frontier_mask = np.zeros(n, dtype=bool)
+
+    frontier = np.array([source], dtype=np.int64)
+    visited[source] = True
+    distances[source] = 0
+    levels = [frontier]
+    edges_examined = []
+    directions = []
+
+    unexplored_edges = int(out_degree.sum()) - int(out_degree[source])
+    direction = TOP_DOWN
+    depth = 0
+    while len(frontier) and (max_depth is None or depth < max_depth):
+        frontier_edges = int(out_degree[frontier].sum())
+        if direction == TOP_DOWN and frontier_edges > unexplored_edges / alpha:
+            direction = BOTTOM_UP
+        elif direction == BOTTOM_UP and len(frontier) < n / beta:
+            direction = TOP_DOWN
+
+        if direction == TOP_DOWN:
+            next_frontier, next_parents, examined = expand_top_down(graph, frontier, visited)
+        else:
+            frontier_mask[frontier] = True
+            next_frontier, next_parents, examined = expand_bottom_up(graph, in_graph, frontier_mask, visited)
+            frontier_mask[frontier] = False
+
+        edges_examined.append(examined)
+        directions.append(direction)
+        if len(next_frontier) == 0:
+            break
+        depth += 1
+        distances[next_frontier] = depth
+        parents[next_frontier] = next_parents
+        levels.append(next_frontier)
+        unexplored_edges -= int(out_degree[next_frontier].sum())
+        frontier = next_frontier
+
+    return BFSResult(source, distances, parents, levels,
+                     np.array(edges_examined, dtype=np.int64), directions)
+
+
+class BidirectionalResult:
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self.distance = -1          # 不可达时为 -1
+        self.path = []
+        self.meeting_node = None
+        self.steps = []             # [(FORWARD/BACKWARD, 新前沿数组), ...]
+        self.touched_forward = 0    # 正向搜索访问过的节点数
+        self.touched_backward = 0   # 反向搜索访问过的节点数
+        self.edges_examined = 0
+        self.one_sided_touched = 0  # 单向 BFS 找到 target 时访问过的节点数
+
+    @property
+    def touched(self):
+        return self.touched_forward + self.touched_backward
+
+
+FORWARD = "forward"
+BACKWARD = "backward"
+
+
+def bidirectional_bfs(graph, source, target, compare=True, dense=None):
+    """
+    双向 BFS：从 source 沿出边、从 target 沿入边同时搜索，每次扩展节点数较少的一侧，
+    两侧相遇即停止。compare=True 时额外统计单向 BFS 的访问节点数用于对比。
+    """
+    n = graph.num_nodes
+    for node in (source, target):
+        if not 0 <= node < n:
+            raise ValueError(f"node {node} out of range")
+
+    result = BidirectionalResult(source, target)
+    graph = adjacency_for(graph, dense)
+    in_graph = graph.reverse()
+
+    dist = {FORWARD: np.full(n, -1, dtype=np.int64), BACKWARD: np.full(n, -1, dtype=np.int64)}
+    parents = {FORWARD: np.full(n, -1, dtype=np.int64), BACKWARD: np.full(n, -1, dtype=np.int64)}
+    visited = {FORWARD: np.zeros(n, dtype=bool), BACKWARD: np.zeros(n, dtype=bool)}
+    frontier = {FORWARD: np.array([source], dtype=np.int64), BACKWARD: np.array([target], dtype=np.int64)}
+    adjacency = {FORWARD: graph, BACKWARD: in_graph}
+
+    for side, node in ((FORWARD, source), (BACKWARD, target)):
+        visited[side][node] = True
+        dist[side][node] = 0
+        result.steps.append((side, frontier[side]))
+
+    meeting = source if source == target else None
+    while meeting is None and len(frontier[FORWARD]) and len(frontier[BACKWARD]):
+        # 总是扩展较小的前沿
+        side = FORWARD if len(frontier[FORWARD]) <= len(frontier[BACKWARD]) else BACKWARD
+        other = BACKWARD if side == FORWARD else FORWARD
+
+        depth = dist[side][frontier[side][0]] + 1
+        new, new_parents, examined = expand_top_down(adjacency[side], frontier[side], visited[side])
+        result.edges_examined += examined
+        dist[side][new] = depth
+        parents[side][new] = new_parents
+        frontier[side] = new
+        result.steps.append((side, new))
+
+        # 本层新节点中已被另一侧访问过的即为相遇点，取总距离最短的一个
+        met = new[visited[other][new]]
+        if len(met):
+            meeting = int(met[np.argmin(dist[side][met] + dist[other][met])])
+
+    result.touched_forward = int(visited[FORWARD].sum())
+    result.touched_backward = int(visited[BACKWARD].sum())
+
+    if meeting is not None:
+        result.meeting_node = meeting
+        result.distance = int(dist[FORWARD][meeting] + dist[BACKWARD][meeting])
+        head = [meeting]
+        while parents[FORWARD][head[-1]] >= 0:
+            head.append(int(parents[FORWARD][head[-1]]))
+        tail = [meeting]
+        while parents[BACKWARD][tail[-1]] >= 0:
+            tail.append(int(parents[BACKWARD][tail[-1]]))
+        result.path = head[::-1] + tail[1:]
+
+    if compare:
+        if result.distance >= 0:
+            # 层同步 BFS 在发现 target 时已经访问了距离不超过 d(target) 的所有节点
+            result.one_sided_touched = bfs_levels(graph, source, max_depth=result.distance).num_reached
+        else:
+            result.one_sided_touched = bfs_levels(graph, source).num_reached
+
+    return result
+
+
+class IncrementalBFS:
+    """
+    在 DynamicGraph 上增量维护从 source 出发的 BFS 距离和 BFS 树。
+
+    插入边 u -> v：若 d(u) + 1 < d(v)，从 v 出发向外传播变短的距离（只访问距离变短的节点）。
+    删除边 u -> v：若 u 不是 v 在 BFS 树中的父节点，距离不变；否则按距离从小到大检查 v 的子树，
+    能在上一层找到其他未受影响的入边邻居的节点直接换父节点，找不到的才算受影响，
+    最后从受影响区域的边界向内重新做一次（以边界距离为起点的）BFS。
+    每次修改后 last 记录本次访问的节点数、扫描的边数和距离变化的节点，
+    totals 累计这些数字并与"每次都从头 BFS"需要访问的节点数比较。
+
+    维护的 BFS 树一定合法（parent 的距离恰好少 1），但同层有多个候选时选中的父节点
+    可能与 bfs_levels 不同；距离始终与从头计算的结果一致（verify() 校验）。
+    """
+
+    def __init__(self, graph, source):
+        self.graph = graph if isinstance(graph, DynamicGraph) else DynamicGraph(graph)
+        if not 0 <= source < self.graph.num_nodes or source in self.graph.deleted:
+            raise ValueError(f"source {source} out of range")
+        self.source = source
+        dynamic = self.graph
+        result = bfs_levels(dynamic.base if dynamic.version == 0 else dynamic.to_csr(), source)
+        self.dist = result.distances.tolist()
+        self.parent = result.parents.tolist()
+        self.reached = result.num_reached
+        self.last = None
+        self.totals = {"edits": 0, "touched": 0, "edges_scanned": 0, "full": 0}
+
+    @property
+    def distances(self):
+        return np.array(self.dist, dtype=np.int64)
+
+    @property
+    def parents(self):
+        return np.array(self.parent, dtype=np.int64)
+
+    def _begin(self, op):
+        self.last = {"op": op, "touched": 0, "edges_scanned": 0, "changed": set()}
+
+    def _finish(self):
+        last = self.last
+        last["changed"] = sorted(last["changed"])
+        # 从头 BFS 要把所有可达节点各出队一次
+        last["full"] = self.reached
+        for key in ("touched", "edges_scanned", "full"):
+            self.totals[key] += last[key]
+        self.totals["edits"] += 1
+        return last
+
+    def _set(self, x, d, p):
+        old = self.dist[x]
+        if old != d:
+            self.last["changed"].add(x)
+            self.reached += (d >= 0) - (old >= 0)
+        self.dist[x] = d
+        self.parent[x] = p
+
+    def _children(self, x):
+        """x 在 BFS 树中的子节点（子节点一定是 x 的出边邻居）"""
+        parent = self.parent
+        return [y for y in self.graph.neighbors(x) if parent[y] == x]
+
+    # --- 插入 ---
+
+    def _propagate(self, u, v):
+        """边 u -> v 可能缩短 d(v)：若缩短，从 v 向外做 BFS，只前进到距离变短的节点"""
+        dist = self.dist
+        if dist[u] < 0 or 0 <= dist[v] <= dist[u] + 1:
+            return
+        self._set(v, dist[u] + 1, u)
+        queue = deque([v])
+        while queue:
+            x = queue.popleft()
+            self.last["touched"] += 1
+            for y in self.graph.neighbors(x):
+                self.last["edges_scanned"] += 1
+                if dist[y] < 0 or dist[y] > dist[x] + 1:
+                    self._set(y, dist[x] + 1, x)
+                    queue.append(y)
+
+    def add_edge(self, u, v, weight=1.0):
+        """插入边并修复距离；返回本次统计（边已存在时为 None）"""
+        if not self.graph.add_edge(u, v, weight):
+            return None
+        self._begin("add_edge")
+        self._propagate(u, v)
+        if not self.graph.directed:
+            self._propagate(v, u)
+        return self._finish()
+
+    # --- 删除 ---
+
+    def _repair(self, roots):
+        """roots 失去了树中的父节点：找出真正受影响的子树并重新计算其中的距离"""
+        dist, parent, graph = self.dist, self.parent, self.graph
+        last = self.last
+
+        # 第一步：按距离从小到大检查，能在上一层找到未受影响的入边邻居就换父节点
+        heap = [(dist[x], x) for x in roots if dist[x] >= 0]
+        heapq.heapify(heap)
+        affected = set()
+        while heap:
+            d, x = heapq.heappop(heap)
+            if x in affected:
+                continue
+            last["touched"] += 1
+            for w in graph.in_neighbors(x):
+                last["edges_scanned"] += 1
+                if dist[w] == d - 1 and w not in affected:
+                    parent[x] = w
+                    break
+            else:
+                affected.add(x)
+                for y in self._children(x):
+                    heapq.heappush(heap, (dist[y], y))
+        if not affected:
+            return
+
+        # 第二步：受影响区域内先清空距离，再从边界（区域外已确定距离的入边邻居）向内做 BFS
+        for x in affected:
+            self._set(x, -1, -1)
+        heap = []
+        for x in affected:
+            for w in graph.in_neighbors(x):
+                last["edges_scanned"] += 1
+                if dist[w] >= 0 and w not in affected:
+                    heap.append((dist[w] + 1, x, w))
+        heapq.heapify(heap)
+        while heap:
+            d, x, w = heapq.heappop(heap)
+            if dist[x] >= 0:
+                continue
+            self._set(x, d, w)
+            last["touched"] += 1
+            for y in graph.neighbors(x):
+                last["edges_scanned"] += 1
+                if y in affected and dist[y] < 0:
+                    heapq.heappush(heap, (d + 1, y, x))
+
+    def remove_edge(self, u, v):
+        """删除边并修复距离；返回本次统计（边不存在时为 None）"""
+        if not self.graph.remove_edge(u, v):
+            return None
+        self._begin("remove_edge")
+        roots = [v] if self.parent[v] == u else []
+        if not self.graph.directed and self.parent[u] == v:
+            roots.append(u)
+        self._repair(roots)
+        return self._finish()
+
+    # --- 节点 ---
+
+    def add_node(self):
+        """新增孤立节点（不可达），返回 (节点编号, 本次统计)"""
+        node = self.graph.add_node()
+        self.dist.append(-1)
+        self.parent.append(-1)
+        self._begin("add_node")
+        return node, self._finish()
+
+    def remove_node(self, x):
+        """删除节点及其所有边并修复距离；源点不能删除"""
+        if x == self.source:
+            raise ValueError("cannot delete the BFS source")
+        self.graph._check(x)
+        self._begin("remove_node")
+        roots = self._children(x)
+        self.graph.remove_node(x)
+        self._set(x, -1, -1)
+        self._repair(roots)
+        return self._finish()
+
+    def verify(self):
+        """与从头计算的 BFS 距离比较"""
+        full = bfs_levels(self.graph.to_csr(), self.source)
+        return bool(np.array_equal(full.distances, self.distances))
+
+
+def bfs_reference(graph, source):
+    """逐节点出队的参考实现（用于校验和基准对比）"""
+    n = graph.num_nodes
+    distances = np.full(n, -1, dtype=np.int64)
+    distances[source] = 0
+    order = [source]
+    queue = deque([source])
+    indptr, indices = graph.indptr, graph.indices.tolist()
+    dist = distances.tolist()
+    while queue:
+        u = queue.popleft()
+        for v in indices[indptr[u]:indptr[u + 1]]:
+            if dist[v] < 0:
+                dist[v] = dist[u] + 1
+                order.append(v)
+                queue.append(v)
+    return np.array(dist, dtype=np.int64), order
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+BFS 与 DFS 的同步对比：同一张图、同一个起点，两种遍历在后台各自的任务中同时计算，
+完成后在左右两个面板中按同一个时钟回放（第 k 步两边都显示各自的第 k 个事件，
+先结束的一边停在最终结果上）。每个面板下方显示步数、当前/峰值队列（栈）大小和内存。
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import numpy as np
+import time
+from ui_channel import UIUpdateChannel
+from graph_core import circular_layout
+from graph_generators import GRAPH_KINDS
+from graph_cache import shared_cache, make_key, cached_generate
+from spatial_index import GridIndex
+from graph_artists import GraphArtists, state_codes, fit_node_radius
+from raster_renderer import choose_renderer, replace_artists
+from job_manager import JobManager
+from bfs_engine import bfs_levels
+from dfs_engine import dfs
+from timeline import TimelinePlayer, bfs_timeline, dfs_timeline, frontier_sizes
+
+# 节点状态编码及对应颜色（两个面板共用：队列/栈中为黄色）
+STATE_UNVISITED, STATE_WAITING, STATE_VISITED, STATE_CURRENT = range(4)
+NODE_PALETTE = ['lightblue', 'yellow', 'green', 'red']
+
+# 起点下拉框最多列出的节点数
+NODE_CHOICE_LIMIT = 1000
+
+# 回放速度（每秒事件数）滑块的范围，按 10 的幂取值
+SPEED_EXPONENTS = (-0.5, 5.0)
+
+# 队列/栈中每个节点编号占用的字节数（int64）
+ENTRY_BYTES = 8
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class TraversalPanel:
+    """一个面板：坐标轴、图形对象、时间线以及下方的统计文字"""
+
+    def __init__(self, name, ax, canvas, info_var):
+        self.name = name            # "BFS" / "DFS"
+        self.ax = ax
+        self.artists = GraphArtists(ax, canvas, NODE_PALETTE)
+        self.info_var = info_var
+        self.container = "queue" if name == "BFS" else "stack"
+        self.clear()
+
+    def clear(self):
+        self.result = None          # BFSResult / DFSTrace
+        self.timeline = None
+        self.sizes = None           # 每一步之后队列（栈）的大小
+        self.elapsed = 0.0          # 后台计算（或从缓存读取）的耗时（秒）
+        self.from_cache = False
+
+    def load(self, result, timeline, elapsed, from_cache=False):
+        self.result = result
+        self.timeline = timeline
+        self.sizes = frontier_sizes(timeline)
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+
+    @property
+    def peak(self):
+        return int(self.sizes.max())
+
+    def describe(self, step):
+        """面板下方的统计：步数、队列（栈）大小、内存"""
+        total = len(self.timeline)
+        step = min(step, total)
+        timing = "loaded from cache" if self.from_cache else "computed"
+        progress = "finished" if step >= total else f"step {step:,}/{total:,}"
+        return (f"{self.name}: {progress}, {self.container} {int(self.sizes[step])} "
+                f"(peak {self.peak}, {format_bytes(self.peak * ENTRY_BYTES)})\n"
+                f"{total:,} steps, {len(self.result.order):,} nodes reached, {timing} in "
+                f"{self.elapsed * 1000:.1f} ms; memory: result {format_bytes(self.result.nbytes)}, "
+                f"timeline {format_bytes(self.timeline.nbytes)}")
+
+
+class CompareVisualizer:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("BFS vs DFS Comparison")
+        self.root.geometry("1200x750")
+
+        # 图数据结构
+        self.graph = None  # CSRGraph
+        self.positions = np.zeros((0, 2))
+        self.hit_index = GridIndex(self.positions)
+        self.node_radius = 30
+        self.node_count = 30
+        self.start_node = 0
+
+        # 回放状态
+        self.speed = 10.0
+        self.is_running = False
+        self.num_steps = 0  # 两条时间线中较长的一条的步数
+
+        # 两种遍历各用一个后台任务，同时计算
+        self.ui = UIUpdateChannel(self.root)
+        self.bfs_jobs = JobManager("compare-bfs")
+        self.dfs_jobs = JobManager("compare-dfs")
+        # 同一个时钟驱动两个面板
+        self.player = TimelinePlayer(self.root, self.show_step, self.on_play_state, self.speed)
+
+        self.setup_ui()
+        self.generate_graph()
+
+        # 窗口关闭时停止后台任务
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+
+    def on_destroy(self, event):
+        """窗口销毁时关闭更新通道并停止两个遍历任务"""
+        if event.widget is not self.root:
+            return
+        self.ui.close()
+        for jobs in (self.bfs_jobs, self.dfs_jobs):
+            jobs.shutdown()
+
+    def setup_ui(self):
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(2, weight=1)
+
+        title_label = ttk.Label(main_frame, text="BFS vs DFS on the Same Graph", font=("Arial", 16, "bold"))
+        title_label.grid(row=0, column=0, pady=(0, 10))
+
+        # 图的控制
+        graph_frame = ttk.LabelFrame(main_frame, text="Graph", padding="10")
+        graph_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+
+        ttk.Label(graph_frame, text="Number of Nodes:").grid(row=0, column=0, sticky=tk.W)
+        self.node_var = tk.IntVar(value=self.node_count)
+        ttk.Scale(graph_frame, from_=5, to=200, variable=self.node_var, orient=tk.HORIZONTAL,
+                  command=self.on_node_count_change).grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
+        self.node_label = ttk.Label(graph_frame, text=str(self.node_count), width=4)
+        self.node_label.grid(row=0, column=2, padx=(0, 10))
+
+        ttk.Label(graph_frame, text="Graph Type:").grid(row=0, column=3, sticky=tk.W)
+        self.graph_kind_var = tk.StringVar(value=GRAPH_KINDS[0])
+        graph_kind_combo = ttk.Combobox(graph_frame, textvariable=self.graph_kind_var, values=GRAPH_KINDS,
+                                        state="readonly", width=16)
+        graph_kind_combo.grid(row=0, column=4, padx=(5, 10))
+        graph_kind_combo.bind("<<ComboboxSelected>>", lambda event: self.generate_graph())
+
+        ttk.Button(graph_frame, text="Generate New Graph",
+                   command=lambda: self.generate_graph(fresh=True)).grid(row=0, column=5, padx=(10, 0))
+
+        ttk.Label(graph_frame, text="Start Node:").grid(row=0, column=6, sticky=tk.W, padx=(20, 0))
+        self.start_node_var = tk.StringVar(value="0")
+        self.start_node_combo = ttk.Combobox(graph_frame, textvariable=self.start_node_var,
+                                             state="readonly", width=5)
+        self.start_node_combo.grid(row=0, column=7, padx=(5, 10))
+        self.start_node_combo.bind("<<ComboboxSelected>>", self.on_start_node_change)
+        graph_frame.columnconfigure(1, weight=1)
+
+        # 左右两个面板共用一张画布
+        self.figure = plt.Figure(figsize=(12, 5), dpi=100)
+        bfs_ax, dfs_ax = self.figure.subplots(1, 2)
+        self.figure.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=0.93, wspace=0.04)
+        self.canvas = FigureCanvasTkAgg(self.figure, main_frame)
+        self.canvas.get_tk_widget().grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.canvas.mpl_connect('button_press_event', self.on_canvas_click)
+
+        # 每个面板下方的统计
+        info_frame = ttk.Frame(main_frame)
+        info_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        info_frame.columnconfigure(0, weight=1, uniform="panel")
+        info_frame.columnconfigure(1, weight=1, uniform="panel")
+        self.panels = []
+        for column, (name, ax) in enumerate((("BFS", bfs_ax), ("DFS", dfs_ax))):
+            info_var = tk.StringVar(value=f"{name}: not computed")
+            ttk.Label(info_frame, textvariable=info_var, justify=tk.LEFT).grid(row=0, column=column, sticky=tk.W,
+                                                                               padx=10)
+            self.panels.append(TraversalPanel(name, ax, self.canvas, info_var))
+
+        # 动画控制
+        control_frame = ttk.LabelFrame(main_frame, text="Animation Controls", padding="10")
+        control_frame.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+
+        ttk.Label(control_frame, text="Steps/s:").grid(row=0, column=0, sticky=tk.W)
+        self.speed_var = tk.DoubleVar(value=np.log10(self.speed))
+        ttk.Scale(control_frame, from_=SPEED_EXPONENTS[0], to=SPEED_EXPONENTS[1], variable=self.speed_var,
+                  orient=tk.HORIZONTAL, command=self.on_speed_change).grid(row=0, column=1, sticky=(tk.W, tk.E),
+                                                                           padx=(5, 10))
+        self.speed_label = ttk.Label(control_frame, text=f"{self.speed:,.0f}", width=8)
+        self.speed_label.grid(row=0, column=2, padx=(0, 20))
+
+        self.start_button = ttk.Button(control_frame, text="Start Comparison", command=self.start_compare)
+        self.start_button.grid(row=0, column=3, padx=(10, 5))
+        ttk.Button(control_frame, text="Reset", command=self.reset).grid(row=0, column=4, padx=5)
+
+        self.status_var = tk.StringVar(value="Ready - Click a node to set as start node")
+        ttk.Label(control_frame, textvariable=self.status_var).grid(row=0, column=5, padx=(20, 0))
+
+        transport = ttk.Frame(control_frame)
+        transport.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Button(transport, text="|<", width=3, command=self.player.to_start).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text="<", width=3, command=lambda: self.player.step_by(-1)).pack(side=tk.LEFT, padx=1)
+        self.play_button = ttk.Button(transport, text="Play", width=6, command=self.toggle_play)
+        self.play_button.pack(side=tk.LEFT, padx=4)
+        ttk.Button(transport, text=">", width=3, command=lambda: self.player.step_by(1)).pack(side=tk.LEFT, padx=1)
+        ttk.Button(transport, text=">|", width=3, command=self.player.to_end).pack(side=tk.LEFT, padx=1)
+
+        self.step_var = tk.DoubleVar(value=0)
+        self.scrubber = ttk.Scale(control_frame, from_=0, to=1, variable=self.step_var,
+                                  orient=tk.HORIZONTAL, command=self.on_scrub)
+        self.scrubber.grid(row=1, column=1, columnspan=4, sticky=(tk.W, tk.E), padx=(5, 10), pady=(5, 0))
+        self.step_label = ttk.Label(control_frame, text="0 / 0")
+        self.step_label.grid(row=1, column=5, sticky=tk.W, padx=(20, 0), pady=(5, 0))
+        control_frame.columnconfigure(1, weight=1)
+
+    # --- 图 ---
+
+    def generate_graph(self, fresh=False):
+        """两个面板使用同一张图（同样的类型和节点数沿用磁盘缓存中的图）"""
+        graph, positions = cached_generate(self.graph_kind_var.get(), self.node_var.get(), fresh=fresh)
+        self.reset()
+        self.graph = graph
+        self.node_count = graph.num_nodes
+        if positions is None:
+            positions = circular_layout(self.node_count, center=(500, 250), radius=200)
+        self.positions = positions
+        self.node_radius = fit_node_radius(positions)
+        self.hit_index.update(positions, cell_size=2 * self.node_radius)
+
+        # 面板只有半个窗口宽，视野取节点的包围盒（留出一个节点直径的边距）
+        margin = 2 * self.node_radius
+        lo, hi = positions.min(axis=0) - margin, positions.max(axis=0) + margin
+        renderer = choose_renderer("Auto", self.node_count)
+        src, dst = graph.undirected_edges()
+        for panel in self.panels:
+            panel.artists = replace_artists(panel.artists, renderer)
+            panel.artists.node_radius = self.node_radius
+            panel.artists.build(positions, src, dst, title=f"{panel.name} - {self.node_count} nodes",
+                                xlim=(lo[0], hi[0]), ylim=(lo[1], hi[1]))
+
+        choices = [str(i) for i in range(min(self.node_count, NODE_CHOICE_LIMIT))]
+        self.start_node_combo['values'] = choices
+        self.start_node = 0
+        self.start_node_var.set("0")
+        self.draw_selection()
+
+    def on_node_count_change(self, value):
+        self.node_label.config(text=str(int(float(value))))
+        self.generate_graph()
+
+    def on_start_node_change(self, event=None):
+        self.start_node = int(self.start_node_var.get())
+        self.reset()
+
+    def on_canvas_click(self, event):
+        """在任意一个面板中点击节点选择起点"""
+        if event.button != 1 or self.is_running:
+            return
+        if event.inaxes not in [panel.ax for panel in self.panels]:
+            return
+        node = self.hit_index.nearest(event.xdata, event.ydata, self.panels[0].artists.pick_radius())
+        if node is None:
+            return
+        self.start_node = node
+        self.start_node_var.set(str(node))
+        self.reset()
+        self.status_var.set(f"Start node set to {node}. Press 'Start Comparison' to begin.")
+
+    def draw_selection(self):
+        rings = np.zeros(self.node_count, dtype=bool)
+        rings[self.start_node] = True
+        for panel in self.panels:
+            panel.artists.update(state_codes(self.node_count), rings=rings, path=[])
+
+    def on_speed_change(self, value):
+        self.speed = 10 ** float(value)
+        self.player.set_speed(self.speed)
+        self.speed_label.config(text=f"{self.speed:,.0f}" if self.speed >= 10 else f"{self.speed:.1f}")
+
+    # --- 计算 ---
+
+    def start_compare(self):
+        if self.is_running or self.graph is None:
+            return
+        self.reset()
+        self.is_running = True
+        self.start_button.config(state="disabled")
+        self.status_var.set("Computing BFS and DFS...")
+        self.bfs_jobs.submit(self.run_traversal, self.panels[0], self.graph, self.start_node)
+        self.dfs_jobs.submit(self.run_traversal, self.panels[1], self.graph, self.start_node)
+
+    def run_traversal(self, token, panel, graph, source):
+        """后台任务：计算一种遍历并展开成时间线（同一张图同一起点只算一次）"""
+        try:
+            key = make_key(f"compare-{panel.name.lower()}", graph, source)
+            t0 = time.perf_counter()
+            cached = shared_cache().get_trace(key)
+            from_cache = cached is not None
+            if cached is None:
+                if panel.name == "BFS":
+                    result = bfs_levels(graph, source)
+                    timeline = bfs_timeline(result, graph.num_nodes, STATE_WAITING, STATE_VISITED)
+                else:
+                    result = dfs(graph, source)
+                    timeline = dfs_timeline(result, STATE_WAITING, STATE_VISITED)
+                cached = (result, timeline, time.perf_counter() - t0)
+                token.check()
+                shared_cache().put_trace(key, cached)
+            else:
+                # 缓存中保存的是第一次计算的耗时，命中时改为报告读取本身的耗时
+                cached = cached[:2] + (time.perf_counter() - t0,)
+            self.ui.post_control(self.traversal_ready, panel, graph, source, *cached, from_cache)
+        except Exception as e:
+            self.ui.post_control(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
+            self.ui.post_control(self.reset)
+
+    def traversal_ready(self, panel, graph, source, result, timeline, elapsed, from_cache):
+        if graph is not self.graph or source != self.start_node:
+            return
+        panel.load(result, timeline, elapsed, from_cache)
+        panel.info_var.set(panel.describe(0))
+        if any(p.timeline is None for p in self.panels):
+            return
+        # 两边都算好后按同一个时钟回放：时钟的长度取较长的一条时间线
+        self.num_steps = max(len(p.timeline) for p in self.panels)
+        self.scrubber.config(to=max(self.num_steps, 1))
+        self.player.load_steps(self.num_steps)
+        self.player.play()
+
+    # --- 回放 ---
+
+    def reset(self):
+        self.bfs_jobs.cancel()
+        self.dfs_jobs.cancel()
+        self.ui.clear()
+        self.player.load_steps(None)
+        self.num_steps = 0
+        self.step_var.set(0)
+        self.step_label.config(text="0 / 0")
+        for panel in self.panels:
+            panel.clear()
+            panel.info_var.set(f"{panel.name}: not computed")
+        self.is_running = False
+        self.start_button.config(state="normal")
+        self.status_var.set("Ready - Click a node to set as start node")
+        if self.graph is not None:
+            self.draw_selection()
+
+    def toggle_play(self):
+        if not self.player.loaded:
+            self.start_compare()
+        else:
+            self.player.toggle()
+
+    def on_play_state(self, playing):
+        self.play_button.config(text="Pause" if playing else "Play")
+        self.is_running = playing
+        self.start_button.config(state="disabled" if playing else "normal")
+
+    def on_scrub(self, value):
+        step = int(float(value))
+        if self.player.loaded and step != self.player.step:
+            self.player.pause()
+            self.player.seek(step)
+
+    def show_step(self, step):
+        """两个面板都画第 step 步；时间线较短的一边结束后停在最终状态"""
+        self.step_var.set(step)
+        self.step_label.config(text=f"{step} / {self.num_steps}")
+        for panel in self.panels:
+            self.draw_panel(panel, step)
+            panel.info_var.set(panel.describe(step))
+        if step >= self.num_steps:
+            self.status_var.set(self.summary())
+        else:
+            self.status_var.set(f"Step {step}/{self.num_steps}")
+
+    def draw_panel(self, panel, step):
+        timeline = panel.timeline
+        step = min(step, len(timeline))
+        codes = timeline.state_at(step)
+        current = timeline.current_at(step) if step < len(timeline) else None
+        if current is not None:
+            codes[current] = STATE_CURRENT
+        rings = np.zeros(self.node_count, dtype=bool)
+        rings[self.start_node] = True
+        path = []
+        if panel.name == "DFS":
+            # 栈中的节点按发现时间排列即为从根出发的路径
+            on_stack = np.flatnonzero(codes == STATE_WAITING)
+            path = on_stack[np.argsort(panel.result.discovery[on_stack])].tolist()
+            rings[path] = True
+        panel.artists.update(codes, rings=rings, path=path)
+
+    def summary(self):
+        bfs, dfs_panel = self.panels
+        return (f"BFS {len(bfs.timeline):,} steps (peak queue {bfs.peak}) vs "
+                f"DFS {len(dfs_panel.timeline):,} steps (peak stack {dfs_panel.peak}); "
+                f"BFS depth {bfs.result.depth} levels")
+
+
+def main():
+    root = tk.Tk()
+    app = CompareVisualizer(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
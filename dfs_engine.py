@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的迭代 DFS 引擎
+
+每个节点保存一个邻居游标（下一个要检查的出边在 CSR 中的位置），另用 on_stack
+位图判断节点是否在栈中，因此每条边只检查一次，整体 O(V + E)，且不使用递归，
+百万节点的图也不会栈溢出。遍历过程记录发现/完成时间、每条边的分类，
+以及一份紧凑的事件轨迹供可视化回放。
+
+不记录事件时，稠密图（CSRGraph.prefers_bitset）改用位矩阵：每个节点的游标指向位矩阵中的字，
+"下一个未访问的邻居"就是 行 & 未访问位图 中的最低位，已访问的邻居整字跳过；
+边分类在遍历结束后由发现/完成时间批量推出。记录事件时每条边都要写入轨迹，仍逐边遍历 CSR。
+"""
+import numpy as np
+
+from graph_core import pack_bits
+
+# 边的分类
+EDGE_TREE, EDGE_BACK, EDGE_FORWARD, EDGE_CROSS = range(4)
+EDGE_KIND_NAMES = ["tree", "back", "forward", "cross"]
+
+# 轨迹事件
+EVENT_DISCOVER, EVENT_EDGE, EVENT_FINISH = range(3)
+
+
+class DFSTrace:
+    def __init__(self, num_nodes, roots, discovery, finish, parents, order, finish_order,
+                 edge_kinds, events):
+        self.num_nodes = num_nodes
+        self.roots = roots                # 每棵 DFS 树的根
+        self.discovery = discovery        # 发现时间，未访问为 -1
+        self.finish = finish              # 完成时间，未访问为 -1
+        self.parents = parents            # DFS 树中的父节点，根为 -1
+        self.order = order                # 发现顺序（前序）
+        self.finish_order = finish_order  # 完成顺序（后序）
+        self.edge_kinds = edge_kinds      # 与 CSR indices 对齐的边分类，未检查为 -1
+        # 事件轨迹：(类型, 节点, 另一端点/父节点, 边分类)
+        self.event_types, self.event_nodes, self.event_others, self.event_kinds = events
+
+    @property
+    def num_events(self):
+        return len(self.event_types)
+
+    @property
+    def visited(self):
+        return self.discovery >= 0
+
+    @property
+    def nbytes(self):
+        """时间戳、父节点、前序/后序、边分类和事件轨迹占用的字节数"""
+        arrays = (self.discovery, self.finish, self.parents, self.order, self.finish_order, self.edge_kinds,
+                  self.event_types, self.event_nodes, self.event_others, self.event_kinds)
+        return sum(a.nbytes for a in arrays)
+
+    def edge_kind_counts(self):
+        """各类边的数量 {名称: 数量}"""
+        counts = np.bincount(self.edge_kinds[self.edge_kinds >= 0], minlength=4)
+        return {name: int(c) for name, c in zip(EDGE_KIND_NAMES, counts)}
+
+    def events(self):
+        """逐个产生 (类型, 节点, 另一端点, 边分类)"""
+        return zip(self.event_types.tolist(), self.event_nodes.tolist(),
+                   self.event_others.tolist(), self.event_kinds.tolist())
+
+
+def dfs(graph, sources=None, record_events=True, dense=None):
+    """
+    从 sources 依次出发做 DFS（已访问的根会被跳过）。
+    sources 为 None 时遍历所有节点，得到整张图的 DFS 森林。
+    dense 为 None 时，不记录事件的稠密图自动使用位矩阵。
+    """
+    n = graph.num_nodes
+    if sources is None:
+        roots_iter = range(n)
+    elif np.isscalar(sources):
+        roots_iter = [int(sources)]
+    else:
+        roots_iter = [int(s) for s in sources]
+
+    if dense is None:
+        dense = not record_events and graph.prefers_bitset()
+    if dense:
+        if record_events:
+            raise ValueError("dense DFS cannot record events")
+        return _dfs_dense(graph, roots_iter)
+
+    # 转成 Python 列表后逐元素访问比 NumPy 标量快得多
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    cursor = indptr[:-1]  # 每个节点下一条待检查的出边
+    discovery = [-1] * n
+    finish = [-1] * n
+    parents = [-1] * n
+    on_stack = bytearray(n)
+    edge_kinds = [-1] * len(indices)
+    order = []
+    finish_order = []
+    roots = []
+
+    ev_type, ev_node, ev_other, ev_kind = [], [], [], []
+    clock = 0
+
+    for root in roots_iter:
+        if not 0 <= root < n:
+            raise ValueError(f"source {root} out of range")
+        if discovery[root] >= 0:
+            continue
+        roots.append(root)
+        discovery[root] = clock
+        clock += 1
+        order.append(root)
+        on_stack[root] = 1
+        stack = [root]
+        if record_events:
+            ev_type.append(EVENT_DISCOVER)
+            ev_node.append(root)
+            ev_other.append(-1)
+            ev_kind.append(-1)
+
+        while stack:
+            u = stack[-1]
+            pos = cursor[u]
+            if pos < indptr[u + 1]:
+                cursor[u] = pos + 1
+                v = indices[pos]
+                if discovery[v] < 0:
+                    kind = EDGE_TREE
+                elif on_stack[v]:
+                    kind = EDGE_BACK
+                elif discovery[u] < discovery[v]:
+                    kind = EDGE_FORWARD
+                else:
+                    kind = EDGE_CROSS
+                edge_kinds[pos] = kind
+                if record_events:
+                    ev_type.append(EVENT_EDGE)
+                    ev_node.append(u)
+                    ev_other.append(v)
+                    ev_kind.append(kind)
+
+                if kind == EDGE_TREE:
+                    parents[v] = u
+                    discovery[v] = clock
+                    clock += 1
+                    order.append(v)
+                    on_stack[v] = 1
+                    stack.append(v)
+                    if record_events:
+                        ev_type.append(EVENT_DISCOVER)
+                        ev_node.append(v)
+                        ev_other.append(u)
+                        ev_kind.append(-1)
+            else:
+                stack.pop()
+                on_stack[u] = 0
+                finish[u] = clock
+                clock += 1
+                finish_order.append(u)
+                if record_events:
+                    ev_type.append(EVENT_FINISH)
+                    ev_node.append(u)
+                    ev_other.append(-1)
+                    ev_kind.append(-1)
+
+    events = (np.array(ev_type, dtype=np.int8), np.array(ev_node, dtype=np.int64),
+              np.array(ev_other, dtype=np.int64), np.array(ev_kind, dtype=np.int8))
+    return DFSTrace(n, roots,
+                    np.array(discovery, dtype=np.int64), np.array(finish, dtype=np.int64),
+                    np.array(parents, dtype=np.int64), np.array(order, dtype=np.int64),
+                    np.array(finish_order, dtype=np.int64), np.array(edge_kinds, dtype=np.int8),
+                    events)
+
+
+def _dfs_dense(graph, roots_iter):
+    """位矩阵版 DFS：发现/完成顺序与 CSR 版本完全相同，不产生事件轨迹"""
+    n = graph.num_nodes
+    bits = graph.bitset()
+    rows = bits.rows
+    free = pack_bits(np.ones(n, dtype=bool), bits.num_words)  # 未访问位图
+    cursor = [0] * n  # 每个节点下一个待扫描的字
+    discovery = [-1] * n
+    finish = [-1] * n
+    parents = [-1] * n
+    order = []
+    finish_order = []
+    roots = []
+    clock = 0
+
+    def discover(v, parent):
+        nonlocal clock
+        discovery[v] = clock
+        clock += 1
+        parents[v] = parent
+        order.append(v)
+        word = v >> 6
+        free[word] = np.uint64(int(free[word]) & ~(1 << (v & 63)))
+
+    for root in roots_iter:
+        if not 0 <= root < n:
+            raise ValueError(f"source {root} out of range")
+        if discovery[root] >= 0:
+            continue
+        roots.append(root)
+        discover(root, -1)
+        stack = [root]
+
+        while stack:
+            u = stack[-1]
+            start = cursor[u]
+            hits = np.flatnonzero(rows[u, start:] & free[start:])
+            if len(hits):
+                # 已访问的邻居所在的字直接跳过，游标停在命中的字上（其中可能还有别的邻居）
+                word = start + int(hits[0])
+                cursor[u] = word
+                bits_left = int(rows[u, word] & free[word])
+                v = word * 64 + (bits_left & -bits_left).bit_length() - 1
+                discover(v, u)
+                stack.append(v)
+            else:
+                stack.pop()
+                cursor[u] = bits.num_words
+                finish[u] = clock
+                clock += 1
+                finish_order.append(u)
+
+    discovery = np.array(discovery, dtype=np.int64)
+    finish = np.array(finish, dtype=np.int64)
+    parents = np.array(parents, dtype=np.int64)
+    edge_kinds = classify_edges(graph, discovery, finish, parents)
+    empty = np.zeros(0, dtype=np.int64)
+    events = (empty.astype(np.int8), empty, empty, empty.astype(np.int8))
+    return DFSTrace(n, roots, discovery, finish, parents, np.array(order, dtype=np.int64),
+                    np.array(finish_order, dtype=np.int64), edge_kinds, events)
+
+
+def classify_edges(graph, discovery, finish, parents):
+    """
+    由发现/完成时间推出每条边的分类（与 CSR indices 对齐，未访问的起点为 -1）：
+        树边：v 的父节点是 u（重复边只算第一条）
+        后向边：v 是 u 的祖先或 u 自身，即 d[v] <= d[u] 且 f[u] <= f[v]
+        前向边：其余 d[u] < d[v] 的边（v 是已完成的后代）
+        横跨边：其余
+    """
+    src, dst = graph.edges()
+    kinds = np.full(len(dst), EDGE_CROSS, dtype=np.int8)
+    kinds[discovery[dst] > discovery[src]] = EDGE_FORWARD
+    kinds[(discovery[dst] <= discovery[src]) & (finish[src] <= finish[dst])] = EDGE_BACK
+    children = np.flatnonzero(parents >= 0)
+    tree = np.searchsorted(graph.edge_keys(), parents[children] * graph.num_nodes + children)
+    kinds[tree] = EDGE_TREE
+    kinds[discovery[src] < 0] = -1
+    return kinds
+
+
+# --- 基于 DFS 轨迹的图分析（全部线性时间，可无界面调用） ---
+
+def strongly_connected_components(graph, trace=None):
+    """
+    Tarjan 强连通分量（迭代版）：在 DFS 事件轨迹上计算 low-link。
+    返回 (labels, 分量数)，labels[v] 是 v 所在分量的编号；
+    编号按 Tarjan 的出栈顺序，即凝聚图的逆拓扑序。
+    """
+    if trace is None:
+        trace = dfs(graph)
+    n = graph.num_nodes
+    discovery = trace.discovery.tolist()
+    parents = trace.parents.tolist()
+    low = list(discovery)
+    labels = [-1] * n
+    scc_stack = []
+    count = 0
+
+    for event, u, v, kind in trace.events():
+        if event == EVENT_DISCOVER:
+            scc_stack.append(u)
+        elif event == EVENT_EDGE:
+            # 指向仍在分量栈中（尚未归入某个分量）的节点时更新 low
+            if kind != EDGE_TREE and labels[v] < 0 and discovery[v] < low[u]:
+                low[u] = discovery[v]
+        else:
+            p = parents[u]
+            if p >= 0 and low[u] < low[p]:
+                low[p] = low[u]
+            if low[u] == discovery[u]:
+                while True:
+                    w = scc_stack.pop()
+                    labels[w] = count
+                    if w == u:
+                        break
+                count += 1
+
+    return np.array(labels, dtype=np.int64), count
+
+
+def topological_sort(graph, trace=None):
+    """
+    拓扑排序：按完成时间逆序排列。
+    返回 (order, cycle)：无环时 cycle 为 None；有环时 order 为 None，cycle 是一个环上的节点序列。
+    """
+    if trace is None:
+        trace = dfs(graph)
+    back = np.flatnonzero(trace.edge_kinds == EDGE_BACK)
+    if len(back) == 0:
+        return trace.finish_order[::-1].copy(), None
+
+    # 后向边 u -> v 与树上 v ... u 的路径构成一个环
+    pos = int(back[0])
+    u = int(np.searchsorted(graph.indptr, pos, side='right') - 1)
+    v = int(graph.indices[pos])
+    cycle = [u]
+    while cycle[-1] != v:
+        cycle.append(int(trace.parents[cycle[-1]]))
+    cycle.reverse()
+    cycle.append(v)
+    return None, cycle
+
+
+def articulation_points_and_bridges(graph, trace=None):
+    """
+    割点与桥（按无向图处理，有向图会先转换成无向图）。
+    trace 如果给出，必须是在无向图上得到的 DFS 轨迹。
+    返回 (割点数组, 桥数组 shape=(k, 2))。
+    """
+    undirected = graph.to_undirected()
+    if trace is None:
+        trace = dfs(undirected)
+    n = undirected.num_nodes
+    discovery = trace.discovery.tolist()
+    parents = trace.parents.tolist()
+    low = list(discovery)
+    children = [0] * n
+    is_cut = bytearray(n)
+    bridges = []
+
+    for event, u, v, kind in trace.events():
+        if event == EVENT_EDGE:
+            # 无向图中只有树边和后向边；指回父节点的那条是树边本身，跳过
+            if kind == EDGE_BACK and v != parents[u] and discovery[v] < low[u]:
+                low[u] = discovery[v]
+        elif event == EVENT_FINISH:
+            p = parents[u]
+            if p < 0:
+                continue
+            children[p] += 1
+            if low[u] < low[p]:
+                low[p] = low[u]
+            if low[u] > discovery[p]:
+                bridges.append((p, u))
+            if parents[p] >= 0 and low[u] >= discovery[p]:
+                is_cut[p] = 1
+
+    for root in trace.roots:
+        if children[root] > 1:
+            is_cut[root] = 1
+
+    cut_vertices = np.flatnonzero(np.frombuffer(bytes(is_cut), dtype=np.uint8)) if n else np.zeros(0, np.int64)
+    return cut_vertices, np.array(bridges, dtype=np.int64).reshape(-1, 2)
@@ -0,0 +1,663 @@
+# -*- coding: utf-8 -*-
+"""
+BFS/DFS 共用的持久化图形对象
+
+每张图只创建一次：
+    - 边           -> 一个 LineCollection（静态，进入背景缓存）
+    - 节点         -> 一个 scatter (PathCollection)
+    - 节点标签     -> Text 对象（只为视口内的节点创建，节点过多或缩得太小时不创建）
+每一步只修改节点的状态编码，通过 set_facecolors 更新颜色，
+再用 blitting 只重绘发生变化的节点，因此单步渲染时间与变化的节点数成正比。
+
+缩放和平移（滚轮缩放，右键/中键拖动平移，双击右键复原）时按视口重新挑选要画的对象：
+    - 节点由网格索引查出视口内的部分
+    - 边只取视口附近节点的关联边，再加上少数长边，按包围盒判断是否与视口相交
+    - 边的中点按屏幕上的小格子计数，过密的格子不再逐条画边，而是画成一块灰度表示边的密度
+    - 节点半径不足 LABEL_MIN_PIXELS 像素时不画标签
+因此一次完整重绘的耗时取决于视口中能看到的内容，而不是整张图的大小。
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.image import AxesImage
+
+from spatial_index import GridIndex
+
+# 细节层次
+LABEL_MIN_PIXELS = 5     # 节点半径小于这么多像素时不画标签
+OUTLINE_MIN_PIXELS = 3   # 节点半径小于这么多像素时不画黑色轮廓（轮廓占了散点绘制的大部分时间）
+MARKER_MIN_PIXELS = 1.5  # 缩小后节点至少画这么大（像素），否则看不见
+PICK_PIXELS = 4          # 点击/悬停的命中半径至少这么多像素
+TILE_PIXELS = 12         # 边密度格子的边长（像素）
+DENSE_TILE_EDGES = 12    # 格子里的边（按中点计）多于此数时整格画成密度块
+LONG_EDGE_FACTOR = 4.0   # 长于边长中位数这么多倍的边单独检查是否穿过视口
+ZOOM_STEP = 1.25         # 滚轮每格的缩放倍数
+ZOOM_RANGE = (0.25, 1e4)  # 相对初始视野的缩放范围
+
+
+def state_codes(num_nodes, *layers):
+    """
+    按优先级从低到高叠加节点状态，返回长度为 num_nodes 的编码数组。
+    layers 中每一项是 (节点集合, 编码)，后面的覆盖前面的。
+    """
+    codes = np.zeros(num_nodes, dtype=np.int16)
+    for nodes, code in layers:
+        if nodes is None:
+            continue
+        if np.isscalar(nodes):
+            codes[int(nodes)] = code
+            continue
+        idx = np.fromiter(nodes, dtype=np.int64) if not isinstance(nodes, np.ndarray) else nodes
+        if len(idx):
+            codes[idx] = code
+    return codes
+
+
+def format_nodes(nodes, limit=20):
+    """节点列表的简短文本（过长时截断）"""
+    nodes = list(nodes)
+    if len(nodes) <= limit:
+        return str([int(v) for v in nodes])
+    return str([int(v) for v in nodes[:limit]])[:-1] + f", ... (+{len(nodes) - limit})]"
+
+
+def fit_node_radius(positions, max_radius=30, min_radius=0.05, sample=64):
+    """
+    按节点间距选择节点半径：取部分节点到最近邻距离的中位数的 0.3 倍。
+    半径是数据坐标，放大后节点不会互相重叠；缩小时由 GraphArtists 保证最小的显示大小。
+    """
+    positions = np.asarray(positions, dtype=float)
+    n = len(positions)
+    if n < 2:
+        return max_radius
+    picked = positions[np.linspace(0, n - 1, min(sample, n)).astype(np.int64)]
+    dist = np.linalg.norm(picked[:, None, :] - positions[None, :, :], axis=2)
+    dist[dist == 0] = np.inf  # 去掉到自身的距离
+    nearest = dist.min(axis=1)
+    nearest = nearest[np.isfinite(nearest)]
+    if len(nearest) == 0:
+        return max_radius
+    return float(np.clip(0.3 * np.median(nearest), min_radius, max_radius))
+
+
+def _label_text(value):
+    return f"{value:g}" if isinstance(value, (float, np.floating)) else str(value)
+
+
+class GraphArtists:
+    renderer = "Vector"
+
+    def __init__(self, ax, canvas, palette, node_radius=30, label_limit=200,
+                 ring_color='orange', path_color='orange', highlight_color='red', hover_color='deepskyblue'):
+        self.ax = ax
+        self.canvas = canvas
+        self.palette = to_rgba_array(palette)  # 状态编码 -> RGBA
+        self.node_radius = node_radius
+        self.label_limit = label_limit
+        self.ring_rgba = np.array(to_rgba(ring_color))
+        self.path_color = path_color
+        self.highlight_color = highlight_color
+        self.hover_color = hover_color
+
+        self.positions = np.zeros((0, 2))
+        self.codes = np.zeros(0, dtype=np.int16)
+        self.rings = np.zeros(0, dtype=bool)
+        self.path = []
+
+        self.edge_collection = None
+        self.node_collection = None
+        self.ring_collection = None
+        self.path_collection = None
+        self.highlight_collection = None
+        self.labels = {}             # 节点 -> Text，只包含视口内的节点
+        self.edge_labels = []
+        self._edge_values = None     # 边标签的内容，与边对齐
+        self._edge_src = self._edge_dst = np.zeros(0, dtype=np.int64)
+        self._highlighted = None  # 当前高亮的 (src, dst)
+        self.hover_collection = None
+        self.hover = None            # 鼠标悬停的节点
+        self._hover_drawn = False    # 悬停外圈当前是否画在画面上
+        self._frame = None           # 画悬停外圈之前的画面，用于擦除它
+        self.background = None
+        self._marker_size = None
+        self._built = False  # build 之后才有图形对象
+
+        # 视口裁剪
+        self.index = GridIndex(self.positions)
+        self.home_view = ((0, 1000), (0, 500))
+        self.visible = np.zeros(0, dtype=np.int64)        # 视口内的节点
+        self.visible_edges = np.zeros(0, dtype=np.int64)  # 逐条画出的边
+        self._slots = np.zeros(0, dtype=np.int64)         # 节点在 visible 中的位置，不可见为 -1
+        self._inc_ptr = np.zeros(1, dtype=np.int64)       # 节点 -> 关联边（CSR）
+        self._inc_edges = np.zeros(0, dtype=np.int64)
+        self._edge_alive = np.zeros(0, dtype=bool)        # 编辑时删除的边标为 False
+        self._extra_edges = np.zeros(0, dtype=np.int64)   # build 之后添加的边（不在关联表中）
+        self._long_edges = np.zeros(0, dtype=np.int64)
+        self._long_length = 0.0
+        self._bounds = (np.zeros(2), np.zeros(2))  # 所有节点的包围盒
+        self.density_image = None
+        self._pan = None  # 拖动平移：(按下时的像素坐标, 按下时的视野)
+
+        self._cids = [self.canvas.mpl_connect(name, handler) for name, handler in (
+            ('draw_event', self._on_draw),
+            ('scroll_event', self._on_scroll),
+            ('button_press_event', self._on_press),
+            ('motion_notify_event', self._on_motion),
+            ('button_release_event', self._on_release))]
+
+    @property
+    def num_nodes(self):
+        return len(self.positions)
+
+    # --- 构建（每张图一次） ---
+
+    def build(self, positions, src, dst, title="", xlim=(0, 1000), ylim=(0, 500), edge_labels=None):
+        ax = self.ax
+        ax.clear()
+        ax.set_xlim(*xlim)
+        ax.set_ylim(*ylim)
+        ax.set_aspect('equal')
+        ax.axis('off')
+        self.home_view = (tuple(xlim), tuple(ylim))
+
+        self.positions = np.asarray(positions, dtype=float)
+        n = len(self.positions)
+        self.codes = np.zeros(n, dtype=np.int16)
+        self.rings = np.zeros(n, dtype=bool)
+        self.path = []
+        self.background = None
+        self._marker_size = None
+        self._edge_src, self._edge_dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        self._edge_values = edge_labels
+        self._highlighted = None
+        self.hover = None
+        self._hover_drawn = False
+        self.labels = {}
+        self.edge_labels = []
+        self.visible = np.zeros(0, dtype=np.int64)
+        self._slots = np.full(n, -1, dtype=np.int64)
+        self._edge_alive = np.ones(len(self._edge_src), dtype=bool)
+        self._extra_edges = np.zeros(0, dtype=np.int64)
+        self._build_incidence()
+        self._positions_changed()
+        self._create_artists()
+        self._built = True
+        ax.set_title(title, fontsize=16)
+        self._cull()
+        self.canvas.draw()
+
+    def _create_artists(self):
+        ax = self.ax
+        # 边：一个静态的 LineCollection（只含视口内逐条画出的边），过密的部分画成密度图
+        self.edge_collection = LineCollection([], colors='black', linewidths=2, zorder=1)
+        ax.add_collection(self.edge_collection)
+        self.density_image = AxesImage(ax, interpolation='nearest', origin='lower', zorder=0.5)
+        self.density_image.set_visible(False)
+        ax.add_image(self.density_image)
+
+        # 以下都是动画对象，不进入背景缓存
+        self.path_collection = LineCollection([], colors=self.path_color, linewidths=4, alpha=0.7,
+                                              zorder=2, animated=True)
+        ax.add_collection(self.path_collection)
+        # 额外高亮的边（例如桥），与路径无关
+        self.highlight_collection = LineCollection([], colors=self.highlight_color, linewidths=5,
+                                                   zorder=2, animated=True)
+        ax.add_collection(self.highlight_collection)
+
+        self.node_collection = ax.scatter([], [], s=1, edgecolors='black', linewidths=2, zorder=3, animated=True)
+        self.ring_collection = ax.scatter([], [], s=1, facecolors='none', edgecolors=[self.ring_rgba],
+                                          linewidths=2, zorder=4, animated=True)
+
+        # 增量重绘用的临时对象（只包含变化的节点/路径段）
+        self._scratch_nodes = ax.scatter([], [], s=1, edgecolors='black', linewidths=2, zorder=3, animated=True)
+        self._scratch_rings = ax.scatter([], [], s=1, facecolors='none', edgecolors=[self.ring_rgba],
+                                         linewidths=2, zorder=4, animated=True)
+        self._scratch_path = LineCollection([], colors=self.path_color, linewidths=4, alpha=0.7,
+                                            zorder=2, animated=True)
+        ax.add_collection(self._scratch_path)
+
+        # 悬停外圈：单个标记，擦除时只恢复画它之前的画面
+        self.hover_collection = ax.scatter([], [], s=1, facecolors='none', edgecolors=self.hover_color,
+                                           linewidths=3, zorder=6, animated=True)
+
+    def _set_ring_offsets(self):
+        """外圈集合只包含视口内带外圈的节点"""
+        ringed = self.visible[self.rings[self.visible]]
+        self.ring_collection.set_offsets(self.positions[ringed].reshape(-1, 2))
+
+    def _radius_points(self):
+        """数据坐标中的节点半径在当前视野下对应的大小（points）"""
+        trans = self.ax.transData
+        radius_px = abs(trans.transform((self.node_radius, 0))[0] - trans.transform((0, 0))[0])
+        return radius_px * 72.0 / self.ax.figure.dpi
+
+    def _update_marker_size(self):
+        """把数据坐标中的节点半径换算成 scatter 的面积（points^2）"""
+        points = max(self._radius_points(), MARKER_MIN_PIXELS * 72.0 / self.ax.figure.dpi)
+        size = (2 * points) ** 2
+        ring_size = (2 * (points + max(points / 6, 2))) ** 2  # 外圈比节点大一圈，小节点至少大 2 点
+        if size != self._marker_size:
+            self._marker_size = size
+            self._ring_size = ring_size
+            outline = 2 if points * self.ax.figure.dpi / 72.0 >= OUTLINE_MIN_PIXELS else 0
+            for coll in (self.node_collection, self._scratch_nodes):
+                coll.set_sizes([size])
+                coll.set_linewidths(outline)
+            for coll in (self.ring_collection, self._scratch_rings, self.hover_collection):
+                coll.set_sizes([ring_size])
+
+    def _on_draw(self, event):
+        """完整重绘后：缓存背景，再画上所有动画对象"""
+        if self.node_collection is None or self.node_collection.axes is not self.ax:
+            return
+        self._update_marker_size()
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+        self._hover_drawn = False
+        self._show_hover()
+
+    def _draw_animated(self):
+        ax = self.ax
+        ax.draw_artist(self.highlight_collection)
+        ax.draw_artist(self.path_collection)
+        ax.draw_artist(self.node_collection)
+        ax.draw_artist(self.ring_collection)
+        for label in self.labels.values():
+            ax.draw_artist(label)
+
+    # --- 每一步的更新 ---
+
+    def update(self, codes, rings=None, path=None):
+        """
+        codes: 每个节点的状态编码（索引 palette）
+        rings: 需要外圈高亮的节点（布尔数组），path: 当前路径节点序列
+        """
+        codes = np.asarray(codes, dtype=np.int16)
+        rings = np.zeros(self.num_nodes, dtype=bool) if rings is None else np.asarray(rings, dtype=bool)
+        path = [] if path is None else list(path)
+
+        changed = np.flatnonzero(codes != self.codes)
+        ring_changed = np.flatnonzero(rings != self.rings)
+        # 外圈消失或路径回退时，需要擦除，只能恢复背景整体重绘
+        needs_erase = bool(np.any(self.rings[ring_changed])) or path[:len(self.path)] != self.path
+        new_path_nodes = path[max(len(self.path) - 1, 0):] if not needs_erase else path
+
+        self.codes = codes
+        self.rings = rings
+        old_path, self.path = self.path, path
+        self.node_collection.set_facecolors(self.palette[codes[self.visible]])
+        if len(ring_changed):
+            self._set_ring_offsets()
+        self.path_collection.set_segments(self._path_segments(path))
+
+        if self.background is None or not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+            return
+
+        dirty = set(changed.tolist()) | set(ring_changed.tolist())
+        path_grew = len(path) > len(old_path)
+        if not needs_erase and not dirty and not path_grew:
+            return
+
+        self._hide_hover()
+        if needs_erase:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+        else:
+            if path_grew:
+                segments = self._path_segments(new_path_nodes)
+                self._scratch_path.set_segments(segments)
+                self.ax.draw_artist(self._scratch_path)
+                dirty.update(new_path_nodes)
+            self._redraw_nodes(np.fromiter(dirty, dtype=np.int64))
+        self._show_hover()
+
+        self.canvas.blit(self.ax.bbox)
+
+    def _redraw_nodes(self, nodes):
+        """只在当前画面上覆盖重绘给定节点（视口外的跳过）"""
+        ax = self.ax
+        nodes = nodes[self._slots[nodes] >= 0]
+        if len(nodes) == 0:
+            return
+        self._scratch_nodes.set_offsets(self.positions[nodes])
+        self._scratch_nodes.set_facecolors(self.palette[self.codes[nodes]])
+        ax.draw_artist(self._scratch_nodes)
+
+        ringed = nodes[self.rings[nodes]]
+        if len(ringed):
+            self._scratch_rings.set_offsets(self.positions[ringed])
+            ax.draw_artist(self._scratch_rings)
+
+        if self.labels:
+            for node in nodes:
+                label = self.labels.get(int(node))
+                if label is not None:
+                    ax.draw_artist(label)
+
+    def _path_segments(self, path):
+        if len(path) < 2:
+            return []
+        pts = self.positions[np.asarray(path, dtype=np.int64)]
+        return np.stack([pts[:-1], pts[1:]], axis=1)
+
+    def set_palette(self, palette):
+        """更换状态编码对应的颜色；下一次 update 会重绘所有节点"""
+        self.palette = to_rgba_array(palette)
+        self.codes = np.full(self.num_nodes, -1, dtype=np.int16)
+
+    def highlight_edges(self, src=None, dst=None):
+        """高亮给定的边（不传参数则清除高亮）"""
+        if src is None or len(src) == 0:
+            self._highlighted = None
+            segments = []
+        else:
+            self._highlighted = (np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64))
+            segments = self._edge_segments(*self._highlighted)
+        self.highlight_collection.set_segments(segments)
+        if self.background is None or not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self._hover_drawn = False
+        self._show_hover()
+        self.canvas.blit(self.ax.bbox)
+
+    # --- 鼠标悬停 ---
+
+    def set_hover(self, node):
+        """给鼠标悬停的节点画外圈（None 表示清除），只恢复/重绘这一个标记"""
+        if node == self.hover:
+            return
+        self.hover = node
+        if self.background is None or not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+            return
+        self._hide_hover()
+        self._show_hover()
+        self.canvas.blit(self.ax.bbox)
+
+    def _hide_hover(self):
+        if self._hover_drawn:
+            self.canvas.restore_region(self._frame)
+            self._hover_drawn = False
+
+    def _show_hover(self):
+        if self.hover is None or self.hover_collection is None or self.hover >= self.num_nodes:
+            return
+        self._frame = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.hover_collection.set_offsets([self.positions[self.hover]])
+        self.ax.draw_artist(self.hover_collection)
+        self._hover_drawn = True
+
+    def set_positions(self, positions):
+        """移动节点（例如布局迭代时）：边、标签、路径和高亮随之移动，然后完整重绘"""
+        self.positions = np.asarray(positions, dtype=float)
+        self._positions_changed()
+        self._cull()
+        self.path_collection.set_segments(self._path_segments(self.path))
+        if self._highlighted is not None:
+            self.highlight_collection.set_segments(self._edge_segments(*self._highlighted))
+        # 背景（边）变了，必须完整重绘；draw_event 会重新缓存背景
+        self.canvas.draw_idle()
+
+    def _edge_segments(self, src, dst):
+        if len(src) == 0:
+            return np.zeros((0, 2, 2))
+        return np.stack([self.positions[src], self.positions[dst]], axis=1)
+
+    def redraw(self):
+        """强制完整重绘（例如标题改变后）"""
+        self.canvas.draw()
+
+    def disconnect(self):
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
+
+    # --- 视口裁剪 ---
+
+    def _build_incidence(self):
+        """每个节点的关联边（按节点排序的 CSR），用来从视口内的节点找到要检查的边"""
+        src, dst = self._edge_src, self._edge_dst
+        ends = np.concatenate([src, dst])
+        order = np.argsort(ends, kind='stable')
+        self._inc_edges = np.tile(np.arange(len(src), dtype=np.int64), 2)[order]
+        counts = np.bincount(ends, minlength=self.num_nodes)
+        self._inc_ptr = np.concatenate([[0], np.cumsum(counts)])
+
+    def _positions_changed(self):
+        """坐标改变后更新索引、包围盒和长边列表"""
+        self.index.update(self.positions)
+        if self.num_nodes:
+            self._bounds = (self.positions.min(axis=0), self.positions.max(axis=0))
+        else:
+            self._bounds = (np.zeros(2), np.zeros(2))
+        # 长度超过中位数 LONG_EDGE_FACTOR 倍的边两端都可能在视口外，需要单独检查
+        src, dst = self._edge_src, self._edge_dst
+        if len(src) == 0:
+            self._long_edges = np.zeros(0, dtype=np.int64)
+            self._long_length = 0.0
+            return
+        delta = self.positions[src] - self.positions[dst]
+        lengths = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        self._long_length = LONG_EDGE_FACTOR * float(np.median(lengths))
+        self._long_edges = np.flatnonzero(lengths > self._long_length)
+
+    def _incident_edges(self, nodes):
+        starts = self._inc_ptr[nodes]
+        counts = self._inc_ptr[nodes + 1] - starts
+        # 把各节点的区间 [start, start + count) 拼接成一个下标数组
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+        return self._inc_edges[offsets]
+
+    def _edges_in_view(self, x0, y0, x1, y1):
+        """包围盒与视口相交的边；不长于 _long_length 的边至少有一端离视口不超过这个距离"""
+        src, dst = self._edge_src, self._edge_dst
+        if len(src) == 0:
+            return np.zeros(0, dtype=np.int64)
+        lo, hi = self._bounds
+        if x0 <= lo[0] and y0 <= lo[1] and x1 >= hi[0] and y1 >= hi[1]:
+            return np.flatnonzero(self._edge_alive)
+        reach = self._long_length
+        near = self.index.in_rect(x0 - reach, y0 - reach, x1 + reach, y1 + reach)
+        near = near[near < len(self._inc_ptr) - 1]  # 编辑时添加的节点没有关联表中的边
+        edges = np.unique(np.concatenate([self._incident_edges(near), self._long_edges, self._extra_edges]))
+        edges = edges[self._edge_alive[edges]]
+        a, b = self.positions[src[edges]], self.positions[dst[edges]]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        keep = (lo[:, 0] <= x1) & (hi[:, 0] >= x0) & (lo[:, 1] <= y1) & (hi[:, 1] >= y0)
+        return edges[keep]
+
+    def _aggregate_dense(self, edges, x0, y0, x1, y1):
+        """按边的中点在屏幕格子中计数，过密的格子画成密度图，返回仍需逐条画出的边"""
+        image = self.density_image
+        if len(edges) <= DENSE_TILE_EDGES:
+            image.set_visible(False)
+            return edges
+        nx = max(int(self.ax.bbox.width // TILE_PIXELS), 1)
+        ny = max(int(self.ax.bbox.height // TILE_PIXELS), 1)
+        mids = (self.positions[self._edge_src[edges]] + self.positions[self._edge_dst[edges]]) / 2
+        tx = np.floor((mids[:, 0] - x0) / (x1 - x0) * nx).astype(np.int64)
+        ty = np.floor((mids[:, 1] - y0) / (y1 - y0) * ny).astype(np.int64)
+        inside = (tx >= 0) & (tx < nx) & (ty >= 0) & (ty < ny)
+        tiles = ty[inside] * nx + tx[inside]
+        counts = np.bincount(tiles, minlength=nx * ny)
+        dense = counts > DENSE_TILE_EDGES
+        if not dense.any():
+            image.set_visible(False)
+            return edges
+
+        aggregated = np.zeros(len(edges), dtype=bool)
+        aggregated[inside] = dense[tiles]
+        # 黑色，透明度随边数的对数增加；不密的格子完全透明
+        shade = np.log1p(counts) / np.log1p(counts.max())
+        rgba = np.zeros((ny * nx, 4))
+        rgba[:, 3] = np.where(dense, 0.3 + 0.6 * shade, 0.0)
+        image.set_data(rgba.reshape(ny, nx, 4))
+        image.set_extent((x0, x1, y0, y1))
+        image.set_visible(True)
+        return edges[~aggregated]
+
+    def _view_bounds(self):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        return x0, y0, x1, y1
+
+    def _select_nodes(self, x0, y0, x1, y1):
+        """视口内（加上外圈的宽度）的节点"""
+        margin = 1.5 * self.pick_radius()  # 外圈的半径（放大后不再把视口外的一大圈节点也算进来）
+        self._slots[self.visible] = -1
+        self.visible = self.index.in_rect(x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+        self._slots[self.visible] = np.arange(len(self.visible))
+
+    def _cull(self):
+        """按当前视野重新挑选要画的节点、边、标签和密度块"""
+        x0, y0, x1, y1 = self._view_bounds()
+        self._select_nodes(x0, y0, x1, y1)
+        points = self.positions[self.visible]
+        self.node_collection.set_offsets(points)
+        self.node_collection.set_facecolors(self.palette[self.codes[self.visible]])
+        self._set_ring_offsets()
+
+        edges = self._edges_in_view(x0, y0, x1, y1)
+        self.visible_edges = self._aggregate_dense(edges, x0, y0, x1, y1)
+        self.edge_collection.set_segments(
+            self._edge_segments(self._edge_src[self.visible_edges], self._edge_dst[self.visible_edges]))
+        self._update_labels()
+        self.background = None
+
+    def _update_labels(self):
+        """只为视口内的节点和逐条画出的边创建标签，节点太小或太多时不画"""
+        for text in list(self.labels.values()) + self.edge_labels:
+            text.remove()
+        self.labels, self.edge_labels = {}, []
+        points = self._radius_points()
+        if points * self.ax.figure.dpi / 72.0 < LABEL_MIN_PIXELS:
+            return
+        # 标签字号随节点在屏幕上的大小缩放，最大 14 号
+        font_scale = min(points / 18.0, 1.0)
+        ax = self.ax
+        if len(self.visible) <= self.label_limit:
+            self.labels = {int(i): ax.text(px, py, str(i), fontsize=max(14 * font_scale, 5), ha='center',
+                                           va='center', fontweight='bold', zorder=5, animated=True,
+                                           clip_on=True)
+                           for i, (px, py) in zip(self.visible, self.positions[self.visible])}
+        edges = self.visible_edges
+        if self.labels and self._edge_values is not None and len(edges) <= self.label_limit:
+            src, dst = self._edge_src[edges], self._edge_dst[edges]
+            mids = (self.positions[src] + self.positions[dst]) / 2
+            self.edge_labels = [ax.text(mx, my, _label_text(self._edge_values[e]), fontsize=max(10 * font_scale, 5),
+                                        ha='center', va='center', zorder=1.5, clip_on=True,
+                                        bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
+                                for e, (mx, my) in zip(edges, mids)]
+
+    # --- 编辑 ---
+
+    def add_edge(self, u, v, label=None):
+        """
+        添加一条边：记入新增边列表（每次裁剪时和长边一样单独检查），不重建关联表。
+        修改后调用 refresh() 重画。
+        """
+        edge = len(self._edge_src)
+        self._edge_src = np.append(self._edge_src, u)
+        self._edge_dst = np.append(self._edge_dst, v)
+        self._edge_alive = np.append(self._edge_alive, True)
+        self._extra_edges = np.append(self._extra_edges, edge)
+        if self._edge_values is not None:
+            self._edge_values = np.append(self._edge_values, np.nan if label is None else label)
+
+    def remove_edge(self, u, v):
+        """删除 u - v 之间的边（不区分方向），没有这条边时返回 False"""
+        edges = np.concatenate([self._incident_edges(np.array([u])) if u < len(self._inc_ptr) - 1
+                                else np.zeros(0, dtype=np.int64), self._extra_edges])
+        src, dst = self._edge_src[edges], self._edge_dst[edges]
+        match = edges[self._edge_alive[edges] & (((src == u) & (dst == v)) | ((src == v) & (dst == u)))]
+        if len(match) == 0:
+            return False
+        self._edge_alive[match[0]] = False
+        return True
+
+    def add_node(self, position):
+        """在 position 处添加一个节点（状态编码 0），返回它的编号"""
+        node = self.num_nodes
+        self.positions = np.vstack([self.positions, np.asarray(position, dtype=float).reshape(1, 2)])
+        self.codes = np.append(self.codes, np.int16(0))
+        self.rings = np.append(self.rings, False)
+        self._slots = np.append(self._slots, -1)
+        self.index.update(self.positions)
+        self._bounds = (self.positions.min(axis=0), self.positions.max(axis=0))
+        return node
+
+    def refresh(self):
+        """编辑后按当前视野重新裁剪并完整重绘（代价只取决于视口中的内容）"""
+        if self._built:
+            self._cull()
+        self.canvas.draw_idle()
+
+    # --- 缩放和平移 ---
+
+    def set_view(self, xlim, ylim):
+        """设置视野，重新裁剪后完整重绘"""
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(*ylim)
+        if self._built:
+            self._cull()
+        self.canvas.draw_idle()
+
+    def reset_view(self):
+        self.set_view(*self.home_view)
+
+    @property
+    def zoom_level(self):
+        """相对初始视野的放大倍数"""
+        x0, x1 = self.ax.get_xlim()
+        (h0, h1), _ = self.home_view
+        return (h1 - h0) / (x1 - x0)
+
+    def zoom(self, factor, x=None, y=None):
+        """以 (x, y)（默认视野中心）为不动点缩放，factor > 1 放大"""
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        x = (x0 + x1) / 2 if x is None else x
+        y = (y0 + y1) / 2 if y is None else y
+        level = float(np.clip(self.zoom_level * factor, *ZOOM_RANGE))
+        factor = level / self.zoom_level
+        self.set_view(((x0 - x) / factor + x, (x1 - x) / factor + x),
+                      ((y0 - y) / factor + y, (y1 - y) / factor + y))
+
+    def pan(self, dx, dy):
+        """视野平移 (dx, dy)（数据坐标）"""
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        self.set_view((x0 + dx, x1 + dx), (y0 + dy, y1 + dy))
+
+    def pick_radius(self):
+        """点击/悬停的命中半径（数据坐标）：节点半径，但在屏幕上不小于 PICK_PIXELS"""
+        x0, x1 = self.ax.get_xlim()
+        per_pixel = abs(x1 - x0) / max(self.ax.bbox.width, 1)
+        return max(self.node_radius, PICK_PIXELS * per_pixel)
+
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax:
+            return
+        self.zoom(ZOOM_STEP if event.button == 'up' else 1 / ZOOM_STEP, event.xdata, event.ydata)
+
+    def _on_press(self, event):
+        # 左键留给窗口选择节点；右键/中键拖动平移，双击复原
+        if event.inaxes is not self.ax or event.button not in (2, 3):
+            return
+        if event.dblclick:
+            self._pan = None
+            self.reset_view()
+            return
+        self._pan = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _on_motion(self, event):
+        if self._pan is None:
+            return
+        px, py, (x0, x1), (y0, y1) = self._pan
+        # 按按下时的视野换算像素位移，拖动过程中不累积误差
+        dx = (event.x - px) * (x1 - x0) / self.ax.bbox.width
+        dy = (event.y - py) * (y1 - y0) / self.ax.bbox.height
+        self.set_view((x0 - dx, x1 - dx), (y0 - dy, y1 - dy))
+
+    def _on_release(self, event):
+        self._pan = None
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+图遍历基准测试（命令行，无界面）
+
+    python graph_benchmark.py --nodes 100000 --edges 1000000
+    python graph_benchmark.py --workers 1,2,4,8      # 多进程 BFS 加速比
+    python graph_benchmark.py --dijkstra             # Dijkstra 与 BFS 的开销对比
+    python graph_benchmark.py --generators           # 不同度分布的生成图上的 BFS
+    python graph_benchmark.py --layout               # 力导向布局每次迭代的耗时
+    python graph_benchmark.py --load soc-graph.txt.gz  # 在导入的图上测试（边表/邻接表/.npz/memmap 目录）
+    python graph_benchmark.py --dense 20000 --density 0.05  # 稠密图：CSR 与位矩阵遍历对比
+    python graph_benchmark.py --components           # 连通分量（并查集 / 分量扫描）与多源 BFS
+    python graph_benchmark.py --incremental 1000     # 随机改边后增量修复 BFS 与从头重算的对比
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+from graph_core import CSRGraph, random_weights
+import bfs_engine
+import dfs_engine
+import parallel_bfs
+import shortest_path
+import graph_generators
+import graph_layout
+import graph_io
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """运行 repeat 次，返回 (最短耗时, 最后一次的结果)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def random_graph(num_nodes, num_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, num_nodes, num_edges)
+    dst = rng.integers(0, num_nodes, num_edges)
+    return CSRGraph.from_edges(num_nodes, src, dst, directed=False)
+
+
+def scale_free_graph(num_nodes, num_edges, exponent=2.1, seed=0):
+    """Chung-Lu 幂律图：端点按 i^(-1/(exponent-1)) 的权重抽样"""
+    rng = np.random.default_rng(seed)
+    weights = np.arange(1, num_nodes + 1, dtype=np.float64) ** (-1.0 / (exponent - 1.0))
+    weights /= weights.sum()
+    src = rng.choice(num_nodes, size=num_edges, p=weights)
+    dst = rng.choice(num_nodes, size=num_edges, p=weights)
+    return CSRGraph.from_edges(num_nodes, src, dst, directed=False)
+
+
+def bench_bfs(graph, source, repeat, reference=True):
+    t_level, result = timed(bfs_engine.bfs_levels, graph, source, repeat=repeat)
+    edges = int(result.edges_examined.sum())
+    print(f"  level-synchronous BFS : {t_level * 1000:9.1f} ms  "
+          f"reached={result.num_reached}  depth={result.depth}  "
+          f"edges examined={edges}  ({edges / max(t_level, 1e-9) / 1e6:.1f} M edges/s)")
+    if reference:
+        t_ref, (dist, _) = timed(bfs_engine.bfs_reference, graph, source, repeat=1)
+        assert np.array_equal(dist, result.distances), "distance mismatch"
+        print(f"  queue BFS (reference) : {t_ref * 1000:9.1f} ms  speedup x{t_ref / max(t_level, 1e-9):.1f}")
+    return result
+
+
+def bench_direction(graph, source, repeat, alpha, beta):
+    """对比自顶向下与方向优化两种模式检查的边数"""
+    t_td, td = timed(bfs_engine.bfs_levels, graph, source, repeat=repeat)
+    t_do, do = timed(bfs_engine.bfs_direction_optimizing, graph, source, alpha, beta, repeat=repeat)
+    assert np.array_equal(td.distances, do.distances), "distance mismatch"
+    print(f"  {'level':>5} {'frontier':>10} {'top-down':>12} {'dir-opt':>12}  direction")
+    for i, size in enumerate(td.level_sizes):
+        td_edges = td.edges_examined[i] if i < len(td.edges_examined) else 0
+        do_edges = do.edges_examined[i] if i < len(do.edges_examined) else 0
+        direction = do.directions[i] if i < len(do.directions) else ""
+        print(f"  {i:>5} {size:>10} {td_edges:>12} {do_edges:>12}  {direction}")
+    td_total, do_total = int(td.edges_examined.sum()), int(do.edges_examined.sum())
+    print(f"  total edges examined: top-down={td_total}  direction-optimizing={do_total}  "
+          f"(x{td_total / max(do_total, 1):.1f} fewer)")
+    print(f"  time: top-down={t_td * 1000:.1f} ms  direction-optimizing={t_do * 1000:.1f} ms")
+
+
+def bench_parallel(graph, source, repeat, worker_counts):
+    """多进程 BFS 的加速比曲线（相对单进程层同步引擎）"""
+    t_serial, serial = timed(bfs_engine.bfs_levels, graph, source, repeat=repeat)
+    print(f"  {'workers':>7} {'time (ms)':>10} {'speedup':>8}")
+    print(f"  {'serial':>7} {t_serial * 1000:>10.1f} {1.0:>8.2f}")
+    for workers in worker_counts:
+        with parallel_bfs.ParallelBFS(graph, workers) as engine:
+            engine.run(source)  # 预热：启动进程池并挂载共享内存
+            t_par, result = timed(engine.run, source, repeat=repeat)
+        assert np.array_equal(result.distances, serial.distances), "distance mismatch"
+        print(f"  {workers:>7} {t_par * 1000:>10.1f} {t_serial / max(t_par, 1e-9):>8.2f}")
+
+
+def bench_shortest_path(graph, source, repeat):
+    """单位权重下 Dijkstra 与 BFS 结果相同，比较松弛/堆操作带来的额外开销；再给出随机权重的情况"""
+    t_bfs, bfs = timed(bfs_engine.bfs_levels, graph, source, repeat=repeat)
+    t_unit, unit = timed(shortest_path.dijkstra, graph, source, record=False, repeat=repeat)
+    reached = np.isfinite(unit.distances)
+    assert np.array_equal(np.where(reached, unit.distances, -1).astype(np.int64), bfs.distances), \
+        "distance mismatch"
+    weighted_graph = graph.with_weights(random_weights(graph, rng=0))
+    t_weighted, weighted = timed(shortest_path.dijkstra, weighted_graph, source, record=False, repeat=repeat)
+
+    print(f"  {'':<24} {'time (ms)':>10} {'edges':>10} {'relax':>10} {'pushes':>10} {'pops':>10} {'stale':>8}")
+    print(f"  {'BFS':<24} {t_bfs * 1000:>10.1f} {int(bfs.edges_examined.sum()):>10} "
+          f"{bfs.num_reached - 1:>10} {'-':>10} {'-':>10} {'-':>8}")
+    for name, t, r in (("Dijkstra (unit)", t_unit, unit), ("Dijkstra (weights 1-10)", t_weighted, weighted)):
+        print(f"  {name:<24} {t * 1000:>10.1f} {r.edges_examined:>10} {r.relaxations:>10} "
+              f"{r.pushes:>10} {r.pops:>10} {r.stale_pops:>8}")
+
+
+def bench_generators(num_nodes, num_edges, repeat, seed=0):
+    """各生成器在相近规模下的构建时间、度分布与 BFS 耗时"""
+    avg = max(num_edges / max(num_nodes, 1), 1.0)  # 每个节点的无向边数
+    rows = max(int(np.sqrt(num_nodes)), 1)
+    builders = [
+        ("G(n,m)", lambda: graph_generators.erdos_renyi_gnm(num_nodes, num_edges, rng=seed)),
+        ("G(n,p)", lambda: graph_generators.erdos_renyi_gnp(num_nodes, 2 * avg / max(num_nodes - 1, 1), rng=seed)),
+        ("Barabasi-Albert", lambda: graph_generators.barabasi_albert(num_nodes, max(round(avg), 1), rng=seed)),
+        ("grid", lambda: graph_generators.grid_graph(rows, -(-num_nodes // rows))),
+        ("R-MAT", lambda: graph_generators.rmat_graph(max(int(np.ceil(np.log2(num_nodes))), 1),
+                                                     max(round(avg), 1), directed=False, rng=seed)),
+    ]
+    print(f"  {'generator':<16} {'nodes':>9} {'edges':>10} {'build ms':>9} {'max deg':>8} "
+          f"{'BFS ms':>8} {'reached':>9} {'depth':>6}")
+    for name, build in builders:
+        t_build, graph = timed(build, repeat=1)
+        degrees = graph.degree()
+        source = int(np.argmax(degrees))
+        t_bfs, result = timed(bfs_engine.bfs_levels, graph, source, repeat=repeat)
+        print(f"  {name:<16} {graph.num_nodes:>9} {graph.num_edges:>10} {t_build * 1000:>9.1f} "
+              f"{int(degrees.max()):>8} {t_bfs * 1000:>8.1f} {result.num_reached:>9} {result.depth:>6}")
+
+
+def bench_layout(max_nodes, repeat, seed=0):
+    """Barnes-Hut 力导向布局单次迭代的耗时，节点数每次乘 10，最后一列应大致不变"""
+    print(f"  {'nodes':>9} {'ms / iteration':>15} {'us / (n log2 n)':>16}")
+    n = 1000
+    while n <= max_nodes:
+        graph = graph_generators.barabasi_albert(n, 2, rng=seed)
+        steps = lambda: [None for _ in graph_layout.force_directed_steps(graph, iterations=repeat, rng=seed)]
+        t, _ = timed(steps, repeat=1)
+        per_iteration = t / repeat
+        print(f"  {n:>9} {per_iteration * 1000:>15.1f} {per_iteration * 1e6 / (n * np.log2(n)):>16.3f}")
+        n *= 10
+
+
+def bench_dense(num_nodes, density, repeat, seed=0):
+    """同一张稠密图上 CSR 与位矩阵两种表示的遍历耗时，结果必须完全一致"""
+    t0 = time.perf_counter()
+    graph = random_graph(num_nodes, int(density * num_nodes * num_nodes / 2), seed)
+    print(f"  {graph} built in {(time.perf_counter() - t0) * 1000:.1f} ms, "
+          f"density={graph.density:.4f}, auto bitset={graph.prefers_bitset()}")
+    t0 = time.perf_counter()
+    bits = graph.bitset()
+    print(f"  bitset: {bits.nbytes / 2 ** 20:.1f} MB (CSR {graph.nbytes / 2 ** 20:.1f} MB), "
+          f"packed in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    print(f"  {'':<26} {'CSR ms':>10} {'bitset ms':>10} {'speedup':>8}")
+    runs = [
+        ("level-synchronous BFS", lambda dense: bfs_engine.bfs_levels(graph, 0, dense=dense)),
+        ("direction-optimizing BFS", lambda dense: bfs_engine.bfs_direction_optimizing(graph, 0, dense=dense)),
+        ("DFS (no events)", lambda dense: dfs_engine.dfs(graph, 0, record_events=False, dense=dense)),
+    ]
+    for name, run in runs:
+        t_csr, sparse = timed(run, False, repeat=repeat)
+        t_bits, dense = timed(run, True, repeat=repeat)
+        if isinstance(sparse, bfs_engine.BFSResult):
+            assert np.array_equal(sparse.distances, dense.distances), "distance mismatch"
+            assert np.array_equal(sparse.parents, dense.parents), "parent mismatch"
+        else:
+            assert np.array_equal(sparse.order, dense.order), "order mismatch"
+            assert np.array_equal(sparse.edge_kinds, dense.edge_kinds), "edge kind mismatch"
+        print(f"  {name:<26} {t_csr * 1000:>10.1f} {t_bits * 1000:>10.1f} {t_csr / max(t_bits, 1e-9):>8.1f}")
+
+
+def bench_components(graph, repeat, seeds=16, seed=0):
+    """并查集求连通分量、从各分量代表出发的分量扫描，以及多个随机源点的多源 BFS"""
+    t_uf, (labels, count) = timed(bfs_engine.connected_components, graph, repeat=repeat)
+    t_sweep, sweep = timed(bfs_engine.component_sweep, graph, repeat=repeat)
+    assert np.array_equal(sweep.labels, labels), "component mismatch"
+    sizes = np.bincount(labels)
+    print(f"  union-find        : {t_uf * 1000:9.1f} ms  components={count}  largest={int(sizes.max())}  "
+          f"isolated={int((sizes == 1).sum())}")
+    print(f"  components sweep  : {t_sweep * 1000:9.1f} ms  levels={sweep.depth + 1}  "
+          f"edges examined={int(sweep.edges_examined.sum())}")
+    sources = np.random.default_rng(seed).choice(graph.num_nodes, size=min(seeds, graph.num_nodes), replace=False)
+    t_multi, multi = timed(bfs_engine.multi_source_bfs, graph, sources, repeat=repeat)
+    print(f"  multi-source BFS  : {t_multi * 1000:9.1f} ms  seeds={len(multi.sources)}  "
+          f"reached={multi.num_reached}  max distance={multi.depth}")
+
+
+def bench_incremental(graph, source, edits, seed=0):
+    """随机插入/删除 edits 条边，比较增量修复与每次从头重建 CSR + BFS 的耗时和访问节点数"""
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    incremental = bfs_engine.IncrementalBFS(graph, source)
+    t_init = time.perf_counter() - t0
+    dynamic = incremental.graph
+    src, dst = graph.edges()
+    picks = rng.integers(0, max(len(src), 1), size=edits)
+    ends = rng.integers(0, graph.num_nodes, size=(edits, 2))
+    t0 = time.perf_counter()
+    for i in range(edits):
+        if i % 2 == 0 and len(src):
+            incremental.remove_edge(int(src[picks[i]]), int(dst[picks[i]]))
+        else:
+            incremental.add_edge(int(ends[i, 0]), int(ends[i, 1]))
+    t_inc = time.perf_counter() - t0
+    t_full, full = timed(lambda: bfs_engine.bfs_levels(dynamic.to_csr(), source), repeat=1)
+    assert np.array_equal(full.distances, incremental.distances), "incremental distance mismatch"
+    totals = incremental.totals
+    count = max(totals["edits"], 1)
+    print(f"  initial BFS       : {t_init * 1000:9.1f} ms")
+    print(f"  incremental repair: {t_inc * 1000 / count:9.3f} ms/edit  touched={totals['touched'] / count:.1f} "
+          f"nodes/edit  edges scanned={totals['edges_scanned'] / count:.1f}/edit  ({totals['edits']} edits)")
+    print(f"  full recompute    : {t_full * 1000:9.3f} ms/edit  touched={totals['full'] / count:.1f} nodes/edit  "
+          f"speedup={t_full / max(t_inc / count, 1e-9):.0f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Graph traversal benchmark")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-reference", action="store_true", help="skip the pure-Python queue BFS")
+    parser.add_argument("--alpha", type=float, default=bfs_engine.DEFAULT_ALPHA,
+                        help="top-down -> bottom-up threshold")
+    parser.add_argument("--beta", type=float, default=bfs_engine.DEFAULT_BETA,
+                        help="bottom-up -> top-down threshold")
+    parser.add_argument("--workers", type=str, default=None,
+                        help="comma-separated worker counts for the multi-process BFS, e.g. 1,2,4,8")
+    parser.add_argument("--dijkstra", action="store_true", help="compare heap-based Dijkstra with BFS")
+    parser.add_argument("--generators", action="store_true",
+                        help="BFS on graphs from every generator (different degree distributions)")
+    parser.add_argument("--layout", action="store_true", help="time the Barnes-Hut force-directed layout")
+    parser.add_argument("--load", type=str, default=None, metavar="PATH",
+                        help="benchmark an imported graph instead of a random one")
+    parser.add_argument("--components", action="store_true",
+                        help="connected components (union-find and sweep) and multi-source BFS")
+    parser.add_argument("--incremental", type=int, default=None, metavar="EDITS",
+                        help="random edge edits with incremental BFS repair vs full recompute")
+    parser.add_argument("--dense", type=int, default=None, metavar="NODES",
+                        help="compare CSR and bitset traversal on a dense random graph")
+    parser.add_argument("--density", type=float, default=0.05,
+                        help="edge density m / n^2 of the --dense graph")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.load:
+        graph, _ = graph_io.load_graph(args.load)
+    else:
+        graph = random_graph(args.nodes, args.edges, args.seed)
+    print(f"{graph} {'loaded' if args.load else 'built'} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    print("BFS:")
+    bench_bfs(graph, 0, args.repeat, reference=not args.no_reference)
+
+    t0 = time.perf_counter()
+    scale_free = scale_free_graph(args.nodes, args.edges, seed=args.seed)
+    print(f"\nscale-free {scale_free} built in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    source = int(np.argmax(scale_free.degree()))
+    print(f"Direction-optimizing BFS (alpha={args.alpha}, beta={args.beta}), source={source}:")
+    bench_direction(scale_free, source, args.repeat, args.alpha, args.beta)
+
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+        print(f"\nMulti-process BFS speedup ({os.cpu_count()} CPUs):")
+        bench_parallel(graph, 0, args.repeat, worker_counts)
+
+    if args.dijkstra:
+        print("\nDijkstra (binary heap, lazy deletion) vs BFS:")
+        bench_shortest_path(graph, 0, args.repeat)
+
+    if args.generators:
+        print("\nGenerators:")
+        bench_generators(args.nodes, args.edges, args.repeat, seed=args.seed)
+
+    if args.layout:
+        print("\nForce-directed layout (Barnes-Hut):")
+        bench_layout(args.nodes, args.repeat, seed=args.seed)
+
+    if args.components:
+        print("\nConnected components and multi-source BFS:")
+        bench_components(graph, args.repeat, seed=args.seed)
+
+    if args.incremental:
+        print(f"Incremental BFS ({args.incremental} random edge edits), source=0:")
+        bench_incremental(graph, 0, args.incremental, seed=args.seed)
+
+    if args.dense:
+        print("\nDense graph, CSR vs bitset adjacency:")
+        bench_dense(args.dense, args.density, args.repeat, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
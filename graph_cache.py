@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘上的图缓存（按内容寻址，LRU 淘汰）
+
+缓存目录下按类型分成几个子目录：
+    graphs/<指纹>/       图本身：graph_io.save_memmap 的格式加上默认坐标，读取时以 memmap 打开
+    layouts/<键>.npy     布局坐标
+    traces/<键>.pkl      遍历结果和时间线（结构不规则，用 pickle 保存）
+    aliases/<键>.json    来源（生成参数、导入的文件）到图指纹的映射
+
+键都是内容哈希：图用 CSRGraph.fingerprint()，布局和遍历轨迹再加上算法名和参数（make_key）。
+读取命中时更新条目的修改时间，写入后总大小超过上限就从最久没用过的条目开始删除。
+BFS、DFS 等窗口通过 shared_cache() 共用同一个目录；写入先写临时文件再改名，
+读写出错时按没有缓存处理，不影响正常使用。
+
+缓存目录和大小上限可以用环境变量 VIS_CACHE_DIR、VIS_CACHE_MB 修改，VIS_CACHE_MB=0 关闭缓存。
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+import numpy as np
+
+from graph_core import CSRGraph
+from graph_generators import generate
+from graph_io import load_graph, load_memmap, save_memmap
+
+DEFAULT_DIRECTORY = os.environ.get("VIS_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "visualization-suite")
+DEFAULT_MAX_BYTES = int(float(os.environ.get("VIS_CACHE_MB", 512)) * 1024 * 1024)
+CACHE_VERSION = 1  # 缓存内容的格式改变时加一，旧条目不再命中，之后被 LRU 淘汰
+
+SECTIONS = ("graphs", "layouts", "traces", "aliases")
+
+
+def make_key(*parts):
+    """把字符串、数字、数组、图拼成一个内容哈希（图按结构指纹加边权计算）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{CACHE_VERSION}".encode())
+    for part in parts:
+        if isinstance(part, CSRGraph):
+            digest.update(part.fingerprint().encode())
+            if part.weights is not None:
+                digest.update(np.ascontiguousarray(part.weights).tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _entry_size(path):
+    if os.path.isdir(path):
+        return sum(_entry_size(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def _save_array(path, array):
+    with open(path, "wb") as f:  # 直接给文件名时 np.save 会在临时名字后面加 .npy
+        np.save(f, array)
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+class GraphCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, section, name):
+        return os.path.join(self.directory, section, name)
+
+    def _hit(self, path):
+        """读取命中：更新修改时间（LRU 顺序），条目不存在时返回 False"""
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _write(self, path, writer):
+        """先写到同一目录下的临时名字再改名；别的线程/进程已经写好同一个键时保留已有的"""
+        if not self.enabled:
+            return False
+        directory = os.path.dirname(path)
+        temp = os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            writer(temp)
+            if os.path.exists(path):
+                _remove(temp)
+                self._hit(path)
+            else:
+                os.replace(temp, path)
+        except OSError:
+            if os.path.exists(temp):
+                _remove(temp)
+            return False
+        self.evict()
+        return True
+
+    # --- 图 ---
+
+    def put_graph(self, graph, positions=None, node_ids=None):
+        """保存图（以及默认坐标、原始编号），返回图的指纹"""
+        key = graph.fingerprint()
+
+        def writer(temp):
+            save_memmap(temp, graph, node_ids)
+            if positions is not None:
+                _save_array(os.path.join(temp, "positions.npy"), np.asarray(positions, dtype=np.float64))
+
+        self._write(self._path("graphs", key), writer)
+        return key
+
+    def get_graph(self, key):
+        """按指纹取图，返回 (graph, positions, node_ids)，不在缓存中时返回 None"""
+        path = self._path("graphs", key)
+        if not self.enabled or not self._hit(path):
+            return None
+        try:
+            graph, node_ids = load_memmap(path)
+            positions_path = os.path.join(path, "positions.npy")
+            positions = np.load(positions_path) if os.path.exists(positions_path) else None
+        except (OSError, ValueError, KeyError):
+            return None
+        graph._fingerprint = key  # 目录名就是指纹，不必再读一遍整个数组计算哈希
+        return graph, positions, node_ids
+
+    # --- 来源别名 ---
+
+    def set_alias(self, source_key, graph_key):
+        """记录某个来源（生成参数、文件）最近一次得到的图；同一个来源会覆盖旧的映射"""
+        if not self.enabled:
+            return
+        path = self._path("aliases", source_key + ".json")
+        temp = path + f".tmp-{uuid.uuid4().hex}"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, "w") as f:
+                json.dump({"graph": graph_key}, f)
+            os.replace(temp, path)
+        except OSError:
+            pass
+
+    def lookup(self, source_key):
+        """按来源取图，返回 (graph, positions, node_ids) 或 None"""
+        path = self._path("aliases", source_key + ".json")
+        if not self.enabled or not self._hit(path):
+            return None
+        try:
+            with open(path) as f:
+                graph_key = json.load(f)["graph"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return self.get_graph(graph_key)
+
+    # --- 布局和遍历轨迹 ---
+
+    def put_layout(self, graph, name, positions):
+        positions = np.asarray(positions, dtype=np.float64)
+        self._write(self._path("layouts", make_key("layout", name, graph.fingerprint()) + ".npy"),
+                    lambda temp: _save_array(temp, positions))
+
+    def get_layout(self, graph, name):
+        path = self._path("layouts", make_key("layout", name, graph.fingerprint()) + ".npy")
+        if not self.enabled or not self._hit(path):
+            return None
+        try:
+            positions = np.load(path)
+        except (OSError, ValueError):
+            return None
+        return positions if positions.shape == (graph.num_nodes, 2) else None
+
+    def put_trace(self, key, value):
+        """保存任意可 pickle 的对象（遍历结果、时间线等），key 由 make_key 生成"""
+        def writer(temp):
+            with open(temp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._write(self._path("traces", key + ".pkl"), writer)
+
+    def get_trace(self, key):
+        path = self._path("traces", key + ".pkl")
+        if not self.enabled or not self._hit(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    # --- 容量 ---
+
+    def entries(self):
+        """所有条目 [(修改时间, 字节数, 路径), ...]，按最久没用过的在前排序"""
+        result = []
+        for section in SECTIONS:
+            directory = os.path.join(self.directory, section)
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if ".tmp-" in name:
+                    continue  # 正在写入
+                path = os.path.join(directory, name)
+                try:
+                    result.append((os.path.getmtime(path), _entry_size(path), path))
+                except OSError:
+                    continue  # 刚被别的进程删除
+        result.sort()
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """总大小超过上限时从最久没用过的条目开始删除，返回删除的条目数"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                try:
+                    _remove(path)
+                except OSError:
+                    continue  # Windows 下仍被 memmap 打开的文件删不掉，留到下次
+                total -= size
+                removed += 1
+        return removed
+
+    def clear(self):
+        return self.evict(0)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """所有窗口共用的缓存对象"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = GraphCache()
+        return _shared
+
+
+def cached_generate(kind, num_nodes, fresh=False, cache=None):
+    """
+    按 (类型, 节点数) 取上一次生成的图，返回 (graph, positions)。
+    fresh=True 或缓存中没有时重新生成，并记为这组参数最近的图。
+    """
+    cache = cache or shared_cache()
+    source = make_key("generate", kind, int(num_nodes))
+    if not fresh:
+        cached = cache.lookup(source)
+        if cached is not None:
+            graph, positions, _ = cached
+            return graph, positions
+    graph, positions = generate(kind, num_nodes)
+    cache.set_alias(source, cache.put_graph(graph, positions))
+    return graph, positions
+
+
+def cached_import(path, cache=None, **options):
+    """
+    导入图文件，返回 (graph, node_ids)。文件（按路径、大小、修改时间区分）导入过一次后，
+    再次导入直接以 memmap 打开缓存中的 CSR 数组，不再解析文本。
+    """
+    cache = cache or shared_cache()
+    path = os.path.abspath(path)
+    if os.path.isdir(path) or os.path.basename(path) == "meta.json":
+        return load_graph(path, **options)  # 本来就是 memmap 格式
+    stat = os.stat(path)
+    source = make_key("import", path, stat.st_size, stat.st_mtime_ns, sorted(options.items()))
+    cached = cache.lookup(source)
+    if cached is not None:
+        graph, _, node_ids = cached
+        return graph, node_ids
+    graph, node_ids = load_graph(path, **options)
+    cache.set_alias(source, cache.put_graph(graph, node_ids=node_ids))
+    return graph, node_ids
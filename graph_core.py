@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""
+BFS/DFS 共用的图数据结构
+
+图以 CSR（压缩稀疏行）形式存放在 NumPy 数组中：
+    indptr[u] : indptr[u + 1]   是节点 u 的出边在 indices 中的区间
+    indices                     是按 (源节点, 目标节点) 排好序的目标节点
+    weights                     可选的边权，与 indices 一一对应
+由于每一行的邻居都是有序的，边查询只需在行内二分查找；
+批量查询使用全局有序的边键 u * n + v。
+
+稠密图另有位矩阵形式 BitsetGraph：每个节点一行，每个可能的邻居占一位（按 64 位打包），
+前沿展开和"未访问的邻居"过滤变成整行的按位与/或。边密度 m / n^2 超过 DENSE_THRESHOLD
+且位矩阵不超过 DENSE_MAX_BYTES 时，BFS/DFS 引擎自动改用它（CSRGraph.prefers_bitset）。
+"""
+import hashlib
+import math
+import numpy as np
+
+
+# 稠密模式：位矩阵的一行需要 n / 64 个字，CSR 的一行需要 密度 * n 个邻居，
+# 所以密度超过约 1/64 时按位处理整行比逐个处理邻居更省
+DENSE_THRESHOLD = 1 / 64
+DENSE_MIN_NODES = 1024               # 更小的图两种方式都很快，不值得构建位矩阵
+DENSE_MAX_BYTES = 256 * 1024 * 1024  # 位矩阵占 n^2 / 8 字节，约 4.6 万个节点
+
+
+def _index_dtype(num_nodes):
+    return np.int32 if num_nodes < 2 ** 31 - 1 else np.int64
+
+
+class CSRGraph:
+    def __init__(self, num_nodes, indptr, indices, weights=None, directed=True):
+        self.num_nodes = int(num_nodes)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=_index_dtype(num_nodes))
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.directed = directed
+        self._keys = None       # 有序边键，按需构建
+        self._reverse = None    # 转置图，按需构建
+        self._fingerprint = None
+        self._bitset = None     # 稠密图的位矩阵，按需构建
+
+        if len(self.indptr) != self.num_nodes + 1:
+            raise ValueError("indptr must have num_nodes + 1 entries")
+        if self.weights is not None and len(self.weights) != len(self.indices):
+            raise ValueError("weights must match indices in length")
+
+    # --- 构建 ---
+
+    @classmethod
+    def from_edges(cls, num_nodes, src, dst, weights=None, directed=True,
+                   dedup=True, drop_self_loops=True):
+        """由边数组构建 CSR 图；无向图会自动补全反向边"""
+        n = int(num_nodes)
+        src = np.asarray(src, dtype=np.int64).ravel()
+        dst = np.asarray(dst, dtype=np.int64).ravel()
+        if len(src) != len(dst):
+            raise ValueError("src and dst must have the same length")
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            if len(weights) != len(src):
+                raise ValueError("weights must match src/dst in length")
+        if len(src) and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+            raise ValueError("edge endpoint out of range")
+
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            if weights is not None:
+                weights = np.concatenate([weights, weights])
+
+        if drop_self_loops:
+            keep = src != dst
+            src, dst = src[keep], dst[keep]
+            if weights is not None:
+                weights = weights[keep]
+
+        keys = src * n + dst
+        if dedup:
+            # np.unique 同时完成排序与去重（重复边保留第一次出现的权重）
+            keys, first = np.unique(keys, return_index=True)
+            if weights is not None:
+                weights = weights[first]
+        else:
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            if weights is not None:
+                weights = weights[order]
+
+        src_sorted = keys // n if n else keys
+        indices = keys - src_sorted * n
+        counts = np.bincount(src_sorted, minlength=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        graph = cls(n, indptr, indices, weights, directed)
+        graph._keys = keys
+        return graph
+
+    @classmethod
+    def from_adjacency(cls, adjacency, directed=True):
+        """由 {节点: [邻居, ...]} 形式的邻接表构建"""
+        n = len(adjacency)
+        src = [u for u, nbrs in adjacency.items() for _ in nbrs]
+        dst = [v for nbrs in adjacency.values() for v in nbrs]
+        return cls.from_edges(n, src, dst, directed=directed)
+
+    # --- 查询 ---
+
+    @property
+    def num_edges(self):
+        """存储的有向边数（无向图中每条边计两次）"""
+        return len(self.indices)
+
+    def __len__(self):
+        return self.num_nodes
+
+    def neighbors(self, u):
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def neighbor_weights(self, u):
+        if self.weights is None:
+            return np.ones(self.indptr[u + 1] - self.indptr[u])
+        return self.weights[self.indptr[u]:self.indptr[u + 1]]
+
+    def degree(self, u=None):
+        if u is None:
+            return np.diff(self.indptr)
+        return int(self.indptr[u + 1] - self.indptr[u])
+
+    def has_edge(self, u, v):
+        """行内二分查找，O(log deg)"""
+        start, end = self.indptr[u], self.indptr[u + 1]
+        pos = start + np.searchsorted(self.indices[start:end], v)
+        return bool(pos < end and self.indices[pos] == v)
+
+    def has_edges(self, src, dst):
+        """批量边查询，返回布尔数组"""
+        keys = self.edge_keys()
+        query = np.asarray(src, dtype=np.int64) * self.num_nodes + np.asarray(dst, dtype=np.int64)
+        pos = np.searchsorted(keys, query)
+        pos = np.minimum(pos, max(len(keys) - 1, 0))
+        return (keys[pos] == query) if len(keys) else np.zeros(query.shape, dtype=bool)
+
+    def edge_weight(self, u, v, default=None):
+        start, end = self.indptr[u], self.indptr[u + 1]
+        pos = start + np.searchsorted(self.indices[start:end], v)
+        if pos < end and self.indices[pos] == v:
+            return 1.0 if self.weights is None else float(self.weights[pos])
+        return default
+
+    def edge_weights(self, src, dst, default=np.nan):
+        """批量查询边权，不存在的边返回 default"""
+        keys = self.edge_keys()
+        query = np.asarray(src, dtype=np.int64) * self.num_nodes + np.asarray(dst, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(keys, query), max(len(keys) - 1, 0))
+        found = (keys[pos] == query) if len(keys) else np.zeros(query.shape, dtype=bool)
+        values = np.ones(len(keys)) if self.weights is None else self.weights
+        result = np.full(query.shape, default, dtype=np.float64)
+        result[found] = values[pos[found]]
+        return result
+
+    def with_weights(self, weights):
+        """共用同一份结构、换一组边权的新图"""
+        graph = CSRGraph(self.num_nodes, self.indptr, self.indices, weights, self.directed)
+        graph._keys = self._keys
+        graph._fingerprint = self._fingerprint  # 指纹不包含边权
+        return graph
+
+    def edge_keys(self):
+        if self._keys is None:
+            self._keys = self.edge_sources() * self.num_nodes + self.indices
+        return self._keys
+
+    def edge_sources(self):
+        """与 indices 对齐的源节点数组"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+
+    def edges(self):
+        """返回 (src, dst) 两个数组"""
+        return self.edge_sources(), self.indices.astype(np.int64)
+
+    def undirected_edges(self):
+        """去掉方向与重复后的边 (u < v)，用于绘图"""
+        src, dst = self.edges()
+        lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+        keys = np.unique(lo * self.num_nodes + hi)
+        return keys // self.num_nodes, keys % self.num_nodes
+
+    def reverse(self):
+        """转置图（入边），结果会被缓存"""
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            src, dst = self.edges()
+            self._reverse = CSRGraph.from_edges(self.num_nodes, dst, src, self.weights,
+                                                directed=True, dedup=False, drop_self_loops=False)
+        return self._reverse
+
+    def to_undirected(self):
+        if not self.directed:
+            return self
+        src, dst = self.edges()
+        return CSRGraph.from_edges(self.num_nodes, src, dst, self.weights, directed=False)
+
+    def adjacency_lists(self):
+        """转换成 {节点: [邻居, ...]}（只用于小图）"""
+        return {u: self.neighbors(u).tolist() for u in range(self.num_nodes)}
+
+    def fingerprint(self):
+        """图结构的内容哈希（节点数、是否有向、CSR 数组），用作缓存键"""
+        if self._fingerprint is not None:
+            return self._fingerprint
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.num_nodes}:{int(self.directed)}".encode())
+        digest.update(np.ascontiguousarray(self.indptr, dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(self.indices, dtype=np.int64).tobytes())
+        self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    # --- 稠密图 ---
+
+    @property
+    def density(self):
+        """存储的有向边数 / n^2"""
+        return self.num_edges / max(self.num_nodes, 1) ** 2
+
+    def prefers_bitset(self):
+        """是否应该改用位矩阵遍历（见 DENSE_THRESHOLD）"""
+        n = self.num_nodes
+        return (n >= DENSE_MIN_NODES and self.density >= DENSE_THRESHOLD
+                and n * BitsetGraph.words_for(n) * 8 <= DENSE_MAX_BYTES)
+
+    def bitset(self):
+        """位矩阵形式（出边），结果会被缓存"""
+        if self._bitset is None:
+            self._bitset = BitsetGraph.from_csr(self)
+        return self._bitset
+
+    @property
+    def nbytes(self):
+        total = self.indptr.nbytes + self.indices.nbytes
+        if self.weights is not None:
+            total += self.weights.nbytes
+        return total
+
+    def __repr__(self):
+        kind = "directed" if self.directed else "undirected"
+        return f"CSRGraph({self.num_nodes} nodes, {self.num_edges} edges, {kind})"
+
+
+def pack_bits(mask, num_words):
+    """布尔数组 -> 打包的 64 位字（第 i 位对应节点 i），长度补齐到 num_words"""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    words = np.zeros(num_words * 8, dtype=np.uint8)
+    words[:len(packed)] = packed
+    return words.view('<u8')
+
+
+def set_bits(words):
+    """一维字数组中所有为 1 的位，返回 (字的下标, 位的下标)，按位置升序"""
+    nonzero = np.flatnonzero(words)
+    bits = np.unpackbits(np.ascontiguousarray(words[nonzero]).view(np.uint8).reshape(-1, 8),
+                         axis=1, bitorder='little')
+    rows, cols = np.nonzero(bits)
+    return nonzero[rows], cols
+
+
+def lowest_bit(words):
+    """每个非零字中最低的 1 所在的位"""
+    words = np.asarray(words, dtype=np.uint64)
+    low = words & (~words + np.uint64(1))  # 只保留最低位（二进制补码）
+    return np.log2(low.astype(np.float64)).astype(np.int64)
+
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """每个 64 位字中 1 的个数"""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(words).astype(np.int64)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.int64)
+
+
+class BitsetGraph:
+    """
+    稠密图的邻接位矩阵：rows[u] 是 num_words 个 64 位字，第 v 位为 1 表示存在边 u -> v。
+    邻居顺序就是节点编号的升序，与 CSR 行内的顺序一致，因此遍历结果与 CSR 版本完全相同。
+    重复边在位矩阵中合并为一位，degrees 仍沿用 CSR 的度数。
+    """
+
+    def __init__(self, num_nodes, rows, degrees, directed=True, source=None):
+        self.num_nodes = int(num_nodes)
+        self.rows = rows
+        self.degrees = degrees
+        self.directed = directed
+        self.source = source    # 对应的 CSRGraph，用于构建转置
+
+    @staticmethod
+    def words_for(num_nodes):
+        return max((int(num_nodes) + 63) // 64, 1)
+
+    @property
+    def num_words(self):
+        return self.rows.shape[1]
+
+    @classmethod
+    def from_csr(cls, graph, chunk_bytes=64 * 1024 * 1024):
+        """按行分块展开成布尔矩阵再打包，临时内存不超过 chunk_bytes"""
+        n = graph.num_nodes
+        num_words = cls.words_for(n)
+        rows = np.zeros((n, num_words), dtype='<u8')
+        step = max(chunk_bytes // (num_words * 64), 1)
+        for start in range(0, n, step):
+            stop = min(start + step, n)
+            lo, hi = graph.indptr[start], graph.indptr[stop]
+            block = np.zeros((stop - start, num_words * 64), dtype=bool)
+            local = np.repeat(np.arange(stop - start), np.diff(graph.indptr[start:stop + 1]))
+            block[local, graph.indices[lo:hi]] = True
+            rows[start:stop] = np.packbits(block, axis=1, bitorder='little').view('<u8')
+        return cls(n, rows, graph.degree(), graph.directed, graph)
+
+    def degree(self, u=None):
+        return self.degrees if u is None else int(self.degrees[u])
+
+    def reverse(self):
+        """转置（入边）：由 CSR 的转置构建，无向图就是自身"""
+        if not self.directed or self.source is None:
+            return self
+        return self.source.reverse().bitset()
+
+    def neighbors(self, u):
+        words, bits = set_bits(self.rows[u])
+        return words * 64 + bits
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes
+
+
+class DynamicGraph:
+    """
+    可修改的图：以一张 CSRGraph 为底，插入的边记在 added[u] = {v: 边权} 中，删除的底图边记在
+    removed（(u, v) 集合）中，邻居查询时合并两者，因此单次修改是 O(1)，不需要重建 CSR。
+    删除节点只去掉它的所有边并记入 deleted，编号保持不变（坐标等按节点编号的数组不用重排）。
+    无向图的每条边和 CSR 一样按两个方向各存一次。to_csr() 把当前状态合并成新的 CSRGraph。
+    """
+
+    def __init__(self, graph):
+        self.base = graph
+        self.directed = graph.directed
+        self.num_nodes = graph.num_nodes
+        self.added = {}         # u -> {v: 边权}
+        self.added_in = {}      # 有向图：v -> {u, ...}，用于入边查询
+        self.removed = set()    # 被删除的底图边 (u, v)
+        self.deleted = set()    # 被删除的节点
+        self.num_edges = graph.num_edges
+        self.version = 0        # 每次修改加一
+
+    def _check(self, u):
+        if not 0 <= u < self.num_nodes:
+            raise ValueError(f"node {u} out of range")
+        if u in self.deleted:
+            raise ValueError(f"node {u} has been deleted")
+
+    def _base_row(self, graph, u):
+        if u >= graph.num_nodes:
+            return []
+        return graph.indices[graph.indptr[u]:graph.indptr[u + 1]].tolist()
+
+    # --- 查询 ---
+
+    def neighbors(self, u):
+        """出边邻居列表：底图中未删除的邻居，再加上插入的邻居"""
+        row = self._base_row(self.base, u)
+        if self.removed:
+            row = [v for v in row if (u, v) not in self.removed]
+        extra = self.added.get(u)
+        return row + list(extra) if extra else row
+
+    def in_neighbors(self, v):
+        """入边邻居列表（无向图与 neighbors 相同）"""
+        if not self.directed:
+            return self.neighbors(v)
+        row = self._base_row(self.base.reverse(), v)
+        if self.removed:
+            row = [u for u in row if (u, v) not in self.removed]
+        extra = self.added_in.get(v)
+        return row + list(extra) if extra else row
+
+    def has_edge(self, u, v):
+        if v in self.added.get(u, ()):
+            return True
+        return (u, v) not in self.removed and u < self.base.num_nodes and v < self.base.num_nodes \
+            and self.base.has_edge(u, v)
+
+    def degree(self, u):
+        return len(self.neighbors(u))
+
+    # --- 修改 ---
+
+    def _insert(self, u, v, weight):
+        if (u, v) in self.removed:
+            self.removed.discard((u, v))  # 恢复底图中的边（沿用原来的边权）
+        else:
+            self.added.setdefault(u, {})[v] = weight
+            if self.directed:
+                self.added_in.setdefault(v, set()).add(u)
+        self.num_edges += 1
+
+    def _delete(self, u, v):
+        extra = self.added.get(u)
+        if extra is not None and v in extra:
+            del extra[v]
+            if self.directed:
+                self.added_in[v].discard(u)
+        else:
+            self.removed.add((u, v))
+        self.num_edges -= 1
+
+    def add_edge(self, u, v, weight=1.0):
+        """插入边 u -> v（无向图同时插入 v -> u）；边已存在或是自环时返回 False"""
+        self._check(u)
+        self._check(v)
+        if u == v or self.has_edge(u, v):
+            return False
+        self._insert(u, v, weight)
+        if not self.directed:
+            self._insert(v, u, weight)
+        self.version += 1
+        return True
+
+    def remove_edge(self, u, v):
+        """删除边 u -> v（无向图同时删除 v -> u）；边不存在时返回 False"""
+        if not self.has_edge(u, v):
+            return False
+        self._delete(u, v)
+        if not self.directed:
+            self._delete(v, u)
+        self.version += 1
+        return True
+
+    def add_node(self):
+        """新增一个孤立节点，返回它的编号"""
+        self.num_nodes += 1
+        self.version += 1
+        return self.num_nodes - 1
+
+    def remove_node(self, u):
+        """删除节点及其所有边，返回被删除的边 [(u, v), ...]（无向图每条边只列一次）"""
+        self._check(u)
+        edges = [(u, v) for v in self.neighbors(u)]
+        if self.directed:
+            edges += [(w, u) for w in self.in_neighbors(u)]
+        for a, b in edges:
+            self.remove_edge(a, b)
+        self.deleted.add(u)
+        self.version += 1
+        return edges
+
+    # --- 合并 ---
+
+    def to_csr(self):
+        """当前状态的 CSRGraph（底图的边权保留，插入的边使用插入时给出的边权）"""
+        n = self.num_nodes
+        src, dst = self.base.edges()
+        weights = self.base.weights
+        if self.removed:
+            gone = np.array([u * n + v for u, v in self.removed], dtype=np.int64)
+            keep = ~np.isin(src * n + dst, gone)
+            src, dst = src[keep], dst[keep]
+            weights = None if weights is None else weights[keep]
+        pairs = [(u, v, w) for u, nbrs in self.added.items() for v, w in nbrs.items()]
+        if pairs:
+            extra = np.array(pairs, dtype=np.float64).reshape(-1, 3)
+            src = np.concatenate([src, extra[:, 0].astype(np.int64)])
+            dst = np.concatenate([dst, extra[:, 1].astype(np.int64)])
+            if weights is not None or np.any(extra[:, 2] != 1.0):
+                base = np.ones(len(src) - len(extra)) if weights is None else weights
+                weights = np.concatenate([base, extra[:, 2]])
+        return CSRGraph.from_edges(n, src, dst, weights, directed=self.directed)
+
+    def compact(self):
+        """把累积的修改合并进底图，之后的邻居查询重新变成纯 CSR 切片"""
+        self.base = self.to_csr()
+        self.added, self.added_in, self.removed = {}, {}, set()
+        return self.base
+
+
+def random_ring_graph(num_nodes, min_extra=1, max_extra=2, rng=None):
+    """
+    环 + 随机弦：先连 i -> i+1 保证连通，再为每个节点额外添加 1-2 条随机边。
+    （原 generate_graph 的向量化版本）
+    """
+    rng = np.random.default_rng(rng)
+    n = int(num_nodes)
+    nodes = np.arange(n, dtype=np.int64)
+    ring_src, ring_dst = nodes, (nodes + 1) % n
+
+    extra = rng.integers(min_extra, max_extra + 1, size=n)
+    chord_src = np.repeat(nodes, extra)
+    chord_dst = rng.integers(0, n, size=len(chord_src))
+
+    src = np.concatenate([ring_src, chord_src])
+    dst = np.concatenate([ring_dst, chord_dst])
+    return CSRGraph.from_edges(n, src, dst, directed=True)
+
+
+def random_weights(graph, low=1, high=10, rng=None):
+    """
+    与 indices 对齐的随机整数边权，取值 [low, high]。
+    u -> v 与 v -> u 使用同一个权重，这样按无向边绘制的标签与实际边权一致。
+    """
+    rng = np.random.default_rng(rng)
+    n = graph.num_nodes
+    src, dst = graph.edges()
+    pairs = np.minimum(src, dst) * n + np.maximum(src, dst)
+    unique, inverse = np.unique(pairs, return_inverse=True)
+    values = rng.integers(low, high + 1, size=len(unique))
+    return values[inverse].astype(np.float64)
+
+
+def circular_layout(num_nodes, center=(500, 250), radius=200):
+    """节点按圆形排列，返回 (n, 2) 坐标数组"""
+    angles = 2 * math.pi * np.arange(num_nodes) / max(num_nodes, 1)
+    return np.column_stack([center[0] + radius * np.cos(angles),
+                            center[1] + radius * np.sin(angles)])
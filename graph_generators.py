@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+可复现的随机图生成器（向量化，直接生成 CSR 图）
+
+    erdos_renyi_gnm     G(n, m)：均匀抽取 m 条不同的边
+    erdos_renyi_gnp     G(n, p)：先按二项分布抽边数，再按 G(n, m) 抽边
+    barabasi_albert     优先连接（Batagelj-Brandes 边表复制，指针跳跃向量化）
+    grid_graph          二维网格 / 带对角线 / 环面
+    rmat_graph          R-MAT（Kronecker）图，Graph500 的默认参数
+
+所有生成器都接受 rng（种子或 np.random.Generator），同一种子得到同一张图。
+除 R-MAT 外默认生成无向图。
+"""
+import math
+import numpy as np
+
+from graph_core import CSRGraph, random_ring_graph
+
+
+def _unique_pairs(num_nodes, count, rng, directed):
+    """抽取 count 个不同的节点对（不含自环），不足时继续补抽"""
+    n = num_nodes
+    keys = np.zeros(0, dtype=np.int64)
+    while len(keys) < count:
+        batch = int((count - len(keys)) * 1.1) + 16
+        src = rng.integers(0, n, batch)
+        dst = rng.integers(0, n, batch)
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        if not directed:
+            src, dst = np.minimum(src, dst), np.maximum(src, dst)
+        # 保留抽取顺序的去重，再截断到 count 条，保证结果是均匀的
+        merged = np.concatenate([keys, src * n + dst])
+        _, first = np.unique(merged, return_index=True)
+        keys = merged[np.sort(first)][:count]
+    return keys // n, keys % n
+
+
+def erdos_renyi_gnm(num_nodes, num_edges, directed=False, rng=None):
+    """G(n, m)：在所有节点对中均匀抽取 num_edges 条不同的边"""
+    rng = np.random.default_rng(rng)
+    n = int(num_nodes)
+    max_edges = n * (n - 1) if directed else n * (n - 1) // 2
+    if not 0 <= num_edges <= max_edges:
+        raise ValueError(f"num_edges must be between 0 and {max_edges}")
+    if num_edges > max_edges // 2:
+        # 稠密时拒绝采样效率低：改为对所有节点对做一次置换
+        src, dst = np.nonzero(~np.eye(n, dtype=bool) if directed else np.triu(np.ones((n, n), dtype=bool), 1))
+        pick = rng.permutation(len(src))[:num_edges]
+        src, dst = src[pick], dst[pick]
+    else:
+        src, dst = _unique_pairs(n, int(num_edges), rng, directed)
+    return CSRGraph.from_edges(n, src, dst, directed=directed)
+
+
+def erdos_renyi_gnp(num_nodes, p, directed=False, rng=None):
+    """G(n, p)：每个节点对独立地以概率 p 相连"""
+    rng = np.random.default_rng(rng)
+    n = int(num_nodes)
+    if not 0.0 <= p <= 1.0:
+        raise ValueError("p must be in [0, 1]")
+    max_edges = n * (n - 1) if directed else n * (n - 1) // 2
+    # 边数服从 Binomial(N, p)，给定边数后边集是均匀的，与逐对抛硬币同分布
+    return erdos_renyi_gnm(n, int(rng.binomial(max_edges, p)), directed, rng)
+
+
+def barabasi_albert(num_nodes, edges_per_node=2, rng=None):
+    """
+    优先连接：每个新节点连出 edges_per_node 条边，目标按度数成比例选择。
+    Batagelj-Brandes 做法：边表 M 中第 2i 位是第 i 条边的新节点，第 2i+1 位复制 M[r]，
+    r 在 [0, 2i] 中均匀选取。r 落在奇数位时继续追溯，用指针跳跃整体向量化。
+    """
+    rng = np.random.default_rng(rng)
+    n, d = int(num_nodes), int(edges_per_node)
+    if d < 1:
+        raise ValueError("edges_per_node must be at least 1")
+    num_edges = n * d
+    sources = np.arange(num_edges, dtype=np.int64) // d
+    # r[i] 在 [0, 2i] 中均匀分布
+    ref = (rng.random(num_edges) * (2 * np.arange(num_edges) + 1)).astype(np.int64)
+    pos = ref.copy()
+    pending = np.flatnonzero(pos & 1)
+    while len(pending):
+        pos[pending] = ref[pos[pending] >> 1]
+        pending = pending[(pos[pending] & 1) == 1]
+    targets = sources[pos >> 1]
+    # 早期节点会产生自环/重复边，from_edges 会去掉
+    return CSRGraph.from_edges(n, sources, targets, directed=False)
+
+
+def grid_graph(rows, cols, diagonal=False, periodic=False):
+    """rows x cols 的二维网格，节点编号为 r * cols + c"""
+    rows, cols = int(rows), int(cols)
+    ids = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+    pairs = [(ids[:, :-1], ids[:, 1:]), (ids[:-1, :], ids[1:, :])]
+    if diagonal:
+        pairs += [(ids[:-1, :-1], ids[1:, 1:]), (ids[:-1, 1:], ids[1:, :-1])]
+    if periodic:
+        # 环面：首尾相连（尺寸为 1 或 2 时会产生自环/重复边，由 from_edges 去掉）
+        pairs += [(ids[:, -1], ids[:, 0]), (ids[-1, :], ids[0, :])]
+    src = np.concatenate([a.ravel() for a, _ in pairs])
+    dst = np.concatenate([b.ravel() for _, b in pairs])
+    return CSRGraph.from_edges(rows * cols, src, dst, directed=False)
+
+
+def grid_layout(rows, cols, center=(500, 250), size=(900, 420)):
+    """网格节点的坐标，(n, 2) 数组"""
+    step = min(size[0] / max(cols - 1, 1), size[1] / max(rows - 1, 1))
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    x = center[0] + (c - (cols - 1) / 2) * step
+    y = center[1] - (r - (rows - 1) / 2) * step
+    return np.column_stack([x, y])
+
+
+def rmat_graph(scale, edge_factor=16, a=0.57, b=0.19, c=0.19, directed=True, permute=True, rng=None):
+    """
+    R-MAT：2^scale 个节点、edge_factor * 2^scale 条边（去重前）。
+    每一位独立地按 (a, b, c, d) 选择邻接矩阵的象限，所有边同时处理。
+    permute 为 True 时随机重排节点编号，打乱高位节点度数大的规律。
+    """
+    rng = np.random.default_rng(rng)
+    scale = int(scale)
+    if a + b + c > 1.0:
+        raise ValueError("a + b + c must not exceed 1")
+    n = 1 << scale
+    m = int(edge_factor) * n
+    src = np.zeros(m, dtype=np.int64)
+    dst = np.zeros(m, dtype=np.int64)
+    for bit in range(scale):
+        r = rng.random(m)
+        # 象限：a 左上，b 右上，c 左下，d 右下
+        src_bit = r >= a + b
+        dst_bit = ((r >= a) & (r < a + b)) | (r >= a + b + c)
+        src |= src_bit.astype(np.int64) << bit
+        dst |= dst_bit.astype(np.int64) << bit
+    if permute:
+        perm = rng.permutation(n)
+        src, dst = perm[src], perm[dst]
+    return CSRGraph.from_edges(n, src, dst, directed=directed)
+
+
+# --- 界面使用的统一入口 ---
+
+GRAPH_KINDS = ["Ring + chords", "G(n,p)", "G(n,m)", "Barabási–Albert", "Grid", "R-MAT"]
+
+
+def generate(kind, num_nodes, rng=None, average_degree=3):
+    """
+    按名字生成一张约 num_nodes 个节点的图，返回 (graph, positions)。
+    positions 只有网格这类自带坐标的图才有，其余为 None。
+    网格取最接近的 rows x cols，R-MAT 取不小于 num_nodes 的 2 的幂。
+    """
+    n = max(int(num_nodes), 2)
+    if kind == "Ring + chords":
+        return random_ring_graph(n, 1, 2, rng=rng), None
+    if kind == "G(n,p)":
+        return erdos_renyi_gnp(n, min(average_degree / (n - 1), 1.0), rng=rng), None
+    if kind == "G(n,m)":
+        return erdos_renyi_gnm(n, min(n * average_degree // 2, n * (n - 1) // 2), rng=rng), None
+    if kind == "Barabási–Albert":
+        return barabasi_albert(n, max(round(average_degree / 2), 1), rng=rng), None
+    if kind == "Grid":
+        rows = max(int(math.sqrt(n)), 1)
+        cols = math.ceil(n / rows)
+        return grid_graph(rows, cols), grid_layout(rows, cols)
+    if kind == "R-MAT":
+        scale = max(math.ceil(math.log2(n)), 1)
+        return rmat_graph(scale, edge_factor=max(round(average_degree / 2), 1), rng=rng), None
+    raise ValueError(f"unknown graph kind {kind!r}")
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+图文件的导入与导出
+
+文本格式（流式读取，每次处理一大块，按块用 NumPy 解析，不构造 Python 元组列表）：
+    边表      每行 "u v [w ...]"，空白/逗号/分号分隔，SNAP 数据集即此格式；
+              第三列作为边权（weighted=True 时），更多的列忽略
+    邻接表    每行 "u v1 v2 v3 ..."（可写成 "u: v1 v2"），节点编号必须是非负整数
+以 # 或 % 开头的行是注释；CSV 第一行如果不是数字会被当作表头跳过；
+.gz 压缩文件直接读取。节点编号被重新映射到 0..n-1（node_ids[i] 是节点 i 的原始编号），
+重复边和自环由 CSRGraph.from_edges 去掉。
+
+二进制格式（原生 CSR）：
+    .npz      np.savez 保存的 indptr/indices/weights/node_ids，载入即完整读入内存
+    目录      每个数组一个 .npy 加上 meta.json，以只读 memmap 打开，几乎不耗时
+
+所有读取函数都返回 (graph, node_ids)。
+"""
+import gzip
+import json
+import os
+import re
+import warnings
+import numpy as np
+
+from graph_core import CSRGraph
+
+CHUNK_BYTES = 16 * 1024 * 1024
+COMMENT_CHARS = ("#", "%")
+FORMAT_VERSION = 1
+
+# 含有数据的行（用于核对每行的列数）
+NONEMPTY_LINE = re.compile(r"^[ \t\r\f\v]*\S", re.MULTILINE)
+
+EDGE_LIST_SUFFIXES = (".txt", ".csv", ".tsv", ".edges", ".el", ".edgelist")
+ADJACENCY_SUFFIXES = (".adj", ".adjlist")
+
+# 文件对话框使用的类型列表（memmap 目录选择其中的 meta.json）
+FILE_TYPES = [
+    ("Graph files", " ".join(f"*{s} *{s}.gz" for s in EDGE_LIST_SUFFIXES + ADJACENCY_SUFFIXES)
+     + " *.npz meta.json"),
+    ("All files", "*.*"),
+]
+
+
+def _open_binary(path):
+    return gzip.open(path, "rb") if str(path).endswith(".gz") else open(path, "rb")
+
+
+def _text_blocks(path):
+    """按块读取文本，每块在行尾处截断（不完整的最后一行并入下一块）"""
+    with _open_binary(path) as f:
+        rest = b""
+        while True:
+            data = f.read(CHUNK_BYTES)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                rest = data  # 一整块都没有换行，继续读
+                continue
+            rest = data[cut:]
+            yield data[:cut].decode("utf-8", errors="replace")
+        if rest.strip():
+            yield rest.decode("utf-8", errors="replace") + "\n"
+
+
+def _strip_comments(text, comments):
+    """去掉注释行，返回 (正文, 注释行列表)；块中没有注释字符时不逐行处理"""
+    if not any(c in text for c in comments):
+        return text, []
+    kept, dropped = [], []
+    for line in text.split("\n"):
+        (dropped if line.lstrip().startswith(comments) else kept).append(line)
+    return "\n".join(kept), dropped
+
+
+def _parse_numbers(text, dtype, path):
+    """把一块文本（空白分隔）解析成一维数组"""
+    with warnings.catch_warnings():
+        # 旧版 NumPy 遇到无法解析的内容只给出警告并返回部分结果
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=dtype, sep=" ")
+        except (ValueError, DeprecationWarning):
+            raise ValueError(f"{path}: could not parse numeric data") from None
+
+
+def _is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def _relabel(src, dst, extra=None, relabel=True):
+    """把原始编号映射到 0..n-1，返回 (节点数, src, dst, node_ids)"""
+    parts = [src, dst] + ([extra] if extra is not None else [])
+    all_ids = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    if len(all_ids) and all_ids.min() < 0:
+        raise ValueError("node ids must be non-negative")
+    if not relabel:
+        n = int(all_ids.max()) + 1 if len(all_ids) else 0
+        return n, src, dst, np.arange(n, dtype=np.int64)
+    node_ids, inverse = np.unique(all_ids, return_inverse=True)
+    inverse = inverse.ravel()
+    return len(node_ids), inverse[:len(src)], inverse[len(src):len(src) + len(dst)], node_ids
+
+
+def _detect_directed(comment_lines, default=True):
+    """SNAP 文件头写明 "Undirected graph" 时按无向图处理"""
+    for line in comment_lines:
+        if "undirected" in line.lower():
+            return False
+    return default
+
+
+def read_edge_list(path, directed=None, weighted=False, delimiter=None, comments=COMMENT_CHARS,
+                   relabel=True):
+    """
+    读取边表。directed 为 None 时根据文件头注释判断（默认有向）。
+    weighted=True 时第三列作为边权（缺少第三列会报错）。
+    """
+    src_parts, dst_parts, weight_parts = [], [], []
+    header_comments = []
+    columns = None
+    dtype = np.int64
+
+    for text in _text_blocks(path):
+        text, dropped = _strip_comments(text, comments)
+        if columns is None:
+            header_comments += dropped
+        if delimiter is not None:
+            text = text.replace(delimiter, " ")
+        elif "," in text or ";" in text:
+            text = text.replace(",", " ").replace(";", " ")
+
+        if columns is None:
+            # 由第一行数据确定列数，非数字的第一行视为表头
+            lines = text.lstrip().split("\n", 1)
+            first = lines[0].split()
+            if not first:
+                continue
+            if not all(_is_number(token) for token in first):
+                text = lines[1] if len(lines) > 1 else ""
+                lines = text.lstrip().split("\n", 1)
+                first = lines[0].split()
+                if not first:
+                    continue
+            columns = len(first)
+            if columns < 2:
+                raise ValueError(f"{path}: an edge list needs at least two columns")
+            if weighted and columns < 3:
+                raise ValueError(f"{path}: weighted=True but there is no weight column")
+            dtype = np.float64 if weighted else np.int64
+
+        if weighted or columns == 2:
+            values = _parse_numbers(text, dtype, path)
+        else:
+            # 多余的列（时间戳等）可能不是整数：按浮点解析后只保留前两列
+            values = _parse_numbers(text, np.float64, path)
+        # 总数能被列数整除还不够：按非空行数核对，列数不对的行不会被错位拼成边
+        if len(values) != columns * len(NONEMPTY_LINE.findall(text)):
+            raise ValueError(f"{path}: every line must have {columns} columns")
+        values = values.reshape(-1, columns)
+        src_parts.append(values[:, 0].astype(np.int64))
+        dst_parts.append(values[:, 1].astype(np.int64))
+        if weighted:
+            weight_parts.append(values[:, 2].astype(np.float64))
+
+    src = np.concatenate(src_parts) if src_parts else np.zeros(0, dtype=np.int64)
+    dst = np.concatenate(dst_parts) if dst_parts else np.zeros(0, dtype=np.int64)
+    weights = np.concatenate(weight_parts) if weighted and weight_parts else None
+    if directed is None:
+        directed = _detect_directed(header_comments)
+
+    n, src, dst, node_ids = _relabel(src, dst, relabel=relabel)
+    return CSRGraph.from_edges(n, src, dst, weights, directed=directed), node_ids
+
+
+def read_adjacency_list(path, directed=True, comments=COMMENT_CHARS, relabel=True):
+    """
+    读取邻接表：每行第一个数是源节点，其余是它的邻居。
+    每行末尾插入 -1 作为分隔，整块一次解析，再用 NumPy 找出每行的起止位置。
+    """
+    src_parts, dst_parts, source_parts = [], [], []
+    for text in _text_blocks(path):
+        text, _ = _strip_comments(text, comments)
+        text = text.replace(",", " ").replace(";", " ").replace(":", " ").replace("\n", " -1\n")
+        tokens = _parse_numbers(text, np.int64, path)
+        if len(tokens) and tokens.min() < -1:
+            raise ValueError(f"{path}: node ids must be non-negative")
+
+        ends = np.flatnonzero(tokens == -1)
+        starts = np.concatenate([[0], ends[:-1] + 1]) if len(ends) else ends
+        lengths = ends - starts
+        rows = lengths > 0  # 跳过空行
+        heads = starts[rows]
+        sources = tokens[heads]
+
+        is_neighbor = np.ones(len(tokens), dtype=bool)
+        is_neighbor[ends] = False
+        is_neighbor[heads] = False
+        src_parts.append(np.repeat(sources, lengths[rows] - 1))
+        dst_parts.append(tokens[is_neighbor])
+        source_parts.append(sources)  # 没有邻居的节点也要保留
+
+    def joined(parts):
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    n, src, dst, node_ids = _relabel(joined(src_parts), joined(dst_parts), joined(source_parts), relabel)
+    return CSRGraph.from_edges(n, src, dst, directed=directed), node_ids
+
+
+# --- 原生二进制 CSR ---
+
+def save_npz(path, graph, node_ids=None):
+    """保存为 .npz（不压缩，载入时不需要解压）"""
+    arrays = {"indptr": graph.indptr, "indices": graph.indices,
+              "meta": np.array([FORMAT_VERSION, graph.num_nodes, int(graph.directed)], dtype=np.int64)}
+    if graph.weights is not None:
+        arrays["weights"] = graph.weights
+    if node_ids is not None:
+        arrays["node_ids"] = np.asarray(node_ids)
+    np.savez(path, **arrays)
+
+
+def load_npz(path):
+    with np.load(path) as data:
+        version, num_nodes, directed = data["meta"].tolist()
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {version}")
+        weights = data["weights"] if "weights" in data.files else None
+        node_ids = data["node_ids"] if "node_ids" in data.files else np.arange(num_nodes, dtype=np.int64)
+        graph = CSRGraph(num_nodes, data["indptr"], data["indices"], weights, directed=bool(directed))
+    return graph, node_ids
+
+
+def save_memmap(directory, graph, node_ids=None):
+    """保存为目录：每个数组一个 .npy，外加 meta.json"""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "indptr.npy"), graph.indptr)
+    np.save(os.path.join(directory, "indices.npy"), graph.indices)
+    if graph.weights is not None:
+        np.save(os.path.join(directory, "weights.npy"), graph.weights)
+    if node_ids is not None:
+        np.save(os.path.join(directory, "node_ids.npy"), np.asarray(node_ids))
+    meta = {"version": FORMAT_VERSION, "num_nodes": graph.num_nodes, "directed": bool(graph.directed),
+            "weighted": graph.weights is not None, "has_node_ids": node_ids is not None}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def load_memmap(directory):
+    """以只读 memmap 打开，数组按需从磁盘分页读入"""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["version"] > FORMAT_VERSION:
+        raise ValueError(f"{directory}: unsupported format version {meta['version']}")
+
+    def array(name):
+        return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+
+    num_nodes = meta["num_nodes"]
+    weights = array("weights") if meta["weighted"] else None
+    node_ids = array("node_ids") if meta["has_node_ids"] else np.arange(num_nodes, dtype=np.int64)
+    graph = CSRGraph(num_nodes, array("indptr"), array("indices"), weights, directed=meta["directed"])
+    return graph, node_ids
+
+
+def load_graph(path, **options):
+    """按扩展名选择读取方式；memmap 目录可以直接给目录或其中的 meta.json"""
+    path = str(path)
+    if os.path.basename(path) == "meta.json":
+        path = os.path.dirname(path) or "."
+    if os.path.isdir(path):
+        return load_memmap(path)
+    name = path.lower()
+    if name.endswith(".npz"):
+        return load_npz(path)
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(ADJACENCY_SUFFIXES):
+        return read_adjacency_list(path, **options)
+    return read_edge_list(path, **options)
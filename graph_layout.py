@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+力导向布局（Fruchterman-Reingold + Barnes-Hut）
+
+每次迭代：
+    斥力   所有节点两两相斥，f = k^2 / d。用四叉树近似：远处的一整个格子
+           （格子边长 / 距离 < theta）按其质心处的一个质点计算，叶子层附近的
+           节点精确计算，整体 O(n log n)
+    引力   沿每条边相吸，f = d^2 / k，O(E)
+    位移   受温度限制，温度随迭代线性下降
+
+四叉树不是指针结构：节点坐标量化后计算 Morton 编码，每一层的格子就是编码右移后的
+不同取值，格子的质量与质心用 bincount 求出；遍历时所有 (节点, 格子) 对按层一起处理，
+需要展开的对替换成它们的子格子，因此整个过程没有 Python 层面的逐节点循环。
+
+布局结果按图的内容哈希缓存在进程内，同时写入磁盘缓存（graph_cache），
+BFS 和 DFS 窗口遇到同一张图时直接复用，下次打开程序也不必重新计算。
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from graph_cache import shared_cache
+
+DEFAULT_BOUNDS = (50, 30, 950, 470)  # (xmin, ymin, xmax, ymax)，与可视化画布的坐标一致
+DEFAULT_THETA = 0.8
+
+# 界面中的布局选项："Default" 为生成器给出的坐标（没有时圆形排列）
+LAYOUT_KINDS = ["Default", "Force-directed"]
+
+
+def _morton(qx, qy, depth):
+    """把 depth 位的 x/y 交错成 Morton 编码"""
+    code = np.zeros(len(qx), dtype=np.int64)
+    for bit in range(depth):
+        code |= ((qx >> bit) & 1) << (2 * bit)
+        code |= ((qy >> bit) & 1) << (2 * bit + 1)
+    return code
+
+
+class QuadTree:
+    """按层存放的四叉树：每层有格子编号、质量、质心、边长以及子格子的区间"""
+
+    def __init__(self, positions, depth=None):
+        positions = np.asarray(positions, dtype=np.float64)
+        n = len(positions)
+        if depth is None:
+            # 叶子格子平均只包含少量节点
+            depth = int(np.clip(np.ceil(np.log2(max(n, 1)) / 2) + 1, 1, 15))
+        self.depth = depth
+        lo = positions.min(axis=0) if n else np.zeros(2)
+        span = float(max((positions.max(axis=0) - lo).max(), 1e-9)) if n else 1.0
+        side = 1 << depth
+        quantized = np.minimum(((positions - lo) / span * side).astype(np.int64), side - 1)
+        codes = _morton(quantized[:, 0], quantized[:, 1], depth)
+
+        # levels[l] = (格子编号, 质量, 质心, 每个节点所在格子的下标, 格子边长)
+        self.levels = []
+        for level in range(depth + 1):
+            cells, owner = np.unique(codes >> (2 * (depth - level)), return_inverse=True)
+            mass = np.bincount(owner, minlength=len(cells)).astype(np.float64)
+            center = np.column_stack([np.bincount(owner, positions[:, 0], len(cells)),
+                                      np.bincount(owner, positions[:, 1], len(cells))]) / mass[:, None]
+            self.levels.append((cells, mass, center, owner.ravel(), span / (1 << level)))
+
+        # 子格子在下一层中是连续的一段：[child_start, child_start + child_count)
+        self.children = []
+        for level in range(depth):
+            cells, next_cells = self.levels[level][0], self.levels[level + 1][0]
+            start = np.searchsorted(next_cells, cells * 4)
+            end = np.searchsorted(next_cells, cells * 4 + 4)
+            self.children.append((start, end - start))
+
+        # 叶子格子的成员：按格子排序后的节点编号，leaf_start[c] 是格子 c 的起点
+        leaf_owner = self.levels[depth][3]
+        self.leaf_order = np.argsort(leaf_owner, kind='stable')
+        leaf_mass = self.levels[depth][1].astype(np.int64)
+        self.leaf_start = np.cumsum(leaf_mass) - leaf_mass
+
+    def repulsion(self, positions, k2, theta=DEFAULT_THETA):
+        """所有节点受到的斥力 (n, 2)，f = k2 * 质量 / d"""
+        positions = np.asarray(positions, dtype=np.float64)
+        n = len(positions)
+        force = np.zeros((n, 2))
+        if n < 2:
+            return force
+
+        nodes = np.arange(n, dtype=np.int64)
+        cells = np.zeros(n, dtype=np.int64)  # 根格子
+        for level, (_, mass, center, owner, size) in enumerate(self.levels):
+            delta = positions[nodes] - center[cells]
+            dist2 = np.einsum('ij,ij->i', delta, delta)
+            own = owner[nodes] == cells
+            far = ~own & (size * size < theta * theta * dist2)
+            self._accumulate(force, nodes[far], delta[far], dist2[far], k2 * mass[cells[far]])
+
+            if level == self.depth:
+                # 叶子层仍然太近的格子（包括自身所在的格子）：与其中每个节点精确计算
+                near = ~far
+                idx, cell = nodes[near], cells[near]
+                counts = mass[cell].astype(np.int64)
+                total = int(counts.sum())
+                offsets = np.cumsum(counts) - counts
+                members = self.leaf_order[np.repeat(self.leaf_start[cell] - offsets, counts)
+                                          + np.arange(total, dtype=np.int64)]
+                idx = np.repeat(idx, counts)
+                other = members != idx
+                idx, members = idx[other], members[other]
+                delta = positions[idx] - positions[members]
+                self._accumulate(force, idx, delta, np.einsum('ij,ij->i', delta, delta), k2)
+                break
+
+            # 其余的对展开到子格子
+            keep = ~far
+            nodes, cells = nodes[keep], cells[keep]
+            start, count = self.children[level]
+            counts = count[cells]
+            total = int(counts.sum())
+            offsets = np.cumsum(counts) - counts
+            cells = np.repeat(start[cells] - offsets, counts) + np.arange(total, dtype=np.int64)
+            nodes = np.repeat(nodes, counts)
+        return force
+
+    @staticmethod
+    def _accumulate(force, nodes, delta, dist2, strength):
+        if len(nodes) == 0:
+            return
+        dist2 = np.maximum(dist2, 1e-6)
+        scale = strength / dist2  # k^2 * m / d 沿单位向量 = k^2 * m * delta / d^2
+        n = len(force)
+        force[:, 0] += np.bincount(nodes, delta[:, 0] * scale, n)
+        force[:, 1] += np.bincount(nodes, delta[:, 1] * scale, n)
+
+
+def fit_to_bounds(positions, bounds=DEFAULT_BOUNDS):
+    """等比例缩放并平移到 bounds 内"""
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(positions) == 0:
+        return positions.copy()
+    xmin, ymin, xmax, ymax = bounds
+    lo, hi = positions.min(axis=0), positions.max(axis=0)
+    span = np.maximum(hi - lo, 1e-9)
+    scale = min((xmax - xmin) / span[0], (ymax - ymin) / span[1])
+    center = np.array([(xmin + xmax) / 2, (ymin + ymax) / 2])
+    return (positions - (lo + hi) / 2) * scale + center
+
+
+def force_directed_steps(graph, positions=None, iterations=100, theta=DEFAULT_THETA, gravity=0.05,
+                         bounds=DEFAULT_BOUNDS, rng=None):
+    """
+    Fruchterman-Reingold 迭代，每次迭代产生一份缩放到 bounds 内的坐标 (n, 2)。
+    positions 为初始坐标（None 时随机），gravity 把各连通分量拉向中心，避免它们越飘越远。
+    """
+    rng = np.random.default_rng(rng)
+    n = graph.num_nodes
+    if n == 0:
+        return
+    # 在边长为 sqrt(n) 的正方形中模拟，k 为理想边长
+    side = float(np.sqrt(n)) * 10.0
+    k = side / np.sqrt(n)
+    if positions is None:
+        pos = rng.random((n, 2)) * side
+    else:
+        pos = fit_to_bounds(positions, (0, 0, side, side))
+    # 重合的节点互相之间没有方向，加一点抖动
+    pos = pos + rng.normal(scale=1e-3 * k, size=pos.shape)
+
+    src, dst = graph.undirected_edges()
+    temperature = side / 10.0
+    cooling = temperature / max(iterations, 1)
+    center = np.array([side / 2, side / 2])
+
+    for _ in range(iterations):
+        force = QuadTree(pos).repulsion(pos, k * k, theta)
+
+        delta = pos[src] - pos[dst]
+        dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        pull = delta * (dist / k)[:, None]  # d^2 / k 沿单位向量
+        force[:, 0] += np.bincount(dst, pull[:, 0], n) - np.bincount(src, pull[:, 0], n)
+        force[:, 1] += np.bincount(dst, pull[:, 1], n) - np.bincount(src, pull[:, 1], n)
+
+        force -= gravity * (pos - center)
+
+        length = np.sqrt(np.einsum('ij,ij->i', force, force))
+        step = np.minimum(length, temperature) / np.maximum(length, 1e-9)
+        pos += force * step[:, None]
+        temperature = max(temperature - cooling, 1e-3 * k)
+        yield fit_to_bounds(pos, bounds)
+
+
+def force_directed_layout(graph, positions=None, iterations=100, theta=DEFAULT_THETA,
+                          bounds=DEFAULT_BOUNDS, rng=None, use_cache=True):
+    """一次性计算完整布局（无界面使用），结果会写入缓存"""
+    if use_cache:
+        cached = get_cached_layout(graph)
+        if cached is not None:
+            return cached
+    result = fit_to_bounds(positions, bounds) if positions is not None else None
+    for result in force_directed_steps(graph, positions, iterations, theta, bounds=bounds, rng=rng):
+        pass
+    if use_cache and result is not None:
+        store_layout(graph, result)
+    return result
+
+
+# --- 布局缓存：进程内按图的内容哈希 LRU，未命中时再查磁盘缓存 ---
+
+_CACHE_SIZE = 32
+_layout_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_DISK_NAME = "force-directed"
+
+
+def get_cached_layout(graph):
+    key = graph.fingerprint()
+    with _cache_lock:
+        positions = _layout_cache.get(key)
+        if positions is not None:
+            _layout_cache.move_to_end(key)
+            return positions.copy()
+    positions = shared_cache().get_layout(graph, _DISK_NAME)
+    if positions is not None:
+        _remember(key, positions)
+    return positions
+
+
+def store_layout(graph, positions):
+    _remember(graph.fingerprint(), positions)
+    shared_cache().put_layout(graph, _DISK_NAME, positions)
+
+
+def _remember(key, positions):
+    with _cache_lock:
+        _layout_cache[key] = np.array(positions, dtype=np.float64)
+        _layout_cache.move_to_end(key)
+        while len(_layout_cache) > _CACHE_SIZE:
+            _layout_cache.popitem(last=False)
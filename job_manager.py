@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+可取消的后台任务管理器
+
+每次运行都会得到一个独立的 CancellationToken：暂停/继续基于 threading.Event
+阻塞等待，而不是 time.sleep(0.1) 轮询；提交新任务时会先取消并 join 旧任务，
+因此反复 重置/开始 不会留下仍在运行的旧线程。
+"""
+import threading
+import itertools
+import time
+
+# 任务状态
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_CANCELLED = "cancelled"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+
+
+class JobCancelled(BaseException):
+    """任务被取消时在工作线程内抛出（与 asyncio.CancelledError 一样继承 BaseException，
+    不会被算法代码中的 except Exception 误捕获）"""
+
+
+class CancellationToken:
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()  # 置位表示未暂停
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # 唤醒处于暂停中的线程，让它尽快退出
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def check(self):
+        """检查点：暂停时阻塞等待，被取消时抛出 JobCancelled"""
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def sleep(self, seconds):
+        """可被取消立即打断的睡眠；醒来后若处于暂停状态则继续等待"""
+        self.check()
+        if seconds > 0 and self._cancelled.wait(seconds):
+            raise JobCancelled()
+        self.check()
+
+
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, target, args, name):
+        self.id = next(Job._ids)
+        self.name = f"{name}-{self.id}"
+        self.token = CancellationToken()
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._state = JOB_PENDING
+        self._target = target
+        self._args = args
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+
+    @property
+    def state(self):
+        if self._state == JOB_RUNNING and self.token.paused:
+            return JOB_PAUSED
+        return self._state
+
+    @property
+    def alive(self):
+        return self.thread.is_alive()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def _run(self):
+        self.started_at = time.perf_counter()
+        self._state = JOB_RUNNING
+        try:
+            self._target(self.token, *self._args)
+            self._state = JOB_CANCELLED if self.token.cancelled else JOB_FINISHED
+        except JobCancelled:
+            self._state = JOB_CANCELLED
+        except Exception as e:
+            self.error = e
+            self._state = JOB_FAILED
+        finally:
+            self.finished_at = time.perf_counter()
+
+
+class JobManager:
+    """同一时间只保留一个活动任务的管理器（每个可视化窗口一个）"""
+
+    def __init__(self, name="worker", join_timeout=2.0):
+        self.name = name
+        self.join_timeout = join_timeout
+        self.current = None
+        self.stragglers = []  # join 超时仍未退出的旧任务
+        self._lock = threading.Lock()
+
+    def submit(self, target, *args):
+        """取消并回收旧任务后启动新任务，target 的第一个参数是 CancellationToken"""
+        with self._lock:
+            self._cancel_locked(wait=True)
+            job = Job(target, args, self.name)
+            self.current = job
+            job.thread.start()
+            return job
+
+    def cancel(self, wait=True):
+        with self._lock:
+            self._cancel_locked(wait)
+
+    def _cancel_locked(self, wait):
+        job = self.current
+        if job is not None:
+            job.token.cancel()
+            if wait and job.thread is not threading.current_thread():
+                job.thread.join(self.join_timeout)
+            if job.alive:
+                self.stragglers.append(job)
+        self.stragglers = [j for j in self.stragglers if j.alive]
+
+    def pause(self):
+        if self.current is not None:
+            self.current.token.pause()
+
+    def resume(self):
+        if self.current is not None:
+            self.current.token.resume()
+
+    @property
+    def paused(self):
+        return self.current is not None and self.current.token.paused
+
+    @property
+    def state(self):
+        return self.current.state if self.current is not None else JOB_PENDING
+
+    @property
+    def is_active(self):
+        return self.current is not None and self.current.alive
+
+    def live_threads(self):
+        """当前仍存活的线程数（活动任务 + 未退出的旧任务）"""
+        jobs = self.stragglers + ([self.current] if self.current is not None else [])
+        return sum(1 for j in jobs if j.alive)
+
+    def shutdown(self):
+        self.cancel(wait=True)
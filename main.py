@@ -1,21 +1,93 @@
 # -*- coding: utf-8 -*-
+import time
+STARTUP = time.perf_counter()  # 启动计时的起点（--profile-startup）
+
+import sys
+import argparse
+import importlib
+from contextlib import contextmanager, nullcontext
 import tkinter as tk
 from tkinter import ttk, messagebox
-import BFS1
-import DFS
-import Sorting_pro
+
+# 各模块在第一次点击卡片时才导入，Matplotlib/NumPy 不再拖慢启动器的第一帧
+# 卡片 -> (模块名, 可视化类, 窗口标题, 窗口大小)
+MODULES = {
+    "bfs": ("BFS1", "BFSVisualizer", "BFS算法可视化", "1000x700"),
+    "dfs": ("DFS", "DFSVisualizer", "DFS算法可视化", "1000x700"),
+    "sorting": ("Sorting_pro", "SortingVisualizer", "排序算法可视化", "1000x700"),
+    "compare": ("compare_view", "CompareVisualizer", "BFS与DFS对比", "1200x750"),
+}
+
+# 启动分析时先单独计时的公共依赖，之后各模块的导入时间只包含模块自身
+SHARED_DEPENDENCIES = ["numpy", "matplotlib", "matplotlib.pyplot", "matplotlib.backends.backend_tkagg"]
+
+# 标题区渐变：从深蓝 (#2c3e50) 到稍浅的蓝色 (#34495e)
+GRADIENT_TOP = (44, 62, 80)
+GRADIENT_BOTTOM = (52, 73, 94)
+GRADIENT_SIZE = (1200, 200)
+_gradient_cache = {}
+
+
+def gradient_image(width, height, top=GRADIENT_TOP, bottom=GRADIENT_BOTTOM):
+    """竖直渐变图片：先给一列像素逐行着色，再横向放大成整幅图片；同样的参数只生成一次"""
+    key = (width, height, top, bottom)
+    if key not in _gradient_cache:
+        rows = []
+        for i in range(height):
+            r, g, b = (int(t + (u - t) * i / height) for t, u in zip(top, bottom))
+            rows.append(f"{{#{r:02x}{g:02x}{b:02x}}}")
+        column = tk.PhotoImage(width=1, height=height)
+        column.put(" ".join(rows))
+        _gradient_cache[key] = column.zoom(width, 1)
+    return _gradient_cache[key]
+
+
+class StartupProfiler:
+    """--profile-startup：记录启动器各部分、各模块导入和界面创建的耗时，最后打印成表格"""
+
+    def __init__(self, start=STARTUP):
+        self.start = start
+        self.records = []  # (名称, 秒)
+        self.first_frame = None  # 启动器第一帧出现时距启动的秒数
+
+    @contextmanager
+    def measure(self, label):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((label, time.perf_counter() - t0))
+
+    def mark_first_frame(self):
+        self.first_frame = time.perf_counter() - self.start
+
+    def report(self, file=None):
+        file = file or sys.stdout
+        width = max(len(label) for label, _ in self.records) if self.records else 10
+        print("Startup profile (ms)", file=file)
+        for label, seconds in self.records:
+            print(f"  {label:<{width}}  {seconds * 1000:9.1f}", file=file)
+        if self.first_frame is not None:
+            print(f"  {'time to first launcher frame':<{width}}  {self.first_frame * 1000:9.1f}", file=file)
 
 
 class AlgorithmVisualizationSuite:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler
         self.root.title("算法可视化套件 - 小组项目")
-        self.root.geometry("950x850")
+        self.root.geometry("1200x850")
         self.root.configure(bg='#2c3e50')  # 修改背景色为深蓝色
         
         # 设置主题样式
-        self.setup_style()
-        self.setup_ui()
+        with self.measure("launcher: style"):
+            self.setup_style()
+        with self.measure("launcher: widgets"):
+            self.setup_ui()
+    
+    def measure(self, label):
+        """启动分析时为一段代码计时，否则什么也不做"""
+        return self.profiler.measure(label) if self.profiler else nullcontext()
         
     def setup_style(self):
         """配置自定义样式"""
@@ -70,16 +142,17 @@ class AlgorithmVisualizationSuite:
         self.canvas.pack(fill=tk.X)
         
         # 在Canvas上绘制渐变和内容
-        self.draw_gradient()
+        with self.measure("launcher: gradient"):
+            self.draw_gradient()
         
         # 标题文字
-        self.canvas.create_text(450, 80, 
+        self.canvas.create_text(600, 80, 
                                text="算法可视化套件", 
                                font=('微软雅黑', 32, 'bold'),
                                fill='#ecf0f1')  # 白色文字
         
         # 副标题
-        self.canvas.create_text(450, 130, 
+        self.canvas.create_text(600, 130, 
                                text="经典算法图形化演示平台", 
                                font=('微软雅黑', 16),
                                fill='#bdc3c7')  # 浅灰色文字
@@ -104,7 +177,7 @@ class AlgorithmVisualizationSuite:
                                    style='Card.TFrame')
         algo_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        # 创建三个算法模块的卡片
+        # 创建四个算法模块的卡片
         self.create_algorithm_card(algo_frame, "🔍BFS算法可视化", 
                                  "广度优先搜索算法\n\n实现者：房盈杉\n班级：生信C2302", 
                                  self.open_bfs, 0, '#3498db')  # 蓝色
@@ -117,6 +190,10 @@ class AlgorithmVisualizationSuite:
                                  "五种比较排序算法\n实现者：蓝冰云\n优化：全体\n班级：生信C2301", 
                                  self.open_sorting, 2, '#e74c3c')  # 红色
         
+        self.create_algorithm_card(algo_frame, "🔍BFS与DFS对比", 
+                                 "同一张图上的广度优先与\n深度优先搜索并排同步回放\n\n整合：汪萌萌", 
+                                 self.open_compare, 3, '#9b59b6')  # 紫色
+        
         # 状态栏（深色背景）
         status_frame = ttk.Frame(main_frame, style='Title.TFrame')
         status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(0, 0))
@@ -134,18 +211,12 @@ class AlgorithmVisualizationSuite:
         algo_frame.columnconfigure(0, weight=1)
         algo_frame.columnconfigure(1, weight=1)
         algo_frame.columnconfigure(2, weight=1)
+        algo_frame.columnconfigure(3, weight=1)
     
     def draw_gradient(self):
-        """绘制渐变背景"""
-        width = 900
-        height = 200
-        for i in range(height):
-            # 从深蓝到稍浅的蓝色渐变
-            r = int(44 + (52 - 44) * i / height)    # 2c to 34 (red)
-            g = int(62 + (73 - 62) * i / height)    # 3e to 49 (green)
-            b = int(80 + (94 - 80) * i / height)     # 50 to 5e (blue)
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            self.canvas.create_line(0, i, width, i, fill=color)
+        """绘制渐变背景（一张预先渲染并缓存的图片，代替逐行画 200 条线）"""
+        self.gradient = gradient_image(*GRADIENT_SIZE)  # 保留引用，否则图片会被回收
+        self.canvas.create_image(0, 0, image=self.gradient, anchor=tk.NW)
     
     def create_algorithm_card(self, parent, title, description, command, column, color):
         """创建算法卡片"""
@@ -208,41 +279,87 @@ class AlgorithmVisualizationSuite:
         # 转换回十六进制
         return f'#{light_rgb[0]:02x}{light_rgb[1]:02x}{light_rgb[2]:02x}'
     
-    def open_bfs(self):
-        self.status_var.set("🔵 正在启动BFS算法可视化模块...")
+    def load_module(self, name):
+        """第一次启动某个模块时才导入它（之后直接使用已导入的模块）"""
+        if name in sys.modules:
+            return sys.modules[name]
+        self.root.config(cursor='watch')
+        self.root.update_idletasks()
+        try:
+            with self.measure(f"import {name}"):
+                return importlib.import_module(name)
+        finally:
+            self.root.config(cursor='')
+    
+    def launch(self, key, status):
+        module_name, class_name, title, geometry = MODULES[key]
+        self.status_var.set(status)
+        try:
+            module = self.load_module(module_name)
+        except ImportError as e:
+            messagebox.showerror("启动失败", f"无法加载模块 {module_name}：\n{str(e)}")
+            self.status_var.set("🟢 就绪 - 请选择要运行的算法模块")
+            return
         self.root.withdraw()
-        bfs_window = tk.Toplevel(self.root)
-        bfs_window.title("BFS算法可视化")
-        bfs_window.geometry("1000x700")
-        BFS1.BFSVisualizer(bfs_window)
-        bfs_window.protocol("WM_DELETE_WINDOW", lambda: self.on_subwindow_close(bfs_window))
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        window.geometry(geometry)
+        with self.measure(f"setup {module_name}"):
+            getattr(module, class_name)(window)
+        window.protocol("WM_DELETE_WINDOW", lambda: self.on_subwindow_close(window))
+    
+    def open_bfs(self):
+        self.launch("bfs", "🔵 正在启动BFS算法可视化模块...")
     
     def open_dfs(self):
-        self.status_var.set("🟢 正在启动DFS算法可视化模块...")
-        self.root.withdraw()
-        dfs_window = tk.Toplevel(self.root)
-        dfs_window.title("DFS算法可视化")
-        dfs_window.geometry("1000x700")
-        DFS.DFSVisualizer(dfs_window)
-        dfs_window.protocol("WM_DELETE_WINDOW", lambda: self.on_subwindow_close(dfs_window))
+        self.launch("dfs", "🟢 正在启动DFS算法可视化模块...")
     
     def open_sorting(self):
-        self.status_var.set("🔴 正在启动排序算法可视化模块...")
-        self.root.withdraw()
-        sorting_window = tk.Toplevel(self.root)
-        sorting_window.title("排序算法可视化")
-        sorting_window.geometry("1000x700")
-        Sorting_pro.SortingVisualizer(sorting_window)
-        sorting_window.protocol("WM_DELETE_WINDOW", lambda: self.on_subwindow_close(sorting_window))
+        self.launch("sorting", "🔴 正在启动排序算法可视化模块...")
+    
+    def open_compare(self):
+        self.launch("compare", "🟣 正在启动BFS与DFS对比模块...")
+    
+    def profile_modules(self):
+        """
+        启动分析：第一帧出现后依次导入公共依赖和各模块、在隐藏的窗口中创建各模块的界面并计时，
+        打印报告后退出。
+        """
+        for name in SHARED_DEPENDENCIES:
+            with self.measure(f"import {name}"):
+                importlib.import_module(name)
+        for module_name, _, _, _ in MODULES.values():
+            self.load_module(module_name)
+        for module_name, class_name, _, _ in MODULES.values():
+            window = tk.Toplevel(self.root)
+            window.withdraw()
+            with self.measure(f"setup {module_name}"):
+                getattr(sys.modules[module_name], class_name)(window)
+                window.update_idletasks()
+            window.destroy()
+        self.profiler.report()
+        self.root.destroy()
     
     def on_subwindow_close(self, window):
         window.destroy()
         self.root.deiconify()
         self.status_var.set("🟢 模块已关闭 - 请选择要运行的算法模块")
 
-def main():
-    root = tk.Tk()
-    app = AlgorithmVisualizationSuite(root)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Algorithm visualization suite")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and UI setup time per module, then exit")
+    args = parser.parse_args(argv)
+    
+    profiler = StartupProfiler() if args.profile_startup else None
+    with profiler.measure("launcher: tk root") if profiler else nullcontext():
+        root = tk.Tk()
+    app = AlgorithmVisualizationSuite(root, profiler)
+    if profiler:
+        with profiler.measure("launcher: first frame"):
+            root.update()
+        profiler.mark_first_frame()
+        root.after_idle(app.profile_modules)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+多进程 BFS
+
+CSR 数组（indptr/indices）、距离数组和当前前沿都放在 multiprocessing.shared_memory 中，
+工作进程只挂载一次，之后每一层只传递 (起点, 终点) 区间，不复制图数据。
+每一层的前沿按边数均匀切分给进程池，各进程用共享的距离数组过滤已访问节点，
+主进程按切片顺序合并结果并写回距离/父节点，然后进入下一层。
+层内工作进程只读共享数组、层间只有主进程写入，因此不需要加锁。
+"""
+import os
+import numpy as np
+from multiprocessing import Pool, shared_memory
+
+from bfs_engine import BFSResult, expand_top_down, gather_neighbors
+
+# 工作进程内挂载的共享数组
+_worker_arrays = {}
+_worker_blocks = []
+
+
+class _ArrayView:
+    """gather_neighbors 只需要 indptr/indices 两个属性"""
+
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+
+def _attach_worker(specs):
+    """进程池初始化：按名字挂载共享内存"""
+    for key, (name, shape, dtype) in specs.items():
+        # 进程池与主进程共用同一个资源跟踪器，共享内存由主进程在 close() 中释放
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        _worker_arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _expand_chunk(bounds):
+    """在工作进程中展开前沿的一段，返回 (新节点, 父节点, 检查的边数)"""
+    start, end = bounds
+    arrays = _worker_arrays
+    frontier = arrays['frontier'][start:end]
+    srcs, nbrs = gather_neighbors(_ArrayView(arrays['indptr'], arrays['indices']), frontier)
+    examined = len(nbrs)
+    fresh = arrays['distances'][nbrs] < 0
+    srcs, nbrs = srcs[fresh], nbrs[fresh]
+    if len(nbrs) == 0:
+        return nbrs, nbrs, examined
+    _, first = np.unique(nbrs, return_index=True)
+    first.sort()
+    return nbrs[first], srcs[first], examined
+
+
+class ParallelBFS:
+    """
+    用法：
+        with ParallelBFS(graph, workers=4) as engine:
+            result = engine.run(source)
+    """
+
+    def __init__(self, graph, workers=None, min_parallel_edges=65536):
+        self.graph = graph
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_edges = min_parallel_edges  # 前沿边数低于该值时在主进程中展开
+        self._blocks = []
+        self._shared = {}
+        self._pool = None
+
+        n = graph.num_nodes
+        self.indptr = self._share('indptr', graph.indptr)
+        self.indices = self._share('indices', graph.indices)
+        self.distances = self._share('distances', np.full(n, -1, dtype=np.int64))
+        self.frontier = self._share('frontier', np.zeros(max(n, 1), dtype=np.int64))
+        self._specs = {key: (block.name, array.shape, array.dtype.str)
+                       for key, (block, array) in self._shared.items()}
+
+    def _share(self, key, array):
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[...] = array
+        self._shared[key] = (block, view)
+        return view
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = Pool(self.workers, initializer=_attach_worker, initargs=(self._specs,))
+        return self._pool
+
+    def _split(self, frontier):
+        """按边数把前沿切成 workers 段，返回 [(start, end), ...]"""
+        degrees = self.indptr[frontier + 1] - self.indptr[frontier]
+        cumulative = np.cumsum(degrees)
+        targets = cumulative[-1] * np.arange(1, self.workers) / self.workers
+        cuts = np.searchsorted(cumulative, targets, side='right')
+        bounds = np.unique(np.concatenate([[0], cuts, [len(frontier)]]))
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def run(self, source):
+        n = self.graph.num_nodes
+        if not 0 <= source < n:
+            raise ValueError(f"source {source} out of range")
+
+        distances = self.distances
+        distances[:] = -1
+        parents = np.full(n, -1, dtype=np.int64)
+        visited = np.zeros(n, dtype=bool)  # 主进程展开小前沿时使用
+
+        frontier = np.array([source], dtype=np.int64)
+        distances[source] = 0
+        visited[source] = True
+        levels = [frontier]
+        edges_examined = []
+
+        depth = 0
+        while len(frontier):
+            frontier_edges = int((self.indptr[frontier + 1] - self.indptr[frontier]).sum())
+            if self.workers > 1 and frontier_edges >= self.min_parallel_edges:
+                self.frontier[:len(frontier)] = frontier
+                chunks = self.pool.map(_expand_chunk, self._split(frontier))
+                examined = sum(c[2] for c in chunks)
+                nbrs = np.concatenate([c[0] for c in chunks])
+                srcs = np.concatenate([c[1] for c in chunks])
+                # 不同切片可能发现同一节点：按切片顺序保留第一次出现
+                _, first = np.unique(nbrs, return_index=True)
+                first.sort()
+                next_frontier, next_parents = nbrs[first], srcs[first]
+                visited[next_frontier] = True
+            else:
+                next_frontier, next_parents, examined = expand_top_down(self.graph, frontier, visited)
+
+            edges_examined.append(examined)
+            if len(next_frontier) == 0:
+                break
+            depth += 1
+            distances[next_frontier] = depth
+            parents[next_frontier] = next_parents
+            levels.append(next_frontier)
+            frontier = next_frontier
+
+        return BFSResult(source, distances.copy(), parents, levels, np.array(edges_examined, dtype=np.int64))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        # 先释放所有指向共享内存的数组视图，才能关闭共享内存
+        self._shared = {}
+        self.indptr = self.indices = self.distances = self.frontier = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parallel_bfs(graph, source, workers=None):
+    """单次调用的便捷接口（会创建并销毁进程池）"""
+    with ParallelBFS(graph, workers) as engine:
+        return engine.run(source)
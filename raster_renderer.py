@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+"""
+光栅渲染：把节点、边、柱子直接画进一个 NumPy RGB 缓冲区，再作为一张图片显示
+
+Tk 画布的图元和 Matplotlib 的 artist 都有逐个对象的开销，十万个以上的对象就画不动了。
+这里所有图元都按 NumPy 数组整体处理：
+    - 圆盘/圆环：预先算好一个半径下覆盖的像素偏移，所有圆心一次性加上偏移写入
+    - 线段：先裁剪到画面内，再沿线段按像素步长采样；边按覆盖次数累积"墨量"，
+            重叠越多越黑；边数、采样点数超过像素数的一定倍数时按比例抽取（加大权重）
+    - 柱子：按列记录属于哪根柱子，一次比较得到整个画面的填充掩码
+因此一帧的耗时由画面的像素数决定，与对象个数基本无关。
+
+显示方式：
+    - RasterGraphArtists 是 GraphArtists 的光栅版本，画面放在坐标轴里的一个 AxesImage 中
+      （Agg 只需缩放拷贝一张图片），缩放、平移、裁剪、点击拾取都沿用 GraphArtists
+    - PhotoRaster 把缓冲区转成 PPM 放进 Tk 画布上的一个 tk.PhotoImage（排序窗口使用）
+"""
+from functools import lru_cache
+import tkinter as tk
+import numpy as np
+from matplotlib.colors import to_rgb
+from matplotlib.image import AxesImage
+
+from graph_artists import GraphArtists, MARKER_MIN_PIXELS, OUTLINE_MIN_PIXELS
+
+RENDERER_KINDS = ["Auto", "Vector", "Raster"]
+RASTER_AUTO_NODES = 20000  # Auto 时节点数超过这个值改用光栅渲染
+
+LINE_SAMPLE_FACTOR = 4   # 每帧画边的采样点数上限：画面像素数的这么多倍
+EDGE_SAMPLE_FACTOR = 0.25  # 逐条处理的边数上限：画面像素数的这么多倍，更多的边按比例抽取
+EDGE_INK = 1.5           # 一条边在一个像素上的墨量，多条边叠加后按 1 - exp(-墨量) 变黑
+EDGE_PIXELS = 2          # 边的宽度（像素）
+PATH_PIXELS = 4
+HIGHLIGHT_PIXELS = 5
+OUTLINE_PIXELS = 2       # 节点黑色轮廓、外圈的宽度
+HOVER_PIXELS = 3
+
+
+@lru_cache(maxsize=256)
+def rgb8(color):
+    """颜色名/十六进制 -> (r, g, b)，0-255"""
+    return tuple(int(round(c * 255)) for c in to_rgb(color))
+
+
+def palette_rgb8(rgba):
+    """Matplotlib 的 RGBA 数组（0-1）-> uint8 RGB 数组"""
+    return (np.asarray(rgba)[:, :3] * 255 + 0.5).astype(np.uint8)
+
+
+def ppm_data(buffer):
+    """RGB 缓冲区 -> 二进制 PPM，tk.PhotoImage 可以直接读取"""
+    height, width = buffer.shape[:2]
+    return b"P6 %d %d 255\n" % (width, height) + np.ascontiguousarray(buffer).tobytes()
+
+
+# --- 图元 ---
+
+@lru_cache(maxsize=64)
+def disc_offsets(radius, inner=0.0):
+    """半径 radius 的圆盘（inner > 0 时为内半径 inner 的圆环）覆盖的像素偏移 (dy, dx)"""
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    dist2 = dx * dx + dy * dy
+    mask = dist2 <= radius * radius + 0.5
+    if inner > 0:
+        mask &= dist2 > inner * inner
+    if not mask.any():
+        mask[r, r] = True
+    return dy[mask], dx[mask]
+
+
+def _stamp(shape, x, y, offsets):
+    """把偏移加到每个中心上，返回画面内像素的展平下标和对应的中心序号"""
+    height, width = shape[:2]
+    dy, dx = offsets
+    px = np.rint(x).astype(np.int64)[:, None] + dx
+    py = np.rint(y).astype(np.int64)[:, None] + dy
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    owner = np.broadcast_to(np.arange(len(px))[:, None], px.shape)[inside]
+    return py[inside] * width + px[inside], owner
+
+
+def _fill(buffer, index, owner, colors):
+    """colors 是单个颜色或与中心/线段对齐的颜色数组"""
+    flat = buffer.reshape(-1, 3)
+    colors = np.asarray(colors, dtype=np.uint8)
+    flat[index] = colors if colors.ndim == 1 else colors[owner]
+
+
+def draw_discs(buffer, x, y, colors, radius, inner=0.0):
+    """以像素坐标 (x, y) 为中心画圆盘（或圆环），后画的覆盖先画的"""
+    if len(x) == 0:
+        return
+    index, owner = _stamp(buffer.shape, x, y, disc_offsets(float(radius), float(inner)))
+    _fill(buffer, index, owner, colors)
+
+
+def clip_segments(x0, y0, x1, y1, width, height, margin=2):
+    """
+    把线段裁剪到画面（向外放宽 margin 像素）内（Liang-Barsky），返回 (保留的线段序号, x0, y0, x1, y1)。
+    放大后很长的边两端都在画面外，不裁剪的话采样点数会随放大倍数增长。
+    """
+    dx, dy = x1 - x0, y1 - y0
+    t0, t1 = np.zeros(len(x0)), np.ones(len(x0))
+    keep = np.ones(len(x0), dtype=bool)
+    lo_x, lo_y, hi_x, hi_y = -margin, -margin, width - 1 + margin, height - 1 + margin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-dx, x0 - lo_x), (dx, hi_x - x0), (-dy, y0 - lo_y), (dy, hi_y - y0)):
+            r = q / p
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+            keep &= (p != 0) | (q >= 0)  # 与这条边界平行且在外侧
+    keep &= t0 <= t1
+    idx = np.flatnonzero(keep)
+    t0, t1 = t0[idx], t1[idx]
+    return (idx, x0[idx] + t0 * dx[idx], y0[idx] + t0 * dy[idx],
+            x0[idx] + t1 * dx[idx], y0[idx] + t1 * dy[idx])
+
+
+def line_pixels(shape, x0, y0, x1, y1, width=1, budget=None):
+    """
+    线段经过的像素，返回 (展平下标, 所属线段, 权重)。
+    每条线段按像素步长采样；总采样数超过 budget 时按比例拉大步长，权重随之增加。
+    """
+    height, width_px = shape[:2]
+    seg, x0, y0, x1, y1 = clip_segments(x0, y0, x1, y1, width_px, height)
+    dx, dy = x1 - x0, y1 - y0
+    steps = np.maximum(np.ceil(np.maximum(np.abs(dx), np.abs(dy))), 1).astype(np.int64)
+    weight = 1.0
+    total = int(steps.sum() + len(steps)) * width * width
+    if budget is not None and total > budget:
+        weight = total / budget
+        steps = np.maximum(np.ceil(steps / weight), 1).astype(np.int64)
+    counts = steps + 1
+    owner = np.repeat(np.arange(len(steps)), counts)
+    # 每个采样点在所属线段中的序号 / 步数 -> 参数 t
+    t = (np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)) / steps[owner]
+    px = np.rint(x0[owner] + t * dx[owner]).astype(np.int64)
+    py = np.rint(y0[owner] + t * dy[owner]).astype(np.int64)
+    if width > 1:
+        # 加粗：每个采样点扩成 width x width 的小方块
+        ox, oy = np.meshgrid(np.arange(width) - width // 2, np.arange(width) - width // 2)
+        px = (px[:, None] + ox.ravel()).ravel()
+        py = (py[:, None] + oy.ravel()).ravel()
+        owner = np.repeat(owner, width * width)
+    inside = (px >= 0) & (px < width_px) & (py >= 0) & (py < height)
+    return py[inside] * width_px + px[inside], seg[owner[inside]], weight
+
+
+def draw_lines(buffer, x0, y0, x1, y1, colors, width=1, alpha=1.0):
+    """画实线（路径、高亮的边），alpha < 1 时与底下的颜色混合"""
+    if len(x0) == 0:
+        return
+    index, owner, _ = line_pixels(buffer.shape, x0, y0, x1, y1, width)
+    if alpha >= 1.0:
+        _fill(buffer, index, owner, colors)
+        return
+    flat = buffer.reshape(-1, 3)
+    colors = np.asarray(colors, dtype=np.float64)
+    colors = colors if colors.ndim == 1 else colors[owner]
+    flat[index] = (alpha * colors + (1 - alpha) * flat[index] + 0.5).astype(np.uint8)
+
+
+def draw_ink_lines(buffer, x0, y0, x1, y1, color=(0, 0, 0), width=1, budget=None, scale=1.0):
+    """画大量的边：按覆盖次数累积墨量，颜色深浅反映边的密度（scale：每条线代表几条边）"""
+    if len(x0) == 0:
+        return
+    index, _, weight = line_pixels(buffer.shape, x0, y0, x1, y1, width, budget)
+    weight *= scale
+    flat = buffer.reshape(-1, 3)
+    ink = np.bincount(index, minlength=len(flat))
+    hit = np.flatnonzero(ink)
+    cover = 1.0 - np.exp(-EDGE_INK * weight * ink[hit])
+    flat[hit] = (flat[hit] + cover[:, None] * (np.asarray(color, dtype=np.float64) - flat[hit]) + 0.5
+                 ).astype(np.uint8)
+
+
+def draw_bars(buffer, left, right, top, bottom, colors, outline=None):
+    """
+    画竖直的柱子（像素坐标，右/下边界不含）。每一列只属于一根柱子，
+    先得到列 -> 柱子的映射，再和行号比较得到整个画面的掩码，耗时与像素数成正比。
+    outline 给出时先画外框颜色，再向内缩一个像素填充。
+    """
+    height, width = buffer.shape[:2]
+    left, right, top, bottom = np.broadcast_arrays(*(np.rint(v).astype(np.int64) for v in (left, right, top, bottom)))
+    if len(left) == 0:
+        return
+    left, right = np.clip(left, 0, width), np.clip(right, 0, width)
+    top, bottom = np.clip(top, 0, height), np.clip(bottom, 0, height)
+    colors = np.asarray(colors, dtype=np.uint8)
+    if outline is not None:
+        draw_bars(buffer, left, right, top, bottom, outline)
+        left, right, top, bottom = left + 1, right - 1, top + 1, bottom - 1
+    spans = np.maximum(right - left, 0)
+    owner = np.full(width, -1, dtype=np.int64)
+    columns = np.repeat(left - np.cumsum(spans) + spans, spans) + np.arange(int(spans.sum()))
+    owner[columns] = np.repeat(np.arange(len(spans)), spans)
+    bar = np.maximum(owner, 0)
+    rows = np.arange(height)[:, None]
+    mask = (owner >= 0) & (rows >= top[bar]) & (rows < bottom[bar])
+    if colors.ndim == 1:
+        buffer[mask] = colors
+    else:
+        buffer[mask] = colors[np.broadcast_to(bar, mask.shape)[mask]]
+
+
+class PhotoRaster:
+    """Tk 画布上的一张 tk.PhotoImage，每帧整体替换它的像素"""
+
+    def __init__(self, canvas, tag="raster"):
+        self.canvas = canvas
+        self.tag = tag
+        self.photo = None
+
+    def show(self, buffer, x=0, y=0):
+        height, width = buffer.shape[:2]
+        if self.photo is None or (self.photo.width(), self.photo.height()) != (width, height):
+            self.photo = tk.PhotoImage(width=width, height=height)
+        self.photo.configure(data=ppm_data(buffer), format="PPM")
+        if not self.canvas.find_withtag(self.tag):
+            self.canvas.create_image(x, y, image=self.photo, anchor=tk.NW, tags=self.tag)
+        else:
+            self.canvas.itemconfigure(self.tag, image=self.photo)
+            self.canvas.coords(self.tag, x, y)
+
+
+# --- 图的光栅版本 ---
+
+class RasterGraphArtists(GraphArtists):
+    """
+    接口与 GraphArtists 相同。画面分两层：
+        _base   白底加上视口内的边和高亮的边，只在视野、坐标或高亮改变时重画
+        frame   _base 加上路径、节点、外圈和悬停外圈；每一步只在上面重画变化的节点
+    """
+    renderer = "Raster"
+
+    def __init__(self, ax, canvas, palette, **kwargs):
+        super().__init__(ax, canvas, palette, **kwargs)
+        self.image = None
+        self.frame = None
+        self._base = None
+        self._drawn = False      # 画布上是否已有完整绘制，之后可以只 blit 图片
+        self._hover_saved = None  # 悬停外圈覆盖的像素 (下标, 原来的颜色)
+        self._transform = (0.0, 0.0, 1.0, 1.0)
+
+    def _create_artists(self):
+        self.image = AxesImage(self.ax, interpolation='nearest', origin='upper', zorder=0)
+        self.ax.add_image(self.image)
+        self.frame = None
+        self._drawn = False
+
+    # --- 坐标换算 ---
+
+    def _frame_size(self):
+        self.ax.apply_aspect()  # 等比例坐标轴的实际大小在绘制时才确定
+        bbox = self.ax.bbox
+        return max(int(round(bbox.height)), 1), max(int(round(bbox.width)), 1)
+
+    def _pixels(self, nodes):
+        """节点 -> 画面像素坐标 (x, y)，y 向下"""
+        x0, y1, sx, sy = self._transform
+        points = self.positions[nodes]
+        return (points[:, 0] - x0) * sx - 0.5, (y1 - points[:, 1]) * sy - 0.5
+
+    def _sizes(self):
+        """节点、外圈在画面上的半径（像素）"""
+        x0, y1, sx, sy = self._transform
+        radius = max(self.node_radius * sx, MARKER_MIN_PIXELS)
+        ring = radius + max(radius / 6, OUTLINE_PIXELS)
+        return radius, ring
+
+    # --- 画面 ---
+
+    def _cull(self):
+        x0, y0, x1, y1 = self._view_bounds()
+        self._select_nodes(x0, y0, x1, y1)
+        self.visible_edges = self._edges_in_view(x0, y0, x1, y1)
+        height, width = self._frame_size()
+        self._transform = (x0, y1, width / (x1 - x0), height / (y1 - y0))
+        self.image.set_extent((x0, x1, y0, y1))
+        self._render_base(height, width)
+        self._update_labels()
+        self._compose()
+        self.image.set_data(self.frame)
+
+    def _render_base(self, height, width):
+        base = np.full((height, width, 3), 255, dtype=np.uint8)
+        edges = self.visible_edges
+        # 边比 EDGE_SAMPLE_FACTOR * 像素数还多时均匀抽取一部分，每条代表 stride 条边
+        stride = max(int(np.ceil(len(edges) / (EDGE_SAMPLE_FACTOR * height * width))), 1)
+        edges = edges[::stride]
+        if len(edges):
+            sx, sy = self._pixels(self._edge_src[edges])
+            tx, ty = self._pixels(self._edge_dst[edges])
+            draw_ink_lines(base, sx, sy, tx, ty, width=EDGE_PIXELS,
+                           budget=LINE_SAMPLE_FACTOR * height * width, scale=stride)
+        if self._highlighted is not None:
+            sx, sy = self._pixels(self._highlighted[0])
+            tx, ty = self._pixels(self._highlighted[1])
+            draw_lines(base, sx, sy, tx, ty, rgb8(self.highlight_color), width=HIGHLIGHT_PIXELS)
+        self._base = base
+
+    def _compose(self):
+        """从 _base 重新合成整个画面（需要擦除时）"""
+        self.frame = self._base.copy()
+        self._draw_path(self.path)
+        self._draw_nodes(self.visible)
+        self._hover_saved = None
+        self._hover_drawn = False
+        self._show_hover()
+
+    def _draw_path(self, path):
+        if len(path) < 2:
+            return
+        xs, ys = self._pixels(np.asarray(path, dtype=np.int64))
+        draw_lines(self.frame, xs[:-1], ys[:-1], xs[1:], ys[1:], rgb8(self.path_color),
+                   width=PATH_PIXELS, alpha=0.7)
+
+    def _draw_nodes(self, nodes):
+        nodes = nodes[self._slots[nodes] >= 0]
+        if len(nodes) == 0:
+            return
+        radius, ring = self._sizes()
+        xs, ys = self._pixels(nodes)
+        height, width = self.frame.shape[:2]
+        if len(nodes) * len(disc_offsets(float(radius))[0]) > height * width:
+            # 圆盘的总面积超过画面：边长为半径的每个小格里只画最后一个节点（其余的几乎被它盖住），
+            # 画圆盘的工作量因此不超过像素数的常数倍
+            cell = max(radius, 1.0)
+            columns = int(width / cell) + 2
+            centers = np.floor(ys / cell + 1).astype(np.int64) * columns + np.floor(xs / cell + 1).astype(np.int64)
+            _, last = np.unique(centers[::-1], return_index=True)
+            keep = np.sort(len(nodes) - 1 - last)
+            nodes, xs, ys = nodes[keep], xs[keep], ys[keep]
+        colors = palette_rgb8(self.palette)[self.codes[nodes]]
+        if radius >= OUTLINE_MIN_PIXELS:
+            draw_discs(self.frame, xs, ys, (0, 0, 0), radius)
+            draw_discs(self.frame, xs, ys, colors, radius - OUTLINE_PIXELS)
+        else:
+            draw_discs(self.frame, xs, ys, colors, radius)
+        ringed = self.rings[nodes]
+        if ringed.any():
+            draw_discs(self.frame, xs[ringed], ys[ringed], palette_rgb8([self.ring_rgba])[0],
+                       ring, ring - OUTLINE_PIXELS)
+
+    def _present(self):
+        """把 frame 显示出来：已经完整绘制过时只重画这张图片（和它上面的标签）再 blit"""
+        self.image.set_data(self.frame)
+        if not self._drawn or not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+            return
+        ax = self.ax
+        ax.draw_artist(self.image)
+        for text in self.edge_labels:
+            ax.draw_artist(text)
+        for label in self.labels.values():
+            ax.draw_artist(label)
+        self.canvas.blit(ax.bbox)
+
+    def _on_draw(self, event):
+        if self.image is None or self.image.axes is not self.ax:
+            return
+        if self.frame is None or self._frame_size() != self.frame.shape[:2]:
+            # 窗口大小改变：按新的像素数重画，再请求一次完整重绘
+            self._drawn = False
+            self._cull()
+            self.canvas.draw_idle()
+            return
+        for label in self.labels.values():
+            self.ax.draw_artist(label)
+        self._drawn = True
+
+    # --- 每一步的更新 ---
+
+    def update(self, codes, rings=None, path=None):
+        codes = np.asarray(codes, dtype=np.int16)
+        rings = np.zeros(self.num_nodes, dtype=bool) if rings is None else np.asarray(rings, dtype=bool)
+        path = [] if path is None else list(path)
+
+        changed = np.flatnonzero(codes != self.codes)
+        ring_changed = np.flatnonzero(rings != self.rings)
+        needs_erase = bool(np.any(self.rings[ring_changed])) or path[:len(self.path)] != self.path
+        path_grew = len(path) > len(self.path)
+        new_path_nodes = path[max(len(self.path) - 1, 0):]
+
+        self.codes = codes
+        self.rings = rings
+        self.path = path
+        if self.frame is None:
+            return
+        if not needs_erase and not len(changed) and not len(ring_changed) and not path_grew:
+            return
+
+        self._hide_hover()
+        if needs_erase:
+            self._compose()
+        else:
+            dirty = np.union1d(changed, ring_changed)
+            if path_grew:
+                self._draw_path(new_path_nodes)
+                dirty = np.union1d(dirty, np.asarray(new_path_nodes, dtype=np.int64))
+            self._draw_nodes(dirty.astype(np.int64))
+            self._show_hover()
+        self._present()
+
+    def highlight_edges(self, src=None, dst=None):
+        if src is None or len(src) == 0:
+            self._highlighted = None
+        else:
+            self._highlighted = (np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64))
+        if self.frame is None:
+            return
+        self._render_base(*self.frame.shape[:2])
+        self._compose()
+        self._present()
+
+    # --- 鼠标悬停：记下外圈覆盖的像素，擦除时写回 ---
+
+    def set_hover(self, node):
+        if node == self.hover:
+            return
+        self.hover = node
+        if self.frame is None:
+            return
+        self._hide_hover()
+        self._show_hover()
+        self._present()
+
+    def _hide_hover(self):
+        if self._hover_saved is not None:
+            index, colors = self._hover_saved
+            self.frame.reshape(-1, 3)[index] = colors
+            self._hover_saved = None
+        self._hover_drawn = False
+
+    def _show_hover(self):
+        if self.hover is None or self.hover >= self.num_nodes or self.frame is None:
+            return
+        _, ring = self._sizes()
+        xs, ys = self._pixels(np.array([self.hover]))
+        index, _ = _stamp(self.frame.shape, xs, ys, disc_offsets(float(ring), float(ring - HOVER_PIXELS)))
+        flat = self.frame.reshape(-1, 3)
+        self._hover_saved = (index, flat[index].copy())
+        flat[index] = rgb8(self.hover_color)
+        self._hover_drawn = True
+
+    def set_positions(self, positions):
+        self.positions = np.asarray(positions, dtype=float)
+        self._positions_changed()
+        self._cull()
+        self.canvas.draw_idle()
+
+
+# --- 选择渲染方式 ---
+
+def choose_renderer(selection, num_nodes):
+    """把界面上的选择（Auto/Vector/Raster）换算成实际使用的渲染方式"""
+    if selection == "Auto":
+        return "Raster" if num_nodes > RASTER_AUTO_NODES else "Vector"
+    return selection
+
+
+def replace_artists(artists, renderer):
+    """
+    需要时换成另一种渲染方式，保留调色板、节点半径等设置；
+    返回的对象还没有 build，调用方随后重新构建。
+    """
+    cls = RasterGraphArtists if renderer == "Raster" else GraphArtists
+    if type(artists) is cls:
+        return artists
+    artists.disconnect()
+    return cls(artists.ax, artists.canvas, artists.palette, node_radius=artists.node_radius,
+               label_limit=artists.label_limit, ring_color=artists.ring_rgba, path_color=artists.path_color,
+               highlight_color=artists.highlight_color, hover_color=artists.hover_color)
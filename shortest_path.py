@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的带权最短路径引擎（Dijkstra / A*）
+
+优先队列使用 heapq 二叉堆，采用惰性删除：距离变小时直接压入新的 (距离, 节点)，
+旧条目留在堆中，出堆时发现节点已确定（或距离已过期）就丢弃。
+这样不需要 decrease-key，每次松弛最多一次 push，总复杂度 O(E log E)。
+
+运行过程中统计松弛次数、堆操作次数和每次出堆后的堆大小，
+便于在单位权重的图上与 BFS 对比额外开销。
+"""
+import heapq
+import numpy as np
+
+
+class ShortestPathResult:
+    def __init__(self, source, target, distances, parents, settled, relaxed, heap_sizes,
+                 relaxations, pushes, pops, stale_pops, edges_examined):
+        self.source = source
+        self.target = target
+        self.distances = distances      # 未到达的节点为 inf
+        self.parents = parents          # 源点和未到达的节点为 -1
+        self.settled = settled          # 按确定顺序排列的节点
+        self.relaxed = relaxed          # relaxed[i]: 确定 settled[i] 时距离被改进的邻居
+        self.heap_sizes = heap_sizes    # 每次出堆后的堆大小（含过期条目）
+        self.relaxations = relaxations  # 距离被改进的次数
+        self.pushes = pushes
+        self.pops = pops
+        self.stale_pops = stale_pops    # 被丢弃的过期条目数
+        self.edges_examined = edges_examined
+
+    @property
+    def heap_operations(self):
+        return self.pushes + self.pops
+
+    @property
+    def max_heap_size(self):
+        return int(self.heap_sizes.max()) if len(self.heap_sizes) else 0
+
+    @property
+    def num_settled(self):
+        return len(self.settled)
+
+    def path_to(self, target):
+        """从源点到 target 的最短路径（不可达时返回空列表）"""
+        if not np.isfinite(self.distances[target]):
+            return []
+        path = [int(target)]
+        while self.parents[path[-1]] >= 0:
+            path.append(int(self.parents[path[-1]]))
+        return path[::-1]
+
+    def stats(self):
+        return {
+            "settled": self.num_settled,
+            "relaxations": self.relaxations,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "heap_operations": self.heap_operations,
+            "max_heap_size": self.max_heap_size,
+            "edges_examined": self.edges_examined,
+        }
+
+
+def dijkstra(graph, source, target=None, heuristic=None, record=True):
+    """
+    从 source 出发的 Dijkstra；给出 target 时在 target 出堆后停止。
+    heuristic 是长度为 n 的下界数组（A*），为 None 时即普通 Dijkstra。
+    边权必须非负，图没有边权时按 1 处理。
+    """
+    n = graph.num_nodes
+    if not 0 <= source < n:
+        raise ValueError(f"source {source} out of range")
+    if target is not None and not 0 <= target < n:
+        raise ValueError(f"target {target} out of range")
+    if graph.weights is not None and len(graph.weights) and graph.weights.min() < 0:
+        raise ValueError("Dijkstra requires non-negative edge weights")
+
+    # 转成 Python 列表后逐元素访问比 NumPy 标量快得多
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = [1.0] * len(indices) if graph.weights is None else graph.weights.tolist()
+    h = [0.0] * n if heuristic is None else np.asarray(heuristic, dtype=np.float64).tolist()
+
+    inf = float("inf")
+    dist = [inf] * n
+    parents = [-1] * n
+    done = bytearray(n)
+    settled, relaxed, heap_sizes = [], [], []
+    relaxations = pushes = pops = stale = examined = 0
+
+    dist[source] = 0.0
+    heap = [(h[source], source)]
+    pushes = 1
+    push, pop = heapq.heappush, heapq.heappop
+
+    while heap:
+        _, u = pop(heap)
+        pops += 1
+        if done[u]:
+            stale += 1
+            continue
+        done[u] = 1
+        settled.append(u)
+        if u == target:
+            if record:
+                relaxed.append([])
+                heap_sizes.append(len(heap))
+            break
+
+        du = dist[u]
+        improved = []
+        for pos in range(indptr[u], indptr[u + 1]):
+            v = indices[pos]
+            examined += 1
+            if done[v]:
+                continue
+            nd = du + weights[pos]
+            if nd < dist[v]:
+                dist[v] = nd
+                parents[v] = u
+                relaxations += 1
+                push(heap, (nd + h[v], v))
+                pushes += 1
+                improved.append(v)
+        if record:
+            relaxed.append(improved)
+            heap_sizes.append(len(heap))
+
+    return ShortestPathResult(source, target, np.array(dist), np.array(parents, dtype=np.int64),
+                              np.array(settled, dtype=np.int64), relaxed,
+                              np.array(heap_sizes, dtype=np.int64),
+                              relaxations, pushes, pops, stale, examined)
+
+
+def euclidean_heuristic(graph, positions, target):
+    """
+    A* 的启发函数：到 target 的直线距离乘以 min(边权 / 边长)。
+    该比例保证 h(u) - h(v) <= w(u, v)，因此启发函数是一致的，A* 的结果仍是最短路径。
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    src, dst = graph.edges()
+    lengths = np.linalg.norm(positions[src] - positions[dst], axis=1)
+    weights = np.ones(len(src)) if graph.weights is None else graph.weights
+    usable = lengths > 0
+    scale = float((weights[usable] / lengths[usable]).min()) if usable.any() else 0.0
+    return scale * np.linalg.norm(positions - positions[target], axis=1)
+
+
+def astar(graph, source, target, positions, record=True):
+    """以节点坐标的直线距离为启发的 A*"""
+    return dijkstra(graph, source, target, euclidean_heuristic(graph, positions, target), record)
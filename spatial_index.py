@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+节点坐标的均匀网格索引（点击命中测试、鼠标悬停、视口裁剪）
+
+所有节点按所在格子的编号排序存放，一个格子里的节点在排序后的数组中是连续的一段，
+查询时只需对覆盖查询圆（或矩形）的格子逐行做二分查找，再精确筛选这些候选节点。
+格子边长取命中半径的两倍，因此一次点击查询最多检查 2x2 到 3x3 个格子，与节点总数无关；
+矩形查询的耗时与矩形覆盖的行数和其中的节点数成正比。
+
+坐标变化（例如布局迭代）时调用 update() 只标记为过期，下一次查询时才重建，
+重建是一次排序，O(n log n)。
+"""
+import numpy as np
+
+
+class GridIndex:
+    def __init__(self, positions, cell_size=None):
+        self.cell_size = cell_size
+        self._positions = np.zeros((0, 2))
+        self._stale = True
+        self.update(positions)
+
+    def update(self, positions, cell_size=None):
+        """坐标或命中半径改变后调用；重建推迟到下一次查询"""
+        self._positions = np.asarray(positions, dtype=np.float64)
+        if cell_size is not None:
+            self.cell_size = cell_size
+        self._stale = True
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _rebuild(self):
+        positions = self._positions
+        n = len(positions)
+        if n == 0:
+            self._origin = np.zeros(2)
+            self._cell = 1.0
+            self._ncols = 1
+            self._nrows = 1
+            self._order = np.zeros(0, dtype=np.int64)
+            self._keys = np.zeros(0, dtype=np.int64)
+            self._stale = False
+            return
+        lo, hi = positions.min(axis=0), positions.max(axis=0)
+        cell = self.cell_size
+        if not cell or cell <= 0:
+            # 没有指定时让每个格子平均约有一个节点
+            area = max(float(np.prod(np.maximum(hi - lo, 1e-9))), 1e-9)
+            cell = np.sqrt(area / n)
+        self._origin = lo
+        self._cell = float(cell)
+        cols = np.floor((positions[:, 0] - lo[0]) / self._cell).astype(np.int64)
+        rows = np.floor((positions[:, 1] - lo[1]) / self._cell).astype(np.int64)
+        self._ncols = int(cols.max()) + 1
+        self._nrows = int(rows.max()) + 1
+        keys = rows * self._ncols + cols
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+        self._stale = False
+
+    def _candidates(self, x0, y0, x1, y1):
+        """与矩形 [x0, x1] x [y0, y1] 相交的格子中的所有节点"""
+        if self._stale:
+            self._rebuild()
+        if len(self._keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        c0 = int(np.floor((x0 - self._origin[0]) / self._cell))
+        c1 = int(np.floor((x1 - self._origin[0]) / self._cell))
+        r0 = int(np.floor((y0 - self._origin[1]) / self._cell))
+        r1 = int(np.floor((y1 - self._origin[1]) / self._cell))
+        c0, c1 = max(c0, 0), min(c1, self._ncols - 1)
+        r0, r1 = max(r0, 0), min(r1, self._nrows - 1)
+        if c0 > c1 or r1 < r0:
+            return np.zeros(0, dtype=np.int64)
+        if c0 == 0 and r0 == 0 and c1 == self._ncols - 1 and r1 == self._nrows - 1:
+            return self._order  # 覆盖了全部格子
+        # 每一行覆盖的格子编号是连续的，一次二分查找即可取出整段
+        rows = np.arange(r0, r1 + 1, dtype=np.int64)
+        starts = np.searchsorted(self._keys, rows * self._ncols + c0, side='left')
+        ends = np.searchsorted(self._keys, rows * self._ncols + c1, side='right')
+        if not (ends > starts).any():
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([self._order[s:e] for s, e in zip(starts, ends) if e > s])
+
+    def within(self, x, y, radius):
+        """到 (x, y) 距离不超过 radius 的所有节点"""
+        if x is None or y is None:
+            return np.zeros(0, dtype=np.int64)
+        nodes = self._candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(nodes) == 0:
+            return nodes
+        delta = self._positions[nodes] - (x, y)
+        return nodes[np.einsum('ij,ij->i', delta, delta) <= radius * radius]
+
+    def nearest(self, x, y, radius):
+        """距离 (x, y) 不超过 radius 的最近节点，没有时返回 None（x/y 为 None 时也返回 None）"""
+        if x is None or y is None:
+            return None
+        nodes = self._candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(nodes) == 0:
+            return None
+        delta = self._positions[nodes] - (x, y)
+        dist2 = np.einsum('ij,ij->i', delta, delta)
+        best = int(np.argmin(dist2))
+        if dist2[best] > radius * radius:
+            return None
+        return int(nodes[best])
+
+    def in_rect(self, x0, y0, x1, y1):
+        """坐标落在矩形 [x0, x1] x [y0, y1] 内的所有节点（顺序不定）"""
+        nodes = self._candidates(x0, y0, x1, y1)
+        if len(nodes) == 0:
+            return nodes
+        pos = self._positions[nodes]
+        inside = (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+        return nodes[inside]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+遍历统计窗口：BFS/DFS 窗口共用的 Toplevel，显示 traversal_stats.plot_stats 的 2x2 统计图，
+并可以把统计结果导出为 JSON。每个可视化窗口只保留一个统计窗口，重复打开时刷新内容。
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from traversal_stats import plot_stats, export_json, summarize
+
+
+class StatsWindow:
+    def __init__(self, master, title):
+        self.stats = None
+        self.window = tk.Toplevel(master)
+        self.window.title(title)
+        self.window.geometry("900x650")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.figure = plt.Figure(figsize=(9, 6), dpi=100)
+        self.canvas = FigureCanvasTkAgg(self.figure, self.window)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        bottom = ttk.Frame(self.window, padding="5")
+        bottom.pack(side=tk.BOTTOM, fill=tk.X)
+        self.summary_var = tk.StringVar(value="Computing statistics...")
+        ttk.Label(bottom, textvariable=self.summary_var).pack(side=tk.LEFT)
+        self.export_button = ttk.Button(bottom, text="Export JSON...", command=self.export, state="disabled")
+        self.export_button.pack(side=tk.RIGHT)
+
+    @property
+    def alive(self):
+        try:
+            return bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def wait(self, message="Computing statistics..."):
+        """统计还在后台计算时显示提示"""
+        self.summary_var.set(message)
+        self.export_button.config(state="disabled")
+        self.window.lift()
+
+    def show(self, stats):
+        self.stats = stats
+        plot_stats(self.figure, stats)
+        self.canvas.draw()
+        self.summary_var.set(summarize(stats))
+        self.export_button.config(state="normal")
+        self.window.lift()
+
+    def export(self):
+        if self.stats is None:
+            return
+        path = filedialog.asksaveasfilename(parent=self.window, title="Export Statistics",
+                                            defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            export_json(self.stats, path)
+        except OSError as e:
+            messagebox.showerror("Export Statistics", f"Could not write {path}:\n{str(e)}", parent=self.window)
+
+    def close(self):
+        self.window.destroy()
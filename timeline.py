@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+可拖动回放的遍历时间线
+
+算法先在后台完整运行，把过程记录成紧凑的事件轨迹（每个事件是几个整数数组中的一项）：
+    enqueue / dequeue / visit    BFS、Dijkstra、双向 BFS
+    push / pop / edge            DFS（pop 即回溯到父节点，edge 为非树边的检查）
+每个事件最多把一个节点设为新的状态编码（编码由调用方给出，即可视化的调色板下标），
+并记录此时应标红的“当前节点”。
+
+每隔 interval 个事件保存一份节点状态快照（checkpoint），跳转到第 k 步时取最近的
+快照再向前应用不超过 interval 个事件，这一段用 NumPy 一次完成，因此任意跳转的代价
+与轨迹长度无关。快照数量受内存预算限制。
+
+TimelinePlayer 用 Tk 的 after 作为时钟：按“每秒步数”累积应走的步数，
+每帧只渲染一次，速度很高时一帧可以跨过成百上千个事件。
+"""
+import time
+import numpy as np
+
+from dfs_engine import EVENT_DISCOVER, EVENT_EDGE, EDGE_TREE
+
+# 事件类型
+EV_ENQUEUE, EV_DEQUEUE, EV_VISIT, EV_PUSH, EV_POP, EV_EDGE = range(6)
+EVENT_NAMES = ["enqueue", "dequeue", "visit", "push", "pop", "edge"]
+
+NO_CHANGE = -1  # 事件不改变节点状态
+
+CHECKPOINT_BUDGET = 16 * 1024 * 1024  # 所有快照合计的字节数上限
+MIN_INTERVAL = 64
+
+
+class Timeline:
+    def __init__(self, num_nodes, kinds, nodes, others, states, currents, details=None, interval=None):
+        self.num_nodes = num_nodes
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.others = np.asarray(others, dtype=np.int32)      # 父节点 / 边的另一端，没有时为 -1
+        self.states = np.asarray(states, dtype=np.int8)       # 节点的新状态，NO_CHANGE 表示不变
+        self.currents = np.asarray(currents, dtype=np.int32)  # 该事件之后标红的节点，没有时为 -1
+        # 由构造函数定义的附加信息（例如 DFS 的边分类），没有时为 -1
+        if details is None:
+            details = np.full(len(self.kinds), -1)
+        self.details = np.asarray(details, dtype=np.int32)
+
+        total = len(self.kinds)
+        if interval is None:
+            count = max(1, min(total // MIN_INTERVAL, CHECKPOINT_BUDGET // max(num_nodes, 1)))
+            interval = max(MIN_INTERVAL, -(-total // count))
+        self.interval = int(interval)
+
+        # checkpoints[k] 是应用前 k * interval 个事件之后的状态
+        codes = np.zeros(num_nodes, dtype=np.int8)
+        self.checkpoints = [codes.copy()]
+        for start in range(0, total - self.interval + 1, self.interval):
+            self._apply(codes, start, start + self.interval)
+            self.checkpoints.append(codes.copy())
+
+        self._cursor_step = 0
+        self._cursor_codes = self.checkpoints[0].copy()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getstate__(self):
+        # 保存到磁盘缓存时不带回放游标：界面线程可能正在移动它，载入后从第 0 步重新开始
+        state = self.__dict__.copy()
+        state["_cursor_step"] = 0
+        state["_cursor_codes"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cursor_codes = self.checkpoints[0].copy()
+
+    @property
+    def nbytes(self):
+        arrays = (self.kinds, self.nodes, self.others, self.states, self.currents, self.details)
+        return sum(a.nbytes for a in arrays) + sum(c.nbytes for c in self.checkpoints)
+
+    def _apply(self, codes, start, end):
+        """把 [start, end) 的事件应用到 codes：同一节点以最后一次为准"""
+        states = self.states[start:end]
+        keep = states != NO_CHANGE
+        nodes, states = self.nodes[start:end][keep][::-1], states[keep][::-1]
+        if len(nodes) == 0:
+            return
+        uniq, last = np.unique(nodes, return_index=True)
+        codes[uniq] = states[last]
+
+    def state_at(self, step):
+        """应用前 step 个事件之后的节点状态（新数组）"""
+        step = int(np.clip(step, 0, len(self)))
+        base = self._cursor_step
+        if not base <= step <= base + self.interval:
+            # 向后跳或跳得太远：从最近的快照开始
+            base = min(step // self.interval, len(self.checkpoints) - 1) * self.interval
+            self._cursor_codes = self.checkpoints[base // self.interval].copy()
+        self._apply(self._cursor_codes, base, step)
+        self._cursor_step = step
+        return self._cursor_codes.copy()
+
+    def current_at(self, step):
+        """第 step 步时标红的节点（没有时为 None）"""
+        if step <= 0 or step > len(self):
+            return None
+        node = int(self.currents[step - 1])
+        return node if node >= 0 else None
+
+    def event(self, step):
+        """第 step 步刚刚发生的事件 (类型, 节点, 另一端, 附加信息)，step 为 0 时返回 None"""
+        if step <= 0 or step > len(self):
+            return None
+        i = step - 1
+        return int(self.kinds[i]), int(self.nodes[i]), int(self.others[i]), int(self.details[i])
+
+    def count_before(self, kind, step):
+        """前 step 个事件中 kind 类型的数量"""
+        return int(np.count_nonzero(self.kinds[:step] == kind))
+
+
+def frontier_sizes(timeline):
+    """
+    每一步之后队列（BFS）或栈（DFS）中的节点数：enqueue/push 加一，dequeue/pop 减一。
+    返回长度 len(timeline) + 1 的数组，第 k 项是前 k 个事件之后的大小。
+    """
+    kinds = timeline.kinds
+    delta = np.select([(kinds == EV_ENQUEUE) | (kinds == EV_PUSH), (kinds == EV_DEQUEUE) | (kinds == EV_POP)],
+                      [1, -1], 0)
+    return np.concatenate([[0], np.cumsum(delta)])
+
+
+# --- 各种遍历结果 -> 时间线 ---
+
+def bfs_timeline(result, num_nodes, queued, visited):
+    """
+    层同步 BFS 的结果展开成逐个出队的事件：起点（多源 BFS 为全部源点）入队，然后按访问顺序
+    对每个节点 dequeue、按发现顺序 enqueue 它的子节点、最后 visit。
+    visited 可以是一个状态编码，也可以是按节点给出的编码数组（例如按最近源点着色）。
+    """
+    order = result.order
+    rank = np.full(num_nodes, -1, dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    is_root = result.parents[order] < 0
+    roots, children = order[is_root], order[~is_root]
+    parents = result.parents[children]
+    done = np.asarray(visited)[order] if np.ndim(visited) else np.full(len(order), visited)
+
+    # 排序键 (父节点在访问顺序中的位置, 0 出队 / 1 入队 / 2 完成, 子节点的位置)
+    n, k = len(order), len(roots)
+    major = np.concatenate([np.full(k, -1), rank[order], rank[parents], rank[order]])
+    phase = np.concatenate([np.ones(k), np.zeros(n), np.ones(n - k), np.full(n, 2)])
+    minor = np.concatenate([rank[roots], np.zeros(n), rank[children], np.zeros(n)])
+    nodes = np.concatenate([roots, order, children, order])
+    others = np.concatenate([np.full(k, -1), np.full(n, -1), parents, np.full(n, -1)])
+    kinds = np.concatenate([np.full(k, EV_ENQUEUE), np.full(n, EV_DEQUEUE), np.full(n - k, EV_ENQUEUE),
+                            np.full(n, EV_VISIT)])
+    states = np.concatenate([np.full(k, queued), np.full(n, NO_CHANGE), np.full(n - k, queued), done])
+    sort = np.lexsort((minor, phase, major))
+    nodes, others, kinds, states = nodes[sort], others[sort], kinds[sort], states[sort]
+    # 出队时当前节点是自己，入队时是父节点，完成后没有
+    currents = np.where(kinds == EV_DEQUEUE, nodes, np.where(kinds == EV_ENQUEUE, others, -1))
+    return Timeline(num_nodes, kinds, nodes, others, states, currents)
+
+
+def shortest_path_timeline(result, num_nodes, queued, visited):
+    """Dijkstra/A*：每次出堆 dequeue，距离被改进的邻居 enqueue（可能重复入堆），然后 visit"""
+    kinds, nodes, others, states = [EV_ENQUEUE], [result.source], [-1], [queued]
+    for u, improved in zip(result.settled.tolist(), result.relaxed):
+        kinds.append(EV_DEQUEUE)
+        nodes.append(u)
+        others.append(-1)
+        states.append(NO_CHANGE)
+        kinds += [EV_ENQUEUE] * len(improved)
+        nodes += improved
+        others += [u] * len(improved)
+        states += [queued] * len(improved)
+        kinds.append(EV_VISIT)
+        nodes.append(u)
+        others.append(-1)
+        states.append(visited)
+    kinds, nodes, others = np.array(kinds), np.array(nodes), np.array(others)
+    currents = np.where(kinds == EV_DEQUEUE, nodes, np.where(kinds == EV_ENQUEUE, others, -1))
+    return Timeline(num_nodes, kinds, nodes, others, states, currents)
+
+
+def bidirectional_timeline(result, num_nodes, frontier_states, visited_states):
+    """
+    双向 BFS：每一步先把该侧旧前沿 visit，再把新前沿逐个 enqueue。
+    frontier_states / visited_states 是 {FORWARD/BACKWARD: 编码}，
+    details 记录事件属于第几步。
+    """
+    kinds, nodes, states, details = [], [], [], []
+    previous = {}
+    for i, (side, frontier) in enumerate(result.steps):
+        for group, kind, state in ((previous.get(side, ()), EV_VISIT, visited_states[side]),
+                                   (frontier, EV_ENQUEUE, frontier_states[side])):
+            group = np.asarray(group, dtype=np.int64)
+            kinds.append(np.full(len(group), kind))
+            nodes.append(group)
+            states.append(np.full(len(group), state))
+            details.append(np.full(len(group), i))
+        previous[side] = frontier
+    kinds, nodes = np.concatenate(kinds), np.concatenate(nodes)
+    none = np.full(len(nodes), -1)
+    return Timeline(num_nodes, kinds, nodes, none, np.concatenate(states), none,
+                    details=np.concatenate(details))
+
+
+def dfs_timeline(trace, stacked, visited):
+    """
+    DFS 轨迹：发现 -> push（入栈，标红），非树边 -> edge（details 为边分类），
+    完成 -> pop（出栈、回溯，父节点重新标红）。树边紧接着的 push 已经表示了它，不单独记录。
+    """
+    keep = ~((trace.event_types == EVENT_EDGE) & (trace.event_kinds == EDGE_TREE))
+    types = trace.event_types[keep]
+    nodes = trace.event_nodes[keep]
+    others = trace.event_others[keep]
+    kinds = np.select([types == EVENT_DISCOVER, types == EVENT_EDGE], [EV_PUSH, EV_EDGE], EV_POP)
+    states = np.select([kinds == EV_PUSH, kinds == EV_EDGE], [stacked, NO_CHANGE], visited)
+    currents = np.where(kinds == EV_POP, trace.parents[nodes], nodes)
+    details = np.where(kinds == EV_EDGE, trace.event_kinds[keep], -1)
+    return Timeline(trace.num_nodes, kinds, nodes, others, states, currents, details=details)
+
+
+# --- 回放时钟 ---
+
+FRAME_INTERVAL = 33  # 毫秒，约 30 帧/秒
+
+
+class TimelinePlayer:
+    """
+    在 Tk 主循环中回放时间线。on_step(step) 负责绘制第 step 步，
+    on_state(playing) 在开始/暂停（包括播放到结尾）时调用，用于更新按钮。
+    播放器只需要步数：load_steps(count) 可以用同一个时钟驱动多条时间线。
+    """
+
+    def __init__(self, root, on_step, on_state=None, steps_per_second=10.0):
+        self.root = root
+        self.on_step = on_step
+        self.on_state = on_state
+        self.steps_per_second = steps_per_second
+        self.timeline = None
+        self._num_steps = None  # None 表示没有载入
+        self.step = 0
+        self.playing = False
+        self._after_id = None
+        self._last_tick = 0.0
+        self._carry = 0.0  # 不足一步的累积量
+
+    @property
+    def loaded(self):
+        return self._num_steps is not None
+
+    @property
+    def num_steps(self):
+        return self._num_steps or 0
+
+    @property
+    def at_end(self):
+        return self.step >= self.num_steps
+
+    def load(self, timeline, step=0):
+        """回放一条时间线（None 表示卸载）"""
+        self._load(timeline, None if timeline is None else len(timeline), step)
+
+    def load_steps(self, count, step=0):
+        """不绑定时间线，只按步数回放（None 表示卸载）"""
+        self._load(None, count, step)
+
+    def _load(self, timeline, count, step):
+        self.pause()
+        self.timeline = timeline
+        self._num_steps = count
+        self.step = 0
+        if count is not None:
+            self.seek(step)
+
+    def seek(self, step):
+        if not self.loaded:
+            return
+        self.step = int(np.clip(step, 0, self.num_steps))
+        self.on_step(self.step)
+
+    def set_speed(self, steps_per_second):
+        self.steps_per_second = max(float(steps_per_second), 1e-3)
+
+    def play(self):
+        if not self.loaded or self.playing:
+            return
+        if self.at_end:
+            self.seek(0)  # 已经结束时从头开始
+        self.playing = True
+        self._last_tick = time.perf_counter()
+        self._carry = 0.0
+        if self.on_state:
+            self.on_state(True)
+        self._after_id = self.root.after(FRAME_INTERVAL, self._tick)
+
+    def pause(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.playing:
+            self.playing = False
+            if self.on_state:
+                self.on_state(False)
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def step_by(self, delta):
+        self.pause()
+        self.seek(self.step + delta)
+
+    def to_start(self):
+        self.pause()
+        self.seek(0)
+
+    def to_end(self):
+        self.pause()
+        self.seek(self.num_steps)
+
+    def _tick(self):
+        self._after_id = None
+        if not self.playing:
+            return
+        now = time.perf_counter()
+        self._carry += (now - self._last_tick) * self.steps_per_second
+        self._last_tick = now
+        advance = int(self._carry)
+        if advance:
+            self._carry -= advance
+            self.seek(self.step + advance)
+        if self.at_end:
+            self.pause()
+            return
+        self._after_id = self.root.after(FRAME_INTERVAL, self._tick)
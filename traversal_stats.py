@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的遍历统计
+
+    层统计      BFS 每层的前沿大小、检查的边数和展开方向；DFS 按树深度统计
+    度分布      每种度数出现的次数（有向图另给入度）
+    连通分量    弱连通分量的个数和大小分布（向量化并查集）
+    离心率      从若干采样点做 BFS（源点、两次"最远点"扫描、再加随机点），
+                最大离心率是直径的下界，无向图的 2 * 最小离心率是直径的上界
+
+traversal_stats() 把这些合成一个只包含 int/float/str/list 的字典，可以直接写成 JSON。
+"""
+import json
+import numpy as np
+
+from bfs_engine import bfs_levels, connected_components
+
+# 离心率的采样点数（包括源点和两次最远点扫描）
+ECCENTRICITY_SAMPLES = 8
+
+# JSON 中列出的节点数上限（大图只保留统计量）
+JSON_NODE_LIMIT = 1000
+
+
+def bfs_level_stats(result):
+    """BFS 结果的逐层统计"""
+    return {
+        "kind": "bfs",
+        "source": int(result.source),
+        "reached": result.num_reached,
+        "depth": result.depth,
+        "level_sizes": result.level_sizes.tolist(),
+        "edges_examined": result.edges_examined.tolist(),
+        "directions": list(result.directions),
+        "total_edges_examined": int(result.edges_examined.sum()),
+    }
+
+
+def dfs_depths(trace):
+    """
+    每个已访问节点在 DFS 树中的深度（即被发现时栈的深度 - 1）。
+    发现和完成共用一个时钟：在时钟上发现记 +1、完成记 -1，前缀和就是栈的深度。
+    """
+    visited = trace.discovery >= 0
+    ticks = np.zeros(2 * int(visited.sum()), dtype=np.int64)
+    ticks[trace.discovery[visited]] = 1
+    ticks[trace.finish[visited]] = -1
+    stack = np.cumsum(ticks)
+    depths = np.full(trace.num_nodes, -1, dtype=np.int64)
+    depths[visited] = stack[trace.discovery[visited]] - 1
+    return depths
+
+
+def dfs_level_stats(graph, trace):
+    """DFS 轨迹按树深度的统计：每个深度的节点数和这些节点检查的出边数"""
+    depths = dfs_depths(trace)
+    visited = depths >= 0
+    max_depth = int(depths.max()) if visited.any() else -1
+    sizes = np.bincount(depths[visited], minlength=max_depth + 1)
+    examined = np.bincount(depths[visited], weights=graph.degree()[visited], minlength=max_depth + 1)
+    return {
+        "kind": "dfs",
+        "source": int(trace.roots[0]) if trace.roots else None,
+        "reached": int(visited.sum()),
+        "depth": max_depth,
+        "level_sizes": sizes.tolist(),
+        "edges_examined": examined.astype(np.int64).tolist(),
+        "max_stack_depth": max_depth + 1,
+        "trees": len(trace.roots),
+        "edge_kinds": trace.edge_kind_counts(),
+        "total_edges_examined": int(examined.sum()),
+    }
+
+
+def _histogram(values):
+    """出现过的取值及其次数"""
+    uniq, counts = np.unique(values, return_counts=True)
+    return {"values": uniq.tolist(), "counts": counts.tolist()}
+
+
+def _summary(values):
+    if len(values) == 0:
+        return {"min": 0, "max": 0, "mean": 0.0, "median": 0.0}
+    return {"min": int(values.min()), "max": int(values.max()),
+            "mean": float(values.mean()), "median": float(np.median(values))}
+
+
+def degree_distribution(graph):
+    """出度分布（无向图即度分布），有向图另给入度分布"""
+    out_degree = graph.degree()
+    stats = {"out": dict(_summary(out_degree), **_histogram(out_degree))}
+    if graph.directed:
+        in_degree = np.bincount(graph.indices, minlength=graph.num_nodes)
+        stats["in"] = dict(_summary(in_degree), **_histogram(in_degree))
+    return stats
+
+
+def component_stats(graph, labels=None):
+    """连通分量的个数、最大分量和大小分布"""
+    if labels is None:
+        labels, _ = connected_components(graph)
+    sizes = np.bincount(labels)
+    return dict({"count": len(sizes), "largest": int(sizes.max()) if len(sizes) else 0,
+                 "isolated": int((sizes == 1).sum())}, **_histogram(sizes))
+
+
+def estimate_eccentricity(graph, source, samples=ECCENTRICITY_SAMPLES, rng=0, first=None):
+    """
+    从 source 所能到达的节点中采样做 BFS，估计离心率和直径。
+    前两次"最远点"扫描（从上一次 BFS 最后到达的节点出发）通常已经非常接近直径，
+    其余采样点从可达节点中随机选取。first 可以传入已经算好的从 source 出发的 BFS 结果。
+    """
+    rng = np.random.default_rng(rng)
+    result = first if first is not None and first.source == source else bfs_levels(graph, source)
+    reached = result.order
+    runs = [result]
+    for _ in range(2):
+        if len(runs) >= samples:
+            break
+        farthest = int(runs[-1].levels[-1][0])
+        if any(run.source == farthest for run in runs):
+            break
+        runs.append(bfs_levels(graph, farthest))
+    candidates = np.setdiff1d(reached, [run.source for run in runs])
+    extra = rng.choice(candidates, size=min(samples - len(runs), len(candidates)), replace=False)
+    runs.extend(bfs_levels(graph, int(node)) for node in extra)
+
+    eccentricity = np.array([run.depth for run in runs], dtype=np.int64)
+    stats = {
+        "samples": [{"node": int(run.source), "eccentricity": int(run.depth), "reached": run.num_reached}
+                    for run in runs],
+        "diameter_lower": int(eccentricity.max()),
+        "diameter_upper": None,
+        "radius_upper": int(eccentricity.min()),
+    }
+    if not graph.directed:
+        # 同一连通分量内 d(u, v) <= ecc(w) + ecc(w)
+        stats["diameter_upper"] = int(2 * eccentricity.min())
+    return stats
+
+
+def traversal_stats(graph, result=None, trace=None, source=0, samples=ECCENTRICITY_SAMPLES, rng=0):
+    """
+    汇总统计：result（BFSResult）或 trace（DFSTrace）给出层统计，都没有时从 source 做一次 BFS。
+    返回的字典可以直接 json.dump。
+    """
+    if trace is not None:
+        levels = dfs_level_stats(graph, trace)
+        bfs = None
+    else:
+        bfs = result if result is not None else bfs_levels(graph, source)
+        levels = bfs_level_stats(bfs)
+        source = bfs.source
+    labels, _ = connected_components(graph)
+    stats = {
+        "graph": {"nodes": graph.num_nodes, "edges": graph.num_edges, "directed": bool(graph.directed),
+                  "density": float(graph.density)},
+        "traversal": levels,
+        "degrees": degree_distribution(graph),
+        "components": component_stats(graph, labels),
+        "eccentricity": estimate_eccentricity(graph, int(source), samples, rng, first=bfs),
+    }
+    if graph.num_nodes <= JSON_NODE_LIMIT:
+        stats["components"]["labels"] = labels.tolist()
+    return stats
+
+
+def summarize(stats):
+    """一行文字摘要（状态栏使用）"""
+    traversal, ecc = stats["traversal"], stats["eccentricity"]
+    components = stats["components"]
+    diameter = f"{ecc['diameter_lower']}"
+    if ecc["diameter_upper"] is not None and ecc["diameter_upper"] != ecc["diameter_lower"]:
+        diameter += f"..{ecc['diameter_upper']}"
+    if traversal["kind"] == "bfs":
+        shape = f"{len(traversal['level_sizes'])} levels"
+    else:
+        shape = f"{traversal['trees']} tree(s), max stack depth {traversal['max_stack_depth']}"
+    return (f"reached {traversal['reached']} nodes ({shape}), "
+            f"{traversal['total_edges_examined']} edges examined; {components['count']} component(s), "
+            f"largest {components['largest']}; diameter ~{diameter}")
+
+
+def export_json(stats, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+
+
+def plot_stats(figure, stats):
+    """在 figure 上画 2x2 的统计图：层直方图、度分布、分量大小、采样离心率"""
+    figure.clear()
+    axes = figure.subplots(2, 2)
+    traversal = stats["traversal"]
+
+    ax = axes[0, 0]
+    levels = np.arange(len(traversal["level_sizes"]))
+    ax.bar(levels, traversal["level_sizes"], color="steelblue", label="nodes")
+    ax.set_xlabel("BFS level" if traversal["kind"] == "bfs" else "DFS tree depth")
+    ax.set_ylabel("nodes")
+    edges_ax = ax.twinx()
+    edges_ax.plot(levels, traversal["edges_examined"], color="darkorange", marker=".", label="edges examined")
+    edges_ax.set_ylabel("edges examined")
+    ax.set_title(f"Frontier sizes ({traversal['total_edges_examined']} edges examined)", fontsize=9)
+
+    ax = axes[0, 1]
+    for name, color in (("out", "steelblue"), ("in", "darkorange")):
+        if name in stats["degrees"]:
+            values = np.array(stats["degrees"][name]["values"])
+            counts = np.array(stats["degrees"][name]["counts"])
+            positive = values > 0
+            ax.loglog(values[positive], counts[positive], ".", color=color,
+                      label=f"{name}-degree" if "in" in stats["degrees"] else "degree")
+    ax.set_xlabel("degree")
+    ax.set_ylabel("nodes")
+    ax.legend(fontsize=7)
+    degrees = stats["degrees"]["out"]
+    ax.set_title(f"Degree distribution (mean {degrees['mean']:.1f}, max {degrees['max']})", fontsize=9)
+
+    ax = axes[1, 0]
+    components = stats["components"]
+    ax.loglog(components["values"], components["counts"], "o", color="seagreen")
+    ax.set_xlabel("component size")
+    ax.set_ylabel("components")
+    ax.set_title(f"{components['count']} component(s), largest {components['largest']}", fontsize=9)
+
+    ax = axes[1, 1]
+    ecc = stats["eccentricity"]
+    samples = ecc["samples"]
+    ax.bar(np.arange(len(samples)), [s["eccentricity"] for s in samples], color="slateblue")
+    ax.set_xticks(np.arange(len(samples)))
+    ax.set_xticklabels([str(s["node"]) for s in samples], fontsize=7, rotation=45)
+    ax.axhline(ecc["diameter_lower"], color="red", linestyle="--", linewidth=1)
+    ax.set_xlabel("sampled source")
+    ax.set_ylabel("eccentricity")
+    bound = f">= {ecc['diameter_lower']}"
+    if ecc["diameter_upper"] is not None:
+        bound = f"{ecc['diameter_lower']}..{ecc['diameter_upper']}"
+    ax.set_title(f"Eccentricity samples, diameter {bound}", fontsize=9)
+
+    figure.tight_layout()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+工作线程 -> Tk 主循环的界面更新通道
+
+工作线程不再直接调用 root.after(0, ...)，而是把更新投递到一个有界队列中，
+由 Tk 主循环定时轮询并批量执行。相同 key 的待处理更新会被合并成最新快照，
+因此无论算法跑得多快，积压的重绘数量都不会超过队列容量。
+"""
+import threading
+import itertools
+import time
+from collections import OrderedDict, deque
+
+# 队列满时的处理策略
+POLICY_BLOCK = "block"              # 阻塞生产者直到有空位（或超时后丢弃）
+POLICY_DROP_OLDEST = "drop_oldest"  # 丢弃最早的待处理更新
+POLICY_DROP_NEWEST = "drop_newest"  # 丢弃本次投递的更新
+
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST)
+
+
+class UIUpdateChannel:
+    def __init__(self, root, maxsize=32, policy=POLICY_DROP_OLDEST, poll_interval=15):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+
+        self.root = root
+        self.maxsize = maxsize
+        self.policy = policy
+        self.poll_interval = poll_interval  # 毫秒
+
+        self._pending = OrderedDict()  # key -> (callback, args)
+        self._control = deque()        # 完成/出错等控制事件，不合并也不丢弃
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._after_id = None
+        self._closed = False
+
+        # 统计指标
+        self.posted = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.peak_depth = 0
+        self.last_latency = 0.0
+
+        self._schedule()
+
+    # --- 生产者端（任意线程） ---
+
+    def post(self, key, callback, *args, timeout=None):
+        """
+        投递一个界面更新。key 相同的待处理更新会被合并为最新的一次；
+        key 为 None 表示不可合并的独立更新。返回是否成功入队。
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.posted += 1
+
+            if key is not None and key in self._pending:
+                # 合并：只保留最新快照，队列深度不变
+                self._pending[key] = (callback, args, time.perf_counter())
+                self.coalesced += 1
+                return True
+
+            if key is None:
+                key = ("_seq", next(self._seq))
+
+            if len(self._pending) >= self.maxsize:
+                if self.policy == POLICY_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.policy == POLICY_DROP_OLDEST:
+                    self._pending.popitem(last=False)
+                    self.dropped += 1
+                else:
+                    has_room = self._cond.wait_for(
+                        lambda: self._closed or len(self._pending) < self.maxsize, timeout)
+                    if self._closed:
+                        return False
+                    if not has_room:
+                        self.dropped += 1
+                        return False
+
+            self._pending[key] = (callback, args, time.perf_counter())
+            self.peak_depth = max(self.peak_depth, len(self._pending))
+            return True
+
+    def post_control(self, callback, *args):
+        """投递控制事件（如完成、报错），保证按顺序送达且不被丢弃"""
+        with self._cond:
+            if self._closed:
+                return False
+            self._control.append((callback, args))
+            return True
+
+    # --- 消费者端（Tk 主线程） ---
+
+    @property
+    def depth(self):
+        """当前待处理的更新数量"""
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'depth': len(self._pending),
+                'peak_depth': self.peak_depth,
+                'maxsize': self.maxsize,
+                'policy': self.policy,
+                'posted': self.posted,
+                'delivered': self.delivered,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+                'last_latency_ms': self.last_latency * 1000.0,
+            }
+
+    def clear(self):
+        """丢弃所有待处理的更新（例如重置时丢掉旧线程的残留重绘）"""
+        with self._cond:
+            self._pending.clear()
+            self._control.clear()
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._control.clear()
+            self._cond.notify_all()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def flush(self):
+        """在 Tk 主线程中立即执行所有待处理的更新"""
+        with self._cond:
+            updates = list(self._pending.values())
+            self._pending.clear()
+            controls = list(self._control)
+            self._control.clear()
+            self._cond.notify_all()
+
+        now = time.perf_counter()
+        for callback, args, posted_at in updates:
+            self.last_latency = now - posted_at
+            self.delivered += 1
+            callback(*args)
+        for callback, args in controls:
+            callback(*args)
+
+    def _poll(self):
+        self._after_id = None
+        try:
+            self.flush()
+        finally:
+            self._schedule()
+
+    def _schedule(self):
+        if self._closed:
+            return
+        try:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+        except Exception:
+            # 窗口已销毁
+            self._closed = True